@@ -6,8 +6,14 @@ It provides web routes and API endpoints for ticket submission and classificatio
 """
 import os
 import sys
+import hmac
+import json
+import time
 import logging
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import (
+    Flask, Response, render_template, request, redirect, url_for, jsonify, g, has_request_context,
+    stream_with_context
+)
 from werkzeug.exceptions import BadRequest
 from dotenv import load_dotenv
 
@@ -19,10 +25,29 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 # Import our modules
-from utils.text_preprocessing import combine_title_description
-from utils.team_assignment import get_team_assignment
-from model.classifier import TicketClassifier
-from database.models import init_db, db, Ticket
+from utils.text_preprocessing import combine_title_description, ensure_nltk_resources
+from utils.team_assignment import get_team_assignment, assign_team, get_matcher, load_team_keywords, DEFAULT_MIN_CONFIDENCE
+from utils.result_cache import ResultCache
+from utils.metrics import MetricsRegistry, CONTENT_TYPE
+from utils.profiling import RequestProfiler, StageTimer, format_server_timing
+from model.registry import ModelRegistry
+from database.models import (
+    init_db,
+    db,
+    Ticket,
+    PriorityCorrection,
+    PRIORITIES,
+    PENDING_PRIORITY,
+    UNASSIGNED_TEAM,
+    STATUS_CLASSIFIED
+)
+from database.jobs import enqueue_ticket, latest_job
+from database.pagination import paginate_tickets
+from database.search import search_tickets
+from database.stats import ticket_counts, hourly_counts, recent_hours
+from database.group_commit import GroupCommitWriter
+from database.duplicates import index_ticket, find_duplicate
+from database.similarity import TicketSimilarity
 
 # Setup logging
 logging.basicConfig(
@@ -35,6 +60,36 @@ app = Flask(__name__)
 
 # Configure app from environment variables
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-for-development')
+app.config['CLASSIFY_BATCH_LIMIT'] = int(os.environ.get('CLASSIFY_BATCH_LIMIT', 1000))
+app.config['CLASSIFY_STREAM_BATCH'] = int(os.environ.get('CLASSIFY_STREAM_BATCH', 100))
+app.config['CLASSIFY_STREAM_MAX_LINE'] = int(os.environ.get('CLASSIFY_STREAM_MAX_LINE', 65536))
+app.config['CLASSIFY_CACHE_SIZE'] = int(os.environ.get('CLASSIFY_CACHE_SIZE', 10000))
+app.config['CLASSIFY_CACHE_TTL'] = float(os.environ['CLASSIFY_CACHE_TTL']) if os.environ.get('CLASSIFY_CACHE_TTL') else None
+app.config['TICKETS_PAGE_SIZE'] = int(os.environ.get('TICKETS_PAGE_SIZE', 50))
+app.config['TICKETS_MAX_PAGE_SIZE'] = int(os.environ.get('TICKETS_MAX_PAGE_SIZE', 200))
+app.config['SEARCH_MAX_OFFSET'] = int(os.environ.get('SEARCH_MAX_OFFSET', 1000))
+app.config['STATS_MAX_HOURS'] = int(os.environ.get('STATS_MAX_HOURS', 744))
+app.config['CLASSIFY_ASYNC'] = os.environ.get('CLASSIFY_ASYNC', '').lower() in ('1', 'true', 'yes')
+app.config['DUPLICATE_DETECTION'] = os.environ.get('DUPLICATE_DETECTION', '0').lower() in ('1', 'true', 'yes')
+app.config['DUPLICATE_THRESHOLD'] = float(os.environ.get('DUPLICATE_THRESHOLD', 0.8))
+app.config['TEAM_MIN_CONFIDENCE'] = float(os.environ.get('TEAM_MIN_CONFIDENCE', DEFAULT_MIN_CONFIDENCE))
+app.config['SIMILARITY_INDEX_PATH'] = os.environ.get(
+    'SIMILARITY_INDEX_PATH', os.path.join(current_dir, 'instance', 'similarity_index.npz')
+)
+app.config['SIMILARITY_PRUNE_DF'] = float(os.environ.get('SIMILARITY_PRUNE_DF', 0))
+app.config['SIMILARITY_REFRESH_INTERVAL'] = float(os.environ.get('SIMILARITY_REFRESH_INTERVAL', 1))
+app.config['SIMILARITY_SAVE_EVERY'] = int(os.environ.get('SIMILARITY_SAVE_EVERY', 1000))
+app.config['SIMILAR_MAX_K'] = int(os.environ.get('SIMILAR_MAX_K', 50))
+app.config['GROUP_COMMIT'] = os.environ.get('GROUP_COMMIT', '').lower() in ('1', 'true', 'yes')
+app.config['GROUP_COMMIT_WINDOW_MS'] = float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 5))
+app.config['GROUP_COMMIT_MAX_BATCH'] = int(os.environ.get('GROUP_COMMIT_MAX_BATCH', 100))
+app.config['GROUP_COMMIT_TIMEOUT'] = float(os.environ.get('GROUP_COMMIT_TIMEOUT', 30))
+app.config['MODEL_WATCH_INTERVAL'] = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(current_dir, 'instance', 'profiles'))
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
 
 # Initialize the database
 init_db(app)
@@ -42,8 +97,223 @@ init_db(app)
 # Path to the trained model
 MODEL_PATH = os.path.join(current_dir, 'model', 'ticket_classifier.pkl')
 
-# Load the classifier model
-classifier = TicketClassifier(MODEL_PATH)
+# Memory-mappable export of the same model, shared by all workers
+COMPACT_MODEL_PATH = os.path.join(current_dir, 'model', 'ticket_classifier.compact')
+
+# Load the classifier model. Requests read model_registry.current once and
+# use that model throughout, so a reload never affects a request in flight.
+model_registry = ModelRegistry(MODEL_PATH, COMPACT_MODEL_PATH)
+
+# Nearest-neighbour index of the stored tickets, built with the serving
+# model's vectorizer. Loaded on first use, or before forking by gunicorn.
+ticket_similarity = TicketSimilarity(
+    app.config['SIMILARITY_INDEX_PATH'],
+    prune_df=app.config['SIMILARITY_PRUNE_DF'],
+    refresh_interval=app.config['SIMILARITY_REFRESH_INTERVAL'],
+    save_every=app.config['SIMILARITY_SAVE_EVERY']
+)
+
+# Load a custom team keyword table if one is configured
+if os.environ.get('TEAM_KEYWORDS_FILE'):
+    load_team_keywords(os.environ['TEAM_KEYWORDS_FILE'])
+
+# Cache of (priority, team) results keyed by preprocessed text
+result_cache = ResultCache(
+    maxsize=app.config['CLASSIFY_CACHE_SIZE'],
+    ttl=app.config['CLASSIFY_CACHE_TTL']
+)
+
+# Prometheus metrics, merged across gunicorn workers through METRICS_DIR
+metrics_registry = MetricsRegistry(app.config['METRICS_DIR'])
+request_count = metrics_registry.counter(
+    'ticket_http_requests_total', 'HTTP requests by route, method and status', ['route', 'method', 'status']
+)
+request_latency = metrics_registry.histogram(
+    'ticket_http_request_duration_seconds', 'HTTP request latency in seconds by route', ['route']
+)
+stage_latency = metrics_registry.histogram(
+    'ticket_stage_duration_seconds', 'Latency in seconds of each ticket processing stage', ['stage']
+)
+cache_requests = metrics_registry.counter(
+    'ticket_classify_cache_requests_total', 'Classification result cache lookups by result', ['result']
+)
+duplicate_lookups = metrics_registry.counter(
+    'ticket_duplicate_lookups_total', 'Near-duplicate lookups for submitted tickets by result', ['result']
+)
+team_assignments = metrics_registry.counter(
+    'ticket_team_assignments_total', 'Team assignments by source (joint model or keyword matcher)', ['source']
+)
+model_info = metrics_registry.gauge(
+    'ticket_model_info', 'Number of processes serving each model version', ['version', 'format']
+)
+
+def collect_model_info():
+    """
+    Report the model this process is serving.
+    """
+    info = model_registry.info()
+    model_info.clear()
+    model_info.set(1, version=info['version'], format=info['format'])
+
+metrics_registry.add_collector(collect_model_info)
+
+group_commit_size = metrics_registry.histogram(
+    'ticket_group_commit_size', 'Tickets written by each group commit',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+group_commit_latency = metrics_registry.histogram(
+    'ticket_group_commit_duration_seconds', 'Latency in seconds of each group commit transaction'
+)
+
+def record_group_commit(size, seconds):
+    """
+    Record one group commit in the metrics.
+    
+    Args:
+        size (int): Number of tickets written
+        seconds (float): Duration of the transaction
+    """
+    group_commit_size.observe(size)
+    group_commit_latency.observe(seconds)
+
+# Shared transactions for ticket submissions, used when GROUP_COMMIT is on.
+# The writer thread starts with the first submission in each process.
+with app.app_context():
+    group_commit_writer = GroupCommitWriter(
+        db.engine,
+        window=app.config['GROUP_COMMIT_WINDOW_MS'] / 1000,
+        max_batch=app.config['GROUP_COMMIT_MAX_BATCH'],
+        on_commit=record_group_commit
+    )
+
+# Opt-in profiling of a sample of the ticket classification requests
+request_profiler = RequestProfiler(app.config['PROFILE_DIR'], app.config['PROFILE_SAMPLE_RATE'])
+PROFILED_ENDPOINTS = ('classify_ticket_api', 'submit_ticket')
+
+def time_stage(stage):
+    """
+    Time a stage of ticket processing.
+    
+    The duration goes to the stage latency histogram and, with SERVER_TIMING
+    enabled, to the request's Server-Timing header.
+    
+    Args:
+        stage (str): Stage name
+    
+    Returns:
+        StageTimer: Context manager timing the stage
+    """
+    timings = g.get('stage_timings') if app.config['SERVER_TIMING'] and has_request_context() else None
+    return StageTimer(stage_latency, stage, timings)
+
+def warmup():
+    """
+    Load everything the first classification would otherwise load lazily.
+    
+    Checks the NLTK data (downloading anything missing), loads the stopword
+    list, tokenizer and WordNet, and runs one dummy prediction through the
+    classifier and team assignment. Call it before accepting traffic; the
+    gunicorn config does so before forking workers.
+    
+    Returns:
+        float: Seconds spent warming up
+    """
+    started = time.perf_counter()
+    ensure_nltk_resources()
+    
+    # Bypasses the result cache so the dummy ticket is not stored
+    processed_text = combine_title_description(
+        "Email server down",
+        "Users cannot send or receive emails since this morning"
+    )
+    model_registry.current.classify_many([processed_text])
+    get_team_assignment(processed_text)
+    
+    elapsed = time.perf_counter() - started
+    logging.info(f"Warmed up in {elapsed:.2f}s")
+    return elapsed
+
+
+def load_similarity_index():
+    """
+    Load the similarity index, building it if it is missing or stale.
+    
+    Called by the gunicorn config before forking workers, so they share
+    the loaded index instead of each loading it on its first request.
+    """
+    with app.app_context():
+        ticket_similarity.get(model_registry.current)
+
+
+def start_model_watcher():
+    """
+    Start watching the model files if MODEL_WATCH_INTERVAL is set.
+    
+    Must run in every serving process: the watcher is a thread, and threads
+    do not survive a fork. The gunicorn config calls it in each worker.
+    """
+    if app.config['MODEL_WATCH_INTERVAL'] > 0:
+        model_registry.start_watcher(app.config['MODEL_WATCH_INTERVAL'])
+
+
+@app.before_request
+def start_request_timer():
+    """
+    Note when the request started, for the latency metrics.
+    """
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Count the request and record its latency by route.
+    """
+    # The route pattern, not the path, keeps the number of series bounded
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    started = g.get('request_started')
+    if started is not None:
+        request_latency.observe(time.perf_counter() - started, route=route)
+    request_count.inc(route=route, method=request.method, status=response.status_code)
+    metrics_registry.start_flusher()
+    return response
+
+
+@app.before_request
+def start_profiling():
+    """
+    Start collecting stage durations and, for sampled requests, a profile.
+    """
+    if app.config['SERVER_TIMING']:
+        g.stage_timings = {}
+    if request_profiler.sample_rate > 0 and request.endpoint in PROFILED_ENDPOINTS:
+        g.profile = request_profiler.start()
+
+
+@app.after_request
+def finish_profiling(response):
+    """
+    Write the request's profile and add the Server-Timing header.
+    """
+    profile = g.pop('profile', None)
+    profile_name = request_profiler.stop(profile, request.endpoint) if profile is not None else None
+    
+    timings = g.get('stage_timings')
+    if timings is not None:
+        total = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = format_server_timing(timings, total, profile_name)
+    return response
+
+
+@app.teardown_request
+def stop_unfinished_profile(exc):
+    """
+    Stop the profiler of a request that ended without a response.
+    """
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.disable()
+
 
 @app.route('/')
 def index():
@@ -52,7 +322,19 @@ def index():
     """
     # Fetch the most recent tickets from the database
     recent_tickets = Ticket.query.order_by(Ticket.created_at.desc()).limit(10).all()
-    return render_template('index.html', tickets=recent_tickets)
+    
+    # Read from the summary table, not by counting tickets
+    counts, total = ticket_counts(app.config['STATS_TRIGGERS'])
+    teams = sorted({team for by_team in counts.values() for team in by_team})
+    priorities = [p for p in PRIORITIES + (PENDING_PRIORITY,) if p in counts]
+    priorities += sorted(set(counts) - set(priorities))
+    
+    return render_template('index.html', tickets=recent_tickets, counts=counts, total=total,
+                           teams=teams, priorities=priorities)
+
+
+# Shown when a group commit dropped a ticket it could not take in time
+SAVE_TIMEOUT_ERROR = 'The ticket could not be saved in time and was not stored. Please submit it again.'
 
 
 @app.route('/submit', methods=['GET', 'POST'])
@@ -70,8 +352,26 @@ def submit_ticket():
         if not title or not description:
             return render_template('submit.html', error='Title and description are required'), 400
         
-        # Process the ticket
-        priority, team, processed_text = process_ticket(title, description)
+        if app.config['CLASSIFY_ASYNC']:
+            # Store the ticket right away and leave classification to the
+            # background workers (python -m tools.classify_worker)
+            new_ticket = Ticket(title=title, description=description,
+                                priority=PENDING_PRIORITY, team=UNASSIGNED_TEAM)
+            try:
+                save_ticket(new_ticket, queue_job=True)
+            except TimeoutError:
+                return render_template('submit.html', error=SAVE_TIMEOUT_ERROR), 503
+            return redirect(url_for('index'))
+        
+        with time_stage('preprocess'):
+            processed_text = combine_title_description(title, description)
+        
+        # A near-duplicate of an earlier ticket takes over its classification
+        parent = find_parent_ticket(processed_text)
+        if parent is not None:
+            priority, team, model_version = parent.priority, parent.team, parent.model_version
+        else:
+            priority, team, model_version = classify_text(processed_text)
         
         # Save to database
         new_ticket = Ticket(
@@ -79,11 +379,15 @@ def submit_ticket():
             description=description,
             priority=priority,
             team=team,
-            processed_text=processed_text
+            processed_text=processed_text,
+            model_version=model_version,
+            parent_id=parent.id if parent is not None else None
         )
-        
-        db.session.add(new_ticket)
-        db.session.commit()
+        index_ticket(new_ticket)
+        try:
+            save_ticket(new_ticket)
+        except TimeoutError:
+            return render_template('submit.html', error=SAVE_TIMEOUT_ERROR), 503
         
         return redirect(url_for('index'))
     
@@ -91,6 +395,36 @@ def submit_ticket():
     return render_template('submit.html')
 
 
+def save_ticket(ticket, queue_job=False):
+    """
+    Store a new ticket and wait until it is committed.
+    
+    With GROUP_COMMIT on, the ticket is written in a transaction shared with
+    the tickets of concurrent requests; otherwise it is committed on its own.
+    
+    Args:
+        ticket (Ticket): New ticket
+        queue_job (bool, optional): Also queue it for background classification
+    
+    Raises:
+        TimeoutError: If the group commit did not take the ticket within
+                      GROUP_COMMIT_TIMEOUT. It was dropped, not stored, so
+                      submitting it again does not create a duplicate.
+    """
+    def write(session):
+        session.add(ticket)
+        if queue_job:
+            session.flush()
+            enqueue_ticket(ticket, session)
+    
+    with time_stage('db_commit'):
+        if app.config['GROUP_COMMIT']:
+            group_commit_writer.submit(write, timeout=app.config['GROUP_COMMIT_TIMEOUT'])
+        else:
+            write(db.session)
+            db.session.commit()
+
+
 @app.route('/api/classify', methods=['POST'])
 def classify_ticket_api():
     """
@@ -111,7 +445,7 @@ def classify_ticket_api():
             raise BadRequest("Title and description are required")
         
         # Process the ticket
-        priority, team, processed_text = process_ticket(title, description)
+        priority, team, processed_text, model_version = process_ticket(title, description)
         
         # Return the result
         return jsonify({
@@ -119,7 +453,7 @@ def classify_ticket_api():
             'priority': priority,
             'team': team
         })
-        
+    
     except BadRequest as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -127,6 +461,132 @@ def classify_ticket_api():
         return jsonify({'error': 'An error occurred processing the ticket'}), 500
 
 
+@app.route('/api/classify/batch', methods=['POST'])
+def classify_batch_api():
+    """
+    API endpoint for batch ticket classification.
+    Accepts JSON with a list of tickets (either a bare list or under a
+    ``tickets`` key), returns one result per ticket in input order.
+    Tickets that cannot be processed get an ``error`` entry instead of
+    failing the whole batch.
+    """
+    try:
+        data = request.get_json()
+        
+        if isinstance(data, dict):
+            data = data.get('tickets')
+        
+        if not isinstance(data, list):
+            raise BadRequest("Expected a JSON list of tickets")
+        
+        limit = app.config['CLASSIFY_BATCH_LIMIT']
+        if len(data) > limit:
+            raise BadRequest(f"Batch size exceeds the limit of {limit} tickets")
+        
+        results = process_tickets(data)
+        
+        return jsonify({
+            'count': len(results),
+            'results': results
+        })
+    
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error processing batch API request: {e}")
+        return jsonify({'error': 'An error occurred processing the tickets'}), 500
+
+
+@app.route('/api/classify/stream', methods=['POST'])
+def classify_stream_api():
+    """
+    API endpoint for streaming ticket classification.
+    Reads newline-delimited JSON tickets from the request body as it
+    arrives and streams back one NDJSON result per ticket, in input order.
+    Tickets are classified in micro-batches of ``CLASSIFY_STREAM_BATCH``,
+    so memory use does not grow with the size of the upload.
+    """
+    batch_size = app.config['CLASSIFY_STREAM_BATCH']
+    lines = read_ndjson(request.stream, app.config['CLASSIFY_STREAM_MAX_LINE'])
+    
+    def generate():
+        batch = []
+        for entry in lines:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield classify_stream_batch(batch)
+                batch = []
+        if batch:
+            yield classify_stream_batch(batch)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def read_ndjson(stream, max_line):
+    """
+    Read newline-delimited JSON values from a stream one line at a time.
+    
+    Blank lines are skipped. Lines longer than max_line bytes are discarded
+    without being held in memory.
+    
+    Args:
+        stream: Binary file-like object, such as the request body
+        max_line (int): Longest accepted line, in bytes
+    
+    Yields:
+        tuple: (index, value, error) for each non-blank line, where error is
+               None or a message saying why the line could not be parsed
+    """
+    index = 0
+    while True:
+        line = stream.readline(max_line + 1)
+        if not line:
+            return
+        
+        if len(line) > max_line:
+            # Skip the rest of the oversized line
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line + 1)
+            yield index, None, f"Line exceeds the limit of {max_line} bytes"
+            index += 1
+            continue
+        
+        if not line.strip():
+            continue
+        
+        try:
+            yield index, json.loads(line), None
+        except ValueError:
+            yield index, None, 'Invalid JSON'
+        index += 1
+
+
+def classify_stream_batch(entries):
+    """
+    Classify one micro-batch of a streaming request.
+    
+    Args:
+        entries (list): (index, ticket, error) tuples from read_ndjson()
+    
+    Returns:
+        str: One NDJSON result line per entry
+    """
+    tickets = [ticket for _, ticket, error in entries if error is None]
+    try:
+        results = iter(process_tickets(tickets))
+    except Exception as e:
+        # The response has already started, so fail this batch's tickets only
+        logging.error(f"Error processing stream batch: {e}")
+        results = iter([{'error': 'An error occurred processing the ticket'} for _ in tickets])
+    
+    lines = []
+    for index, _, error in entries:
+        result = {'index': index, 'error': error} if error else next(results)
+        result['index'] = index
+        lines.append(json.dumps(result) + '\n')
+    return ''.join(lines)
+
+
 def process_ticket(title, description):
     """
     Process a ticket to determine priority and team assignment.
@@ -134,29 +594,479 @@ def process_ticket(title, description):
     Args:
         title (str): Ticket title
         description (str): Ticket description
-        
+    
     Returns:
-        tuple: (priority, team, processed_text)
+        tuple: (priority, team, processed_text, model_version)
     """
     # Combine and preprocess text
-    processed_text = combine_title_description(title, description)
+    with time_stage('preprocess'):
+        processed_text = combine_title_description(title, description)
+    
+    priority, team, model_version = classify_text(processed_text)
+    return priority, team, processed_text, model_version
+
+
+def classify_text(processed_text):
+    """
+    Determine the priority and team of a preprocessed ticket.
+    
+    Args:
+        processed_text (str): Preprocessed ticket text
+    
+    Returns:
+        tuple: (priority, team, model_version)
+    """
+    classifier = model_registry.current
+    
+    # Reuse the result for identical text classified by the same model
+    cache_key = ResultCache.make_key(processed_text)
+    version = result_version(classifier)
+    cached = result_cache.get(cache_key, version)
+    if cached is not None:
+        cache_requests.inc(result='hit')
+        priority, team = cached
+        return priority, team, classifier.version
+    cache_requests.inc(result='miss')
     
-    # Classify priority
-    priority = classifier.predict(processed_text)
+    # Classify priority, and team with a joint model
+    with time_stage('vectorize'):
+        features = classifier.vectorize([processed_text])
+    with time_stage('predict'):
+        priority, predicted_team, confidence = classifier.classify_features(features)[0]
     
     # Assign team
-    team = get_team_assignment(processed_text)
+    with time_stage('team_assignment'):
+        team = choose_team(processed_text, predicted_team, confidence)
     
-    return priority, team, processed_text
+    result_cache.set(cache_key, (priority, team), version)
+    return priority, team, classifier.version
+
+
+def choose_team(processed_text, predicted_team, confidence):
+    """
+    Pick a ticket's team, using the keyword matcher unless a joint model
+    predicted the team with at least TEAM_MIN_CONFIDENCE.
+    
+    Args:
+        processed_text (str): Preprocessed ticket text
+        predicted_team (str): Team predicted by the model, or None
+        confidence (float): Probability the model gave that team
+    
+    Returns:
+        str: Team
+    """
+    team, source = assign_team(processed_text, predicted_team, confidence, app.config['TEAM_MIN_CONFIDENCE'])
+    team_assignments.inc(source=source)
+    return team
+
+
+def find_parent_ticket(processed_text):
+    """
+    Find the earlier ticket a new ticket near-duplicates.
+    
+    Args:
+        processed_text (str): Preprocessed text of the new ticket
+    
+    Returns:
+        Ticket: Parent of the duplicate group, or None if the ticket is new
+                or duplicate detection is off
+    """
+    if not app.config['DUPLICATE_DETECTION']:
+        return None
+    
+    with time_stage('duplicate_lookup'):
+        match = find_duplicate(processed_text, app.config['DUPLICATE_THRESHOLD'])
+    duplicate_lookups.inc(result='duplicate' if match else 'new')
+    if match is None:
+        return None
+    
+    parent, similarity = match
+    logging.info(f"Ticket duplicates ticket {parent.id} (similarity {similarity:.2f})")
+    return parent
+
+
+def result_version(classifier):
+    """
+    Get the version that cached classification results are tied to.
+    
+    Combines the classifier version and the team keyword table version, so
+    reloading either invalidates every cached result.
+    
+    Args:
+        classifier (TicketClassifier): Classifier producing the results
+    
+    Returns:
+        str: Result version
+    """
+    return f"{classifier.version}:{get_matcher().version}"
+
+
+def process_tickets(tickets):
+    """
+    Process a batch of tickets to determine priority and team assignment.
+    
+    All valid tickets are classified with a single vectorized model call.
+    
+    Args:
+        tickets (list): List of dicts with ``title`` and ``description`` keys
+    
+    Returns:
+        list: One result dict per ticket, in input order. Successful results
+              contain ``title``, ``priority`` and ``team``; failed ones
+              contain ``error``.
+    """
+    classifier = model_registry.current
+    results = [None] * len(tickets)
+    pending = []  # (index, title, processed_text)
+    
+    # Validate and preprocess each ticket, recording per-item errors
+    for index, ticket in enumerate(tickets):
+        if not isinstance(ticket, dict):
+            results[index] = {'index': index, 'error': 'Ticket must be a JSON object'}
+            continue
+        
+        title = ticket.get('title')
+        description = ticket.get('description')
+        
+        if not title or not description:
+            results[index] = {'index': index, 'error': 'Title and description are required'}
+            continue
+        
+        try:
+            processed_text = combine_title_description(title, description)
+        except Exception as e:
+            logging.error(f"Error preprocessing batch item {index}: {e}")
+            results[index] = {'index': index, 'error': 'An error occurred processing the ticket'}
+            continue
+        
+        pending.append((index, title, processed_text))
+    
+    # Serve cached results and collect the rest for classification
+    version = result_version(classifier)
+    uncached = []
+    for index, title, processed_text in pending:
+        cache_key = ResultCache.make_key(processed_text)
+        cached = result_cache.get(cache_key, version)
+        if cached is not None:
+            priority, team = cached
+            results[index] = {'index': index, 'title': title, 'priority': priority, 'team': team}
+        else:
+            uncached.append((index, title, processed_text, cache_key))
+    
+    cache_requests.inc(len(pending) - len(uncached), result='hit')
+    cache_requests.inc(len(uncached), result='miss')
+    
+    # Classify the whole batch at once
+    predictions = classifier.classify_many([text for _, _, text, _ in uncached])
+    
+    for (index, title, processed_text, cache_key), (priority, predicted_team, confidence) in zip(uncached, predictions):
+        team = choose_team(processed_text, predicted_team, confidence)
+        result_cache.set(cache_key, (priority, team), version)
+        results[index] = {
+            'index': index,
+            'title': title,
+            'priority': priority,
+            'team': team
+        }
+    
+    return results
 
 
 @app.route('/tickets')
 def view_tickets():
     """
-    View all tickets in the database.
+    View all tickets in the database, one page at a time.
+    Pages are navigated with the ``cursor`` query parameter.
     """
-    tickets = Ticket.query.order_by(Ticket.created_at.desc()).all()
-    return render_template('tickets.html', tickets=tickets)
+    cursor = request.args.get('cursor')
+    
+    try:
+        with time_stage('db_query'):
+            tickets, next_cursor = paginate_tickets(cursor=cursor, limit=app.config['TICKETS_PAGE_SIZE'])
+    except ValueError:
+        # Stale or mangled cursor - start again from the newest tickets
+        return redirect(url_for('view_tickets'))
+    
+    with time_stage('render'):
+        return render_template('tickets.html', tickets=tickets, cursor=cursor, next_cursor=next_cursor)
+
+
+@app.route('/api/tickets', methods=['GET'])
+def list_tickets_api():
+    """
+    API endpoint for listing tickets, newest first.
+    Query parameters:
+        cursor: ``next_cursor`` from the previous page
+        limit: Page size
+        fields: Comma-separated list of fields to return
+    """
+    try:
+        limit = request.args.get('limit', app.config['TICKETS_PAGE_SIZE'], type=int)
+        if limit is None or not 1 <= limit <= app.config['TICKETS_MAX_PAGE_SIZE']:
+            raise BadRequest(f"limit must be between 1 and {app.config['TICKETS_MAX_PAGE_SIZE']}")
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in Ticket.FIELDS]
+            if unknown:
+                raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+        
+        try:
+            tickets, next_cursor = paginate_tickets(
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                columns=fields
+            )
+        except ValueError as e:
+            raise BadRequest(str(e))
+        
+        return jsonify({
+            'tickets': [ticket.to_dict(fields) for ticket in tickets],
+            'next_cursor': next_cursor
+        })
+    
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/api/tickets/<int:ticket_id>/status', methods=['GET'])
+def ticket_status_api(ticket_id):
+    """
+    API endpoint for the classification status of a ticket.
+    Tickets submitted in asynchronous mode are ``pending`` until a
+    background worker classifies them, then ``classified``, or ``failed``
+    once every retry has failed.
+    """
+    ticket = db.session.get(Ticket, ticket_id)
+    if ticket is None:
+        return jsonify({'error': 'Ticket not found'}), 404
+    
+    data = ticket.to_dict(['id', 'status', 'priority', 'team'])
+    job = latest_job(ticket_id)
+    if job is not None:
+        data['job'] = {
+            'status': job.status,
+            'attempts': job.attempts,
+            'error': job.last_error
+        }
+    return jsonify(data)
+
+
+@app.route('/api/tickets/<int:ticket_id>/similar', methods=['GET'])
+def similar_tickets_api(ticket_id):
+    """
+    API endpoint for the tickets most similar to a ticket, by cosine
+    similarity of their TF-IDF vectors.
+    Query parameters:
+        k: Number of tickets to return (default 5)
+    """
+    try:
+        k = request.args.get('k', 5, type=int)
+        if not 1 <= k <= app.config['SIMILAR_MAX_K']:
+            raise BadRequest(f"k must be between 1 and {app.config['SIMILAR_MAX_K']}")
+        
+        ticket = db.session.get(Ticket, ticket_id)
+        if ticket is None:
+            return jsonify({'error': 'Ticket not found'}), 404
+        
+        classifier = model_registry.current
+        text = None
+        if ticket.processed_text is None and ticket.id not in ticket_similarity.get(classifier):
+            # Pending tickets have not been preprocessed yet
+            with time_stage('preprocess'):
+                text = combine_title_description(ticket.title, ticket.description)
+        
+        with time_stage('similarity'):
+            results = ticket_similarity.similar(ticket, classifier, k, text)
+        
+        return jsonify({
+            'id': ticket_id,
+            'results': [dict(similar.to_dict(), score=score) for similar, score in results]
+        })
+    
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error finding tickets similar to {ticket_id}: {e}")
+        return jsonify({'error': 'An error occurred finding similar tickets'}), 500
+
+
+@app.route('/api/tickets/<int:ticket_id>', methods=['PATCH'])
+def correct_ticket_api(ticket_id):
+    """
+    Admin endpoint for an agent to correct a ticket's priority.
+    Accepts JSON with ``priority`` and an optional ``corrected_by``. Each
+    change is recorded as a correction, which the incremental trainer
+    (python -m tools.retrain_corrections) feeds back into the model.
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    ticket = db.session.get(Ticket, ticket_id)
+    if ticket is None:
+        return jsonify({'error': 'Ticket not found'}), 404
+    
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            raise BadRequest("No JSON data received")
+        
+        priority = data.get('priority')
+        if priority not in PRIORITIES:
+            raise BadRequest(f"priority must be one of {', '.join(PRIORITIES)}")
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if ticket.status != STATUS_CLASSIFIED:
+        return jsonify({'error': 'Ticket has not been classified yet'}), 409
+    
+    if priority != ticket.priority:
+        db.session.add(PriorityCorrection(
+            ticket_id=ticket.id,
+            old_priority=ticket.priority,
+            new_priority=priority,
+            model_version=ticket.model_version,
+            corrected_by=data.get('corrected_by')
+        ))
+        ticket.priority = priority
+        db.session.commit()
+    
+    return jsonify(ticket.to_dict())
+
+
+def admin_authorized():
+    """
+    Check the request's bearer token against ADMIN_TOKEN.
+    
+    Returns:
+        bool: True if admin endpoints are enabled and the token matches
+    """
+    token = app.config['ADMIN_TOKEN']
+    supplied = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8'))
+
+
+@app.route('/api/admin/model', methods=['GET'])
+def model_info_api():
+    """
+    Admin endpoint describing the model this worker is serving.
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(model_registry.info())
+
+
+@app.route('/api/admin/model/reload', methods=['POST'])
+def reload_model_api():
+    """
+    Admin endpoint that loads the model from disk and swaps it in.
+    Requests in flight finish with the model they started with. Only the
+    worker serving this request reloads; set MODEL_WATCH_INTERVAL to have
+    every worker pick up a new model by itself.
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    try:
+        reloaded = model_registry.reload()
+    except Exception as e:
+        logging.error(f"Error reloading model: {e}")
+        return jsonify({'error': 'The model could not be loaded; the previous model is still in use'}), 500
+    
+    return jsonify(dict(model_registry.info(), reloaded=reloaded))
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_api():
+    """
+    Prometheus metrics endpoint. With METRICS_DIR set, reports the totals
+    of every worker process, whichever worker answers the scrape.
+    """
+    return Response(metrics_registry.render(), content_type=CONTENT_TYPE)
+
+
+@app.route('/api/tickets/search', methods=['GET'])
+def search_tickets_api():
+    """
+    API endpoint for full-text ticket search, best matches first.
+    Query parameters:
+        q: Search text (required)
+        priority: Only return tickets with this priority
+        team: Only return tickets assigned to this team
+        limit: Page size
+        page: 1-based page number
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise BadRequest("Search query is required")
+        
+        limit = request.args.get('limit', 20, type=int)
+        if limit is None or not 1 <= limit <= app.config['TICKETS_MAX_PAGE_SIZE']:
+            raise BadRequest(f"limit must be between 1 and {app.config['TICKETS_MAX_PAGE_SIZE']}")
+        
+        page = request.args.get('page', 1, type=int)
+        if page is None or page < 1:
+            raise BadRequest("page must be a positive integer")
+        
+        # Ranked results are paged by offset, so keep pages shallow
+        offset = (page - 1) * limit
+        if offset > app.config['SEARCH_MAX_OFFSET']:
+            raise BadRequest("Page is too deep; refine the search instead")
+        
+        results, has_more = search_tickets(
+            query,
+            app.config['SEARCH_BACKEND'],
+            priority=request.args.get('priority'),
+            team=request.args.get('team'),
+            limit=limit,
+            offset=offset
+        )
+        
+        return jsonify({
+            'query': query,
+            'page': page,
+            'has_more': has_more,
+            'results': [dict(ticket.to_dict(), score=score) for ticket, score in results]
+        })
+    
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error processing search request: {e}")
+        return jsonify({'error': 'An error occurred searching tickets'}), 500
+
+
+@app.route('/api/stats', methods=['GET'])
+def stats_api():
+    """
+    API endpoint for ticket counts by priority and team, served from
+    summary tables that are updated with every ticket change.
+    Query parameters:
+        hours: Number of hourly buckets to return, ending with the current hour
+    """
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        if hours is None or not 1 <= hours <= app.config['STATS_MAX_HOURS']:
+            raise BadRequest(f"hours must be between 1 and {app.config['STATS_MAX_HOURS']}")
+        
+        maintained = app.config['STATS_TRIGGERS']
+        counts, total = ticket_counts(maintained)
+        since = recent_hours(hours)
+        
+        return jsonify({
+            'total': total,
+            'counts': counts,
+            'since': since.strftime('%Y-%m-%d %H:%M:%S'),
+            'hourly': hourly_counts(maintained, since)
+        })
+    
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error processing stats request: {e}")
+        return jsonify({'error': 'An error occurred reading ticket statistics'}), 500
 
 
 @app.errorhandler(404)
@@ -183,6 +1093,10 @@ if __name__ == '__main__':
         from model.train_model import train_model
         train_model()
         logging.info("Model training completed.")
+        model_registry.reload()
+    
+    warmup()
+    start_model_watcher()
     
     # Get port from environment variable or use default
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,4 @@
+"""
+Initialization file for the benchmarks package.
+Makes the package importable.
+"""
@@ -0,0 +1,110 @@
+"""
+Throughput of ticket inserts with and without group commit.
+
+Writes synthetic tickets from concurrent threads to a fresh SQLite
+database, the way concurrent /submit requests do, once committing every
+ticket on its own and once through GroupCommitWriter, and reports tickets
+per second, commit latency and the mean number of tickets per commit.
+Classification is left out: only the storage path is measured.
+
+Usage:
+    python -m benchmarks.bench_group_commit [--tickets N] [--threads N]
+        [--window MS] [--max-batch N] [--synchronous NORMAL|FULL]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy.orm import Session
+
+from benchmarks.corpus import generate_tickets
+from tools.import_tickets import create_app
+from database.models import db, Ticket
+from database.group_commit import GroupCommitWriter
+
+def run_threads(tickets, threads, save):
+    """
+    Save the tickets from several threads, each taking every n-th ticket.
+    
+    Returns:
+        tuple: Tickets per second and the sorted per-ticket latencies
+    """
+    latencies = []
+    
+    def worker(offset):
+        for ticket in tickets[offset::threads]:
+            started = time.perf_counter()
+            save(ticket)
+            latencies.append(time.perf_counter() - started)
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return len(tickets) / (time.perf_counter() - started), sorted(latencies)
+
+def new_tickets(rows):
+    """Build unsaved Ticket objects from corpus rows"""
+    return [
+        Ticket(title=row['Title'], description=row['Description'], priority=row['Priority'], team=row['Team'])
+        for row in rows
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickets', type=int, default=2000, help='tickets to insert per mode (default: 2000)')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent writers (default: 16)')
+    parser.add_argument('--window', type=float, default=5, help='group commit window in ms (default: 5)')
+    parser.add_argument('--max-batch', type=int, default=100, help='largest group commit (default: 100)')
+    parser.add_argument('--synchronous', default='NORMAL', help='SQLite sync level (default: NORMAL)')
+    args = parser.parse_args()
+    
+    os.environ['SQLITE_SYNCHRONOUS'] = args.synchronous
+    rows = list(generate_tickets(args.tickets))
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app = create_app('sqlite:///' + os.path.join(temp_dir, 'tickets.db'))
+        with app.app_context():
+            engine = db.engine
+            
+            def save_alone(ticket):
+                with Session(engine) as session:
+                    session.add(ticket)
+                    session.commit()
+            
+            sizes = []
+            writer = GroupCommitWriter(engine, window=args.window / 1000, max_batch=args.max_batch,
+                                       on_commit=lambda size, seconds: sizes.append(size))
+            
+            def save_grouped(ticket):
+                writer.submit(lambda session: session.add(ticket))
+            
+            results = {
+                'single': run_threads(new_tickets(rows), args.threads, save_alone),
+                'group': run_threads(new_tickets(rows), args.threads, save_grouped)
+            }
+            writer.close()
+            stored = Ticket.query.count()
+            db.engine.dispose()
+    
+    print(f"Tickets:     {len(rows)} per mode, {args.threads} threads, synchronous={args.synchronous}")
+    print(f"Group:       window {args.window:g} ms, max batch {args.max_batch}, "
+          f"{statistics.mean(sizes):.1f} tickets per commit")
+    print(f"{'mode':<8} {'tickets/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, (throughput, latencies) in results.items():
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{name:<8} {throughput:10.0f} {p50:8.2f} {p99:8.2f}")
+    return 0 if stored == 2 * len(rows) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
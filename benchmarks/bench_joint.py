@@ -0,0 +1,106 @@
+"""
+Joint priority+team model against the two-stage path.
+
+The two-stage path predicts the priority with a priority-only model and
+then scans the text with the team keyword matcher. The joint path
+predicts both from one vectorization with a model trained on priorities
+and teams, and uses the keyword matcher only for teams predicted with a
+probability below --min-confidence.
+
+Both models are trained on one synthetic corpus and scored on another
+(a different seed), one ticket at a time and as one batch. Reports
+latency, throughput, accuracy of both outputs and how often the joint
+path fell back to the keyword matcher. Texts are scored as generated,
+without NLTK preprocessing, which both paths would share.
+
+Usage:
+    python -m benchmarks.bench_joint [--train N] [--tickets N]
+        [--min-confidence P]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.corpus import generate_tickets
+from model.classifier import TicketClassifier
+from utils.team_assignment import assign_team, get_team_assignment
+
+def two_stage(classifier):
+    """Classify a batch with a priority-only model and the keyword matcher"""
+    def classify(texts):
+        priorities = classifier.predict_features(classifier.vectorize(texts))
+        return [(priority, get_team_assignment(text), 'keywords') for priority, text in zip(priorities, texts)]
+    return classify
+
+def joint(classifier, min_confidence):
+    """Classify a batch with a joint model, falling back to the keyword matcher"""
+    def classify(texts):
+        results = []
+        for (priority, team, confidence), text in zip(classifier.classify_features(classifier.vectorize(texts)), texts):
+            team, source = assign_team(text, team, confidence, min_confidence)
+            results.append((priority, team, source))
+        return results
+    return classify
+
+def measure(classify, texts):
+    """
+    Classify every text on its own, then all of them as one batch.
+    
+    Returns:
+        tuple: Sorted single-ticket latencies, batch tickets per second and
+               the batch results
+    """
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        classify([text])
+        latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    results = classify(texts)
+    return sorted(latencies), len(texts) / (time.perf_counter() - started), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--train', type=int, default=20000, help='training tickets (default: 20000)')
+    parser.add_argument('--tickets', type=int, default=5000, help='scored tickets (default: 5000)')
+    parser.add_argument('--min-confidence', type=float, default=0.5,
+                        help='lowest team probability used without the keyword matcher (default: 0.5)')
+    args = parser.parse_args()
+    
+    train = list(generate_tickets(args.train, seed=0))
+    test = list(generate_tickets(args.tickets, seed=1))
+    train_texts = [f"{t['Title']} {t['Description']}" for t in train]
+    texts = [f"{t['Title']} {t['Description']}" for t in test]
+    
+    priorities = [t['Priority'] for t in train]
+    models = {
+        'two-stage': two_stage(TicketClassifier().train(train_texts, priorities)),
+        'joint': joint(TicketClassifier().train(train_texts, priorities, [t['Team'] for t in train]),
+                       args.min_confidence)
+    }
+    
+    # One untimed call each, so lazy imports and caches are warm
+    for classify in models.values():
+        classify(texts[:10])
+    
+    print(f"Tickets:    {len(train)} trained, {len(texts)} scored, min confidence {args.min_confidence:g}")
+    print(f"{'path':<10} {'p50 us':>8} {'p99 us':>8} {'batch/s':>9} {'priority':>9} {'team':>7} {'keywords':>9}")
+    for name, classify in models.items():
+        latencies, throughput, results = measure(classify, texts)
+        priority_accuracy = statistics.mean(r[0] == t['Priority'] for r, t in zip(results, test))
+        team_accuracy = statistics.mean(r[1] == t['Team'] for r, t in zip(results, test))
+        fallbacks = statistics.mean(r[2] == 'keywords' for r in results)
+        p50 = statistics.median(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"{name:<10} {p50:8.1f} {p99:8.1f} {throughput:9.0f} {priority_accuracy:9.3f} "
+              f"{team_accuracy:7.3f} {fallbacks:9.1%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Microbenchmark for the text preprocessing engine.
+
+Compares the step-by-step preprocessing functions (clean_text,
+remove_stopwords, lemmatize_text) with the single-pass TextPreprocessor
+on the sample tickets, and checks that both produce the same output.
+
+Usage:
+    python -m benchmarks.bench_preprocessing [--repeat N]
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+
+# Add parent directory to path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_preprocessing import (
+    clean_text,
+    remove_stopwords,
+    lemmatize_text,
+    TextPreprocessor
+)
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model', 'sample_tickets.csv'
+)
+
+def load_texts():
+    """
+    Load the combined title and description text of every sample ticket.
+    
+    Returns:
+        list: Combined ticket texts
+    """
+    with open(DATASET_PATH, newline='', encoding='utf-8') as f:
+        return [
+            row['Title'] + " " + row['Title'] + " " + row['Description']
+            for row in csv.DictReader(f)
+        ]
+
+def staged_preprocess(text):
+    """
+    Preprocess text by running each stage function in sequence.
+    
+    Args:
+        text (str): The text to preprocess
+    
+    Returns:
+        str: Fully preprocessed text
+    """
+    return lemmatize_text(remove_stopwords(clean_text(text)))
+
+def time_per_ticket(func, texts, repeat):
+    """
+    Measure the mean time spent per ticket.
+    
+    Args:
+        func (callable): Preprocessing function taking one text
+        texts (list): Ticket texts
+        repeat (int): Number of passes over the texts
+    
+    Returns:
+        float: Mean seconds per ticket
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='passes over the sample tickets')
+    args = parser.parse_args()
+    
+    texts = load_texts()
+    engine = TextPreprocessor()
+    
+    # Both paths must agree before their speed is worth comparing
+    mismatches = sum(staged_preprocess(text) != engine.preprocess(text) for text in texts)
+    if mismatches:
+        print(f"ERROR: {mismatches} of {len(texts)} tickets differ between implementations")
+        return 1
+    
+    staged = time_per_ticket(staged_preprocess, texts, args.repeat)
+    single_pass = time_per_ticket(engine.preprocess, texts, args.repeat)
+    
+    print(f"Tickets:           {len(texts)} x {args.repeat} passes")
+    print(f"Staged functions:  {staged * 1e6:10.1f} us/ticket")
+    print(f"TextPreprocessor:  {single_pass * 1e6:10.1f} us/ticket")
+    print(f"Speedup:           {staged / single_pass:10.2f}x")
+    print(f"Lemma cache:       {engine.cache_info()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Latency comparison of the model inference paths.
+
+Scores the same synthetic tickets, one at a time and as one batch, with:
+
+    pipeline    Pipeline.predict([text])
+    sklearn     vectorizer.transform + MultiOutputClassifier.predict
+    compact     CompactLinearModel.predict (float32, sparse matrices)
+    native      NativeLinearScorer.predict, which TicketClassifier serves with
+    native-mmap NativeLinearScorer over the compact model's memory-mapped arrays
+
+and checks that the native scorer's predictions match the pipeline's.
+Texts are scored as generated, without NLTK preprocessing, which every
+path would share.
+
+Usage:
+    python -m benchmarks.bench_scorer [--tickets N] [--model PATH]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.corpus import generate_tickets
+from model.classifier import TicketClassifier
+from model.compact_model import CompactLinearModel, export_pipeline
+from model.native_scorer import NativeLinearScorer
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.pkl')
+
+def time_single(predict, texts):
+    """
+    Time predict on each text on its own.
+    
+    Returns:
+        tuple: p50 and p99 latency in microseconds
+    """
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        predict([text])
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return (statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6)
+
+def time_batch(predict, texts):
+    """
+    Time predict on all texts at once.
+    
+    Returns:
+        float: Tickets per second
+    """
+    started = time.perf_counter()
+    predict(texts)
+    return len(texts) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickets', type=int, default=5000, help='synthetic tickets to score (default: 5000)')
+    parser.add_argument('--model', default=MODEL_PATH, help='pickled model (default: ticket_classifier.pkl)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default: 0)')
+    args = parser.parse_args()
+    
+    classifier = TicketClassifier(args.model)
+    if classifier.scorer is None:
+        print(f"{args.model} is not a TF-IDF model; the native scorer does not apply")
+        return 1
+    
+    texts = [f"{t['Title']} {t['Description']}" for t in generate_tickets(args.tickets, seed=args.seed)]
+    
+    pipeline = classifier.pipeline
+    vectorizer = pipeline.named_steps['vectorizer']
+    estimators = pipeline.named_steps['classifier']
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        compact_path = os.path.join(temp_dir, 'model.compact')
+        export_pipeline(pipeline, compact_path)
+        compact = CompactLinearModel(compact_path)
+        
+        paths = {
+            'pipeline': pipeline.predict,
+            'sklearn': lambda batch: estimators.predict(vectorizer.transform(batch)),
+            'compact': compact.predict,
+            'native': classifier.scorer.predict,
+            'native-mmap': NativeLinearScorer.from_compact(compact).predict
+        }
+        
+        # One untimed call each, so lazy imports and caches are warm
+        for predict in paths.values():
+            predict(texts[:10])
+        
+        results = {
+            name: time_single(predict, texts) + (time_batch(predict, texts),)
+            for name, predict in paths.items()
+        }
+        mismatches = int((classifier.scorer.predict(texts) != pipeline.predict(texts)).any(axis=1).sum())
+    
+    print(f"Tickets:    {len(texts)}")
+    print(f"Vocabulary: {len(vectorizer.vocabulary_)} terms")
+    print(f"{'path':<11} {'p50 us':>10} {'p99 us':>10} {'batch/s':>12} {'speedup':>9}")
+    baseline = results['pipeline'][0]
+    for name, (p50, p99, throughput) in results.items():
+        print(f"{name:<11} {p50:10.1f} {p99:10.1f} {throughput:12.0f} {baseline / p50:8.1f}x")
+    print(f"Native predictions differing from the pipeline: {mismatches}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Latency of similar-ticket queries on the TF-IDF index.
+
+Vectorizes a synthetic corpus with a TfidfVectorizer fitted on it, the
+way a model trained on that many tickets would, and measures building
+the index, top-k queries with and without pruning (with the share of the
+exact top k that pruning keeps), appending single tickets, and saving
+and loading the index file.
+
+Usage:
+    python -m benchmarks.bench_similarity [--tickets N] [--queries N]
+        [--k N] [--prune-df F]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks.corpus import generate_tickets
+from model.similarity_index import SimilarityIndex
+
+def time_queries(index, matrix, rows, k):
+    """
+    Query the index with some of its own rows.
+    
+    Returns:
+        tuple: Sorted latencies and the result ids of each query
+    """
+    latencies = []
+    results = []
+    for row in rows:
+        started = time.perf_counter()
+        matches = index.query(matrix[row], k, exclude=[row])
+        latencies.append(time.perf_counter() - started)
+        results.append([ticket_id for ticket_id, _ in matches])
+    return sorted(latencies), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickets', type=int, default=50000, help='indexed tickets (default: 50000)')
+    parser.add_argument('--queries', type=int, default=500, help='queries per mode (default: 500)')
+    parser.add_argument('--k', type=int, default=10, help='results per query (default: 10)')
+    parser.add_argument('--prune-df', type=float, default=0.01,
+                        help='largest share of tickets a pruning term may occur in (default: 0.01)')
+    args = parser.parse_args()
+    
+    texts = [f"{row['Title']} {row['Description']}".lower() for row in generate_tickets(args.tickets)]
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)
+    matrix = vectorizer.fit_transform(texts).tocsr()
+    ids = list(range(len(texts)))
+    
+    started = time.perf_counter()
+    full = SimilarityIndex(matrix.shape[1])
+    full.add(ids, matrix)
+    build = time.perf_counter() - started
+    pruned = SimilarityIndex(matrix.shape[1], prune_df=args.prune_df)
+    pruned.add(ids, matrix)
+    
+    step = max(1, len(texts) // args.queries)
+    rows = list(range(0, len(texts), step))[:args.queries]
+    results = {
+        'full': time_queries(full, matrix, rows, args.k),
+        f'pruned {args.prune_df:g}': time_queries(pruned, matrix, rows, args.k)
+    }
+    exact = results['full'][1]
+    
+    # Appending one ticket at a time, as the index catches up with new tickets
+    appended = SimilarityIndex(matrix.shape[1])
+    appended.add(ids[:-1000], matrix[:-1000])
+    add_latencies = []
+    for row in range(len(texts) - 1000, len(texts)):
+        started = time.perf_counter()
+        appended.add([row], matrix[row])
+        add_latencies.append(time.perf_counter() - started)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'similarity_index.npz')
+        started = time.perf_counter()
+        full.save(path)
+        save = time.perf_counter() - started
+        started = time.perf_counter()
+        SimilarityIndex.load(path)
+        load = time.perf_counter() - started
+        size = os.path.getsize(path)
+    
+    print(f"Tickets:     {len(texts)}, {matrix.shape[1]} features, {matrix.nnz / len(texts):.0f} terms per ticket")
+    print(f"Build:       {build:.2f}s")
+    print(f"File:        {size / 1e6:.1f} MB, saved in {save:.2f}s, loaded in {load:.2f}s")
+    print(f"Append:      {statistics.mean(add_latencies) * 1000:.2f} ms per ticket")
+    print(f"{'mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'recall':>8}")
+    for name, (latencies, found) in results.items():
+        recall = statistics.mean(
+            len(set(a) & set(b)) / len(b) if b else 1.0 for a, b in zip(found, exact)
+        )
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{name:<10} {p50:8.2f} {p99:8.2f} {recall:8.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
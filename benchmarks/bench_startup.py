@@ -0,0 +1,90 @@
+"""
+Cold start benchmark for the web application.
+
+Measures, each in a fresh interpreter, how long ``import app`` takes and
+how long the first /api/classify request takes with and without calling
+warmup() beforehand. A second request with a different ticket shows the
+steady-state latency.
+Runs against a throwaway SQLite database.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat N]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a child interpreter and prints its timings as JSON
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import app
+timings = {'import': time.perf_counter() - started}
+timings['heavy_modules'] = sorted(m for m in ('nltk', 'sklearn', 'pandas') if m in sys.modules)
+if WARMUP:
+    timings['warmup'] = app.warmup()
+client = app.app.test_client()
+tickets = {
+    'first_request': {'title': 'VPN not connecting', 'description': 'Remote staff cannot reach the VPN gateway'},
+    'second_request': {'title': 'Printer offline', 'description': 'The third floor printer shows as offline'}
+}
+for name, ticket in tickets.items():
+    started = time.perf_counter()
+    response = client.post('/api/classify', json=ticket)
+    timings[name] = time.perf_counter() - started
+    assert response.status_code == 200, response.get_data(as_text=True)
+print(json.dumps(timings))
+"""
+
+def run_probe(warmup, database_url):
+    """
+    Start the application in a new interpreter and time it.
+    
+    Args:
+        warmup (bool): Call warmup() before the first request
+        database_url (str): Database for the application
+    
+    Returns:
+        dict: Timings in seconds, and which heavy modules were imported
+    """
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run(
+        [sys.executable, '-c', f"WARMUP = {warmup}\n{PROBE}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Application probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per mode')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_url = f"sqlite:///{os.path.join(temp_dir, 'bench.db')}"
+        runs = {
+            mode: [run_probe(mode == 'warm', database_url) for _ in range(args.repeat)]
+            for mode in ('cold', 'warm')
+        }
+    
+    def median_ms(mode, key):
+        return statistics.median(run[key] for run in runs[mode]) * 1000
+    
+    print(f"Runs per mode:               {args.repeat} (medians shown)")
+    print(f"Heavy modules after import:  {', '.join(runs['cold'][0]['heavy_modules']) or 'none'}")
+    print(f"import app:                  {median_ms('cold', 'import'):8.1f} ms")
+    print(f"First request, cold:         {median_ms('cold', 'first_request'):8.1f} ms")
+    print(f"warmup():                    {median_ms('warm', 'warmup'):8.1f} ms")
+    print(f"First request, warmed up:    {median_ms('warm', 'first_request'):8.1f} ms")
+    print(f"Second request:              {median_ms('warm', 'second_request'):8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
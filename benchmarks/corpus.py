@@ -0,0 +1,146 @@
+"""
+Synthetic ticket corpus for benchmarks.
+
+Generates any number of realistic tickets from model/sample_tickets.csv.
+Each synthetic ticket takes the title, priority and team of a sample
+ticket, shuffles its description sentences, borrows a sentence from
+another ticket of the same team, and adds the kind of variable detail
+real tickets carry (host names, error codes, ticket references). The
+vocabulary therefore keeps growing with the corpus, as it does in
+production, instead of repeating 40 texts. Output is deterministic for a
+given seed.
+
+Usage (write a CSV with the same columns as the sample data):
+    python -m benchmarks.corpus 100000 synthetic_tickets.csv [--seed N]
+"""
+import os
+import re
+import sys
+import csv
+import random
+import argparse
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model', 'sample_tickets.csv'
+)
+
+TITLE_PREFIXES = ['', '', '', 'Urgent: ', 'Re: ', 'Follow-up: ', 'Still broken: ', 'FW: ']
+
+DETAILS = [
+    "Affected host is {host}.",
+    "The error code shown is {code}.",
+    "This is related to ticket #{ref}.",
+    "Reported by {user} in the {site} office.",
+    "It started around {hour}:{minute:02d} today.",
+    "{count} users are affected so far.",
+    "Asset tag {tag} if that helps."
+]
+
+SITES = ['London', 'Pune', 'Austin', 'Berlin', 'Toronto', 'Sydney', 'Dublin', 'Singapore']
+
+def parse_scale(value):
+    """
+    Parse a corpus size such as ``1000``, ``100k`` or ``1M``.
+    
+    Args:
+        value (str): Corpus size
+    
+    Returns:
+        int: Number of tickets
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([kKmM]?)\s*', str(value))
+    if not match:
+        raise ValueError(f"Invalid corpus size: {value!r}")
+    multiplier = {'': 1, 'k': 1000, 'm': 1000000}[match.group(2).lower()]
+    return int(match.group(1)) * multiplier
+
+def load_samples(dataset_path=DATASET_PATH):
+    """
+    Load the sample tickets used as templates.
+    
+    Args:
+        dataset_path (str, optional): CSV with Title, Description, Priority and Team columns
+    
+    Returns:
+        list: Sample ticket rows
+    """
+    with open(dataset_path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def generate_tickets(count, seed=0, samples=None):
+    """
+    Generate synthetic tickets one at a time.
+    
+    Args:
+        count (int): Number of tickets
+        seed (int, optional): Random seed
+        samples (list, optional): Template rows. Defaults to the sample tickets.
+    
+    Yields:
+        dict: Ticket with Title, Description, Priority and Team keys
+    """
+    rng = random.Random(seed)
+    samples = samples or load_samples()
+    
+    sentences = [re.split(r'(?<=[.!?])\s+', row['Description'].strip()) for row in samples]
+    by_team = {}
+    for index, row in enumerate(samples):
+        by_team.setdefault(row['Team'], []).append(index)
+    
+    for _ in range(count):
+        index = rng.randrange(len(samples))
+        row = samples[index]
+        
+        description = list(sentences[index])
+        rng.shuffle(description)
+        other = rng.choice(by_team[row['Team']])
+        description.append(rng.choice(sentences[other]))
+        
+        for template in rng.sample(DETAILS, rng.randint(0, 3)):
+            description.append(template.format(
+                host=f"srv-{rng.randrange(10000):04d}",
+                code=f"0x{rng.randrange(1 << 32):08X}",
+                ref=rng.randrange(100000),
+                user=f"user{rng.randrange(5000)}",
+                site=rng.choice(SITES),
+                hour=rng.randrange(24),
+                minute=rng.randrange(60),
+                count=rng.randint(1, 500),
+                tag=f"IT-{rng.randrange(100000):05d}"
+            ))
+        
+        yield {
+            'Title': rng.choice(TITLE_PREFIXES) + row['Title'],
+            'Description': ' '.join(description),
+            'Priority': row['Priority'],
+            'Team': row['Team']
+        }
+
+def write_csv(path, count, seed=0):
+    """
+    Write a synthetic corpus as a CSV with the sample data's columns.
+    
+    Args:
+        path (str): Output file
+        count (int): Number of tickets
+        seed (int, optional): Random seed
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['ID', 'Title', 'Description', 'Priority', 'Team'])
+        writer.writeheader()
+        for ticket_id, ticket in enumerate(generate_tickets(count, seed), 1):
+            writer.writerow(dict(ticket, ID=ticket_id))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic ticket corpus as CSV.')
+    parser.add_argument('size', help='number of tickets, e.g. 1000, 100k or 1M')
+    parser.add_argument('path', help='output CSV file')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    args = parser.parse_args(argv)
+    
+    write_csv(args.path, parse_scale(args.size), args.seed)
+    print(f"Wrote {args.size} tickets to {args.path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+"""
+Benchmark suite for every stage of ticket processing.
+
+Streams a synthetic corpus (see benchmarks.corpus) through each stage of
+process_ticket and reports, per stage, throughput, p50/p99 latency and
+peak memory:
+
+    clean_text, remove_stopwords, lemmatize_text   staged preprocessing
+    preprocess            combine_title_description (single-pass engine)
+    team_assignment       get_team_assignment
+    predict               TicketClassifier.predict, one ticket per call
+    predict_many          TicketClassifier.predict_many, one batch per call
+    route_classify        POST /api/classify through the Flask test client
+    route_classify_batch  POST /api/classify/batch through the Flask test client
+
+The corpus is generated on the fly, so memory does not grow with the
+scale. Latency is measured per call without tracing; peak memory is
+measured in a separate pass with tracemalloc over a sample of the corpus.
+Results are written as JSON, and --compare checks them against an
+earlier run, exiting with status 1 if any stage got slower than the
+threshold.
+
+Usage:
+    python -m benchmarks.suite [--scales 1k 100k 1M] [--output results.json]
+    python -m benchmarks.suite --scales 1k --compare benchmarks/results/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import from the project packages
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks.corpus import generate_tickets, parse_scale
+from utils.text_preprocessing import clean_text, remove_stopwords, lemmatize_text, combine_title_description
+from utils.team_assignment import get_team_assignment
+from model.classifier import load_classifier
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.pkl')
+COMPACT_MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.compact')
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+
+STAGES = [
+    'clean_text',
+    'remove_stopwords',
+    'lemmatize_text',
+    'preprocess',
+    'team_assignment',
+    'predict',
+    'predict_many',
+    'route_classify',
+    'route_classify_batch'
+]
+ROUTE_STAGES = ('route_classify', 'route_classify_batch')
+
+class StageTimer:
+    """
+    Collects per-call latencies of one stage.
+    """
+    
+    def __init__(self):
+        self.samples = []
+        self.items = 0
+    
+    def add(self, elapsed_ns, items=1):
+        """
+        Record one call.
+        
+        Args:
+            elapsed_ns (int): Duration of the call in nanoseconds
+            items (int, optional): Tickets handled by the call
+        """
+        self.samples.append(elapsed_ns)
+        self.items += items
+    
+    def summary(self):
+        """
+        Summarize the recorded calls.
+        
+        Returns:
+            dict: Call and ticket counts, total seconds, tickets per second
+                  and latency percentiles in microseconds
+        """
+        if not self.samples:
+            return {'calls': 0, 'items': 0}
+        
+        latencies = np.array(self.samples, dtype=np.float64) / 1000.0
+        total = latencies.sum() / 1e6
+        return {
+            'calls': len(latencies),
+            'items': self.items,
+            'total_s': round(total, 6),
+            'throughput_per_s': round(self.items / total, 1) if total else None,
+            'mean_us': round(float(latencies.mean()), 2),
+            'p50_us': round(float(np.percentile(latencies, 50)), 2),
+            'p99_us': round(float(np.percentile(latencies, 99)), 2),
+            'max_us': round(float(latencies.max()), 2)
+        }
+
+def create_client():
+    """
+    Import the web app against a throwaway database and return a test client.
+    
+    The result cache is disabled unless CLASSIFY_CACHE_SIZE is set, so both
+    route stages measure full classification rather than cache lookups of
+    tickets the other route already saw.
+    
+    Returns:
+        tuple: (FlaskClient, TemporaryDirectory holding the database)
+    """
+    temp_dir = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(temp_dir.name, 'bench.db')
+    os.environ.setdefault('CLASSIFY_CACHE_SIZE', '0')
+    
+    import app as flask_app
+    flask_app.app.config['TESTING'] = True
+    flask_app.app.config['CLASSIFY_BATCH_LIMIT'] = max(flask_app.app.config['CLASSIFY_BATCH_LIMIT'], 1000)
+    return flask_app.app.test_client(), temp_dir
+
+def time_stages(count, seed, classifier, stages, client=None, batch_size=256, route_limit=5000):
+    """
+    Stream the corpus through every stage, timing each call.
+    
+    Args:
+        count (int): Corpus size
+        seed (int): Corpus seed
+        classifier (TicketClassifier): Classifier to benchmark
+        stages (list): Stages to time
+        client (FlaskClient, optional): Test client for the route stages
+        batch_size (int, optional): Tickets per predict_many and batch route call
+        route_limit (int, optional): Maximum tickets sent through the routes
+    
+    Returns:
+        dict: StageTimer per stage
+    """
+    clock = time.perf_counter_ns
+    timers = {stage: StageTimer() for stage in stages}
+    wanted = set(stages)
+    batch = []
+    route_batch = []
+    
+    for index, ticket in enumerate(generate_tickets(count, seed)):
+        title, description = ticket['Title'], ticket['Description']
+        
+        # Staged preprocessing, each stage fed the previous stage's output
+        if wanted & {'clean_text', 'remove_stopwords', 'lemmatize_text'}:
+            started = clock()
+            text = clean_text(title + " " + title + " " + description)
+            cleaned = clock()
+            text = remove_stopwords(text)
+            stopped = clock()
+            lemmatize_text(text)
+            finished = clock()
+            for stage, elapsed in (('clean_text', cleaned - started),
+                                   ('remove_stopwords', stopped - cleaned),
+                                   ('lemmatize_text', finished - stopped)):
+                if stage in wanted:
+                    timers[stage].add(elapsed)
+        
+        started = clock()
+        processed_text = combine_title_description(title, description)
+        if 'preprocess' in wanted:
+            timers['preprocess'].add(clock() - started)
+        
+        if 'team_assignment' in wanted:
+            started = clock()
+            get_team_assignment(processed_text)
+            timers['team_assignment'].add(clock() - started)
+        
+        if 'predict' in wanted:
+            started = clock()
+            classifier.predict(processed_text)
+            timers['predict'].add(clock() - started)
+        
+        if 'predict_many' in wanted:
+            batch.append(processed_text)
+            if len(batch) == batch_size or index == count - 1:
+                started = clock()
+                classifier.predict_many(batch)
+                timers['predict_many'].add(clock() - started, len(batch))
+                batch = []
+        
+        if client is not None and index < route_limit:
+            payload = {'title': title, 'description': description}
+            if 'route_classify' in wanted:
+                started = clock()
+                response = client.post('/api/classify', json=payload)
+                timers['route_classify'].add(clock() - started)
+                if response.status_code != 200:
+                    raise RuntimeError(f"/api/classify returned {response.status_code}")
+            
+            if 'route_classify_batch' in wanted:
+                route_batch.append(payload)
+                if len(route_batch) == batch_size or index == min(count, route_limit) - 1:
+                    started = clock()
+                    response = client.post('/api/classify/batch', json=route_batch)
+                    timers['route_classify_batch'].add(clock() - started, len(route_batch))
+                    route_batch = []
+                    if response.status_code != 200:
+                        raise RuntimeError(f"/api/classify/batch returned {response.status_code}")
+    
+    return timers
+
+def measure_memory(count, seed, classifier, stages, client=None, batch_size=256):
+    """
+    Measure the peak memory each stage allocates, with tracemalloc.
+    
+    Args:
+        count (int): Number of tickets to measure over
+        seed (int): Corpus seed
+        classifier (TicketClassifier): Classifier to benchmark
+        stages (list): Stages to measure
+        client (FlaskClient, optional): Test client for the route stages
+        batch_size (int, optional): Tickets per predict_many and batch route call
+    
+    Returns:
+        dict: Peak allocated kilobytes per stage
+    """
+    tickets = list(generate_tickets(count, seed))
+    combined = [t['Title'] + " " + t['Title'] + " " + t['Description'] for t in tickets]
+    cleaned = [clean_text(text) for text in combined]
+    stopped = [remove_stopwords(text) for text in cleaned]
+    processed = [combine_title_description(t['Title'], t['Description']) for t in tickets]
+    payloads = [{'title': t['Title'], 'description': t['Description']} for t in tickets]
+    batches = [processed[i:i + batch_size] for i in range(0, len(processed), batch_size)]
+    payload_batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+    
+    runs = {
+        'clean_text': lambda: [clean_text(text) for text in combined],
+        'remove_stopwords': lambda: [remove_stopwords(text) for text in cleaned],
+        'lemmatize_text': lambda: [lemmatize_text(text) for text in stopped],
+        'preprocess': lambda: [combine_title_description(t['Title'], t['Description']) for t in tickets],
+        'team_assignment': lambda: [get_team_assignment(text) for text in processed],
+        'predict': lambda: [classifier.predict(text) for text in processed],
+        'predict_many': lambda: [classifier.predict_many(texts) for texts in batches]
+    }
+    if client is not None:
+        runs['route_classify'] = lambda: [client.post('/api/classify', json=p) for p in payloads]
+        runs['route_classify_batch'] = lambda: [client.post('/api/classify/batch', json=b) for b in payload_batches]
+    
+    peaks = {}
+    for stage in stages:
+        if stage not in runs:
+            continue
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        runs[stage]()
+        peaks[stage] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+        tracemalloc.stop()
+    return peaks
+
+def peak_rss_mb():
+    """
+    Get the peak resident memory of this process.
+    
+    Returns:
+        float: Megabytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_metadata(args, classifier):
+    """
+    Describe the environment of a run, so results can be compared fairly.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    versions = {}
+    for package in ('numpy', 'scipy', 'scikit-learn', 'nltk', 'Flask'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    
+    return {
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+        'seed': args.seed,
+        'batch_size': args.batch_size,
+        'route_limit': args.route_limit,
+        'memory_sample': args.memory_sample,
+        'model_version': classifier.version,
+        'model_format': 'compact' if classifier.compact_model is not None else 'pickle'
+    }
+
+def run_suite(args):
+    """
+    Run the benchmarks at every requested scale.
+    
+    Args:
+        args (Namespace): Parsed command line arguments
+    
+    Returns:
+        dict: Results with run metadata and one entry per scale
+    """
+    stages = [stage for stage in STAGES if stage in args.stages]
+    client = temp_dir = None
+    if any(stage in ROUTE_STAGES for stage in stages):
+        client, temp_dir = create_client()
+    
+    classifier = load_classifier(MODEL_PATH, COMPACT_MODEL_PATH)
+    results = {'meta': run_metadata(args, classifier), 'runs': []}
+    
+    try:
+        for scale in args.scales:
+            count = parse_scale(scale)
+            print(f"Benchmarking {count} tickets...", file=sys.stderr)
+            
+            started = time.perf_counter()
+            timers = time_stages(count, args.seed, classifier, stages, client,
+                                 batch_size=args.batch_size, route_limit=args.route_limit)
+            elapsed = time.perf_counter() - started
+            peaks = measure_memory(min(count, args.memory_sample), args.seed, classifier, stages,
+                                   client, batch_size=args.batch_size)
+            
+            run = {'scale': count, 'wall_s': round(elapsed, 3), 'peak_rss_mb': peak_rss_mb(), 'stages': {}}
+            for stage in stages:
+                run['stages'][stage] = dict(timers[stage].summary(), peak_alloc_kb=peaks.get(stage))
+            results['runs'].append(run)
+            print_run(run)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    
+    return results
+
+def print_run(run):
+    """
+    Print one scale's results as a table.
+    """
+    print(f"\n{run['scale']} tickets in {run['wall_s']:.1f}s, peak RSS {run['peak_rss_mb']} MB")
+    print(f"{'stage':<22} {'calls':>9} {'tickets/s':>12} {'p50 us':>10} {'p99 us':>10} {'peak KB':>10}")
+    for stage, summary in run['stages'].items():
+        if not summary['calls']:
+            continue
+        print(
+            f"{stage:<22} {summary['calls']:>9} {summary['throughput_per_s']:>12.1f} "
+            f"{summary['p50_us']:>10.1f} {summary['p99_us']:>10.1f} {summary['peak_alloc_kb'] or 0:>10.1f}"
+        )
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Compare stage throughput between two runs.
+    
+    Args:
+        baseline (dict): Earlier results
+        current (dict): New results
+        threshold (float, optional): Relative throughput drop that counts
+                                     as a regression
+    
+    Returns:
+        tuple: (rows, regressions). Each row is (scale, stage, baseline
+               throughput, current throughput, relative change).
+    """
+    baseline_runs = {run['scale']: run for run in baseline['runs']}
+    rows = []
+    regressions = []
+    for run in current['runs']:
+        previous = baseline_runs.get(run['scale'])
+        if previous is None:
+            continue
+        for stage, summary in run['stages'].items():
+            before = previous['stages'].get(stage, {}).get('throughput_per_s')
+            after = summary.get('throughput_per_s')
+            if not before or not after:
+                continue
+            change = after / before - 1
+            row = (run['scale'], stage, before, after, change)
+            rows.append(row)
+            if change < -threshold:
+                regressions.append(row)
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every stage of ticket processing.')
+    parser.add_argument('--scales', nargs='+', default=['1k'], help='corpus sizes, e.g. 1k 100k 1M (default: 1k)')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES, metavar='STAGE',
+                        help=f"stages to run (default: all of {', '.join(STAGES)})")
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default: 0)')
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help='tickets per predict_many and batch route call (default: 256)')
+    parser.add_argument('--route-limit', type=int, default=5000,
+                        help='maximum tickets sent through the Flask routes per scale (default: 5000)')
+    parser.add_argument('--memory-sample', type=int, default=2000,
+                        help='tickets used for the memory pass (default: 2000)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/bench-<time>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='earlier results to compare against')
+    parser.add_argument('--results', metavar='FILE', help='compare these results instead of running the suite')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='throughput drop that fails --compare (default: 0.1 = 10%%)')
+    args = parser.parse_args(argv)
+    
+    if args.results:
+        with open(args.results, encoding='utf-8') as f:
+            results = json.load(f)
+    else:
+        results = run_suite(args)
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"bench-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {output}")
+    
+    if not args.compare:
+        return 0
+    
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows, regressions = compare_results(baseline, results, args.threshold)
+    
+    print(f"\nCompared with {args.compare} (commit {baseline['meta'].get('commit')}):")
+    for scale, stage, before, after, change in rows:
+        flag = '  REGRESSION' if (scale, stage, before, after, change) in regressions else ''
+        print(f"{scale:>9} {stage:<22} {before:>12.1f} -> {after:>12.1f} tickets/s ({change:+.1%}){flag}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Near-duplicate ticket detection.
+
+Every ticket with preprocessed text is indexed by the LSH bucket keys of
+its MinHash signature (see utils.minhash), stored in the
+ticket_lsh_buckets table in the same transaction as the ticket. A new
+ticket's duplicates are looked up by its own bucket keys through the
+table's primary key, so the cost depends on the number of similar tickets,
+not on the size of the tickets table. The candidates are then compared
+with the exact shingle similarity. The index can be rebuilt from the
+tickets table at any time, for example after a bulk import.
+"""
+import logging
+from sqlalchemy import text, select, insert, delete
+
+from utils.minhash import MinHasher, jaccard
+from database.models import db, Ticket, TicketLshBucket, STATUS_CLASSIFIED
+
+# Changing these parameters invalidates the stored bucket keys; rebuild the
+# index afterwards (python -m tools.index_duplicates --rebuild)
+HASHER = MinHasher(num_perm=128, bands=16, shingle_size=5)
+
+# Tickets sharing the most buckets with a signature. Built once: composing
+# the 16-way OR as an expression costs more than running the query. SQLite
+# and PostgreSQL answer each (band, bucket) pair with a primary key lookup.
+CANDIDATES_QUERY = text(
+    "SELECT ticket_id, count(*) AS shared FROM ticket_lsh_buckets WHERE "
+    + " OR ".join(f"(band = :band_{band} AND bucket = :bucket_{band})" for band in range(HASHER.bands))
+    + " GROUP BY ticket_id ORDER BY shared DESC, ticket_id DESC LIMIT :limit"
+)
+
+def index_ticket(ticket):
+    """
+    Set a ticket's LSH buckets from its processed_text.
+    
+    The buckets are written when the ticket is flushed, in the same
+    transaction. Replaces any buckets the ticket had.
+    
+    Args:
+        ticket (Ticket): New or existing ticket
+    """
+    ticket.lsh_buckets = [
+        TicketLshBucket(band=band, bucket=key)
+        for band, key in HASHER.text_keys(ticket.processed_text)
+    ]
+
+def find_duplicate(processed_text, threshold, max_candidates=20):
+    """
+    Find the classified ticket a new ticket duplicates.
+    
+    Args:
+        processed_text (str): Preprocessed text of the new ticket
+        threshold (float): Lowest shingle similarity counted as a duplicate
+        max_candidates (int, optional): Most candidates compared, those
+                                        sharing the most buckets first
+    
+    Returns:
+        tuple: (parent, similarity) with the parent of the duplicate group
+               the most similar ticket belongs to, or None if no indexed
+               ticket is similar enough
+    """
+    keys = HASHER.text_keys(processed_text)
+    if not keys:
+        return None
+    
+    parameters = {'limit': max_candidates}
+    for band, key in keys:
+        parameters[f'band_{band}'] = band
+        parameters[f'bucket_{band}'] = key
+    candidate_ids = [row.ticket_id for row in db.session.execute(CANDIDATES_QUERY, parameters)]
+    if not candidate_ids:
+        return None
+    
+    candidates = db.session.execute(
+        select(Ticket.id, Ticket.processed_text, Ticket.parent_id)
+        .where(Ticket.id.in_(candidate_ids), Ticket.status == STATUS_CLASSIFIED)
+    ).all()
+    
+    shingles = HASHER.shingles(processed_text)
+    best, best_similarity = None, 0.0
+    for candidate in candidates:
+        similarity = jaccard(shingles, HASHER.shingles(candidate.processed_text))
+        if similarity > best_similarity:
+            best, best_similarity = candidate, similarity
+    
+    if best is None or best_similarity < threshold:
+        return None
+    
+    # Groups are flat: a duplicate of a duplicate joins the first ticket's group
+    parent = db.session.get(Ticket, best.parent_id) if best.parent_id else None
+    if parent is None or parent.status != STATUS_CLASSIFIED:
+        parent = db.session.get(Ticket, best.id)
+    return parent, best_similarity
+
+def index_tickets(rebuild=False, batch_size=1000):
+    """
+    Index the tickets that have preprocessed text but no LSH buckets.
+    
+    Tickets are read in id order and committed in batches. Parent links are
+    not changed.
+    
+    Args:
+        rebuild (bool, optional): Drop every bucket first and index all tickets
+        batch_size (int, optional): Tickets indexed per transaction
+    
+    Returns:
+        int: Number of tickets indexed
+    """
+    if rebuild:
+        db.session.execute(delete(TicketLshBucket))
+        db.session.commit()
+    
+    # Every indexed ticket has a bucket in band 0
+    indexed = select(TicketLshBucket.ticket_id).where(TicketLshBucket.band == 0)
+    
+    total = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Ticket.id, Ticket.processed_text)
+            .filter(Ticket.id > last_id, Ticket.processed_text.isnot(None), Ticket.id.notin_(indexed))
+            .order_by(Ticket.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        
+        buckets = [
+            {'band': band, 'bucket': key, 'ticket_id': ticket_id}
+            for ticket_id, processed_text in rows
+            for band, key in HASHER.text_keys(processed_text)
+        ]
+        if buckets:
+            db.session.execute(insert(TicketLshBucket), buckets)
+        db.session.commit()
+        
+        total += len(rows)
+        last_id = rows[-1][0]
+        logging.info(f"Indexed {total} tickets for duplicate detection")
+    
+    return total
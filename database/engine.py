@@ -0,0 +1,110 @@
+"""
+Database engine configuration for the Smart IT Ticket Prioritizer.
+
+SQLite connections are switched to write-ahead logging with tuned pragmas
+as they are opened. In WAL mode readers never block the writer and the
+writer never blocks readers. Writers from other gunicorn workers wait for
+the lock (busy_timeout) instead of failing with "database is locked".
+Server databases such as PostgreSQL get connection pool settings from the
+environment.
+"""
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Applied to every new SQLite connection, in this order
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',      # Persistent: stored in the database file
+    'synchronous': 'NORMAL',    # Safe with WAL: only checkpoints wait for fsync
+    'busy_timeout': 5000,       # Milliseconds to wait for a lock held by another process
+    'cache_size': -32000,       # 32 MB page cache per connection
+    'temp_store': 'MEMORY',
+    'mmap_size': 134217728      # Read the first 128 MB through memory mapping
+}
+
+def is_memory_database(url):
+    """
+    Check whether a SQLite URL points at an in-memory database.
+    
+    Args:
+        url (URL): SQLAlchemy URL
+    
+    Returns:
+        bool: True for an in-memory SQLite database
+    """
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(database_url):
+    """
+    Get the engine options for a database.
+    
+    Pool settings for server databases come from DB_POOL_SIZE (default 5),
+    DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 seconds) and DB_POOL_RECYCLE
+    (1800 seconds). SQLite keeps SQLAlchemy's default pool.
+    
+    Args:
+        database_url (str): Database URL
+    
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    if make_url(database_url).get_backend_name() == 'sqlite':
+        return {}
+    
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        # Replace connections before server or proxy idle timeouts close them
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+
+def sqlite_pragmas(url):
+    """
+    Get the pragmas to apply to new connections to a SQLite database.
+    
+    SQLITE_BUSY_TIMEOUT overrides the lock wait in milliseconds and
+    SQLITE_SYNCHRONOUS the sync level: FULL also syncs the log on every
+    commit, so committed tickets survive a power loss, not just a crash of
+    the application. In-memory databases keep their default journal and
+    are not memory mapped.
+    
+    Args:
+        url (URL): SQLAlchemy URL of the database
+    
+    Returns:
+        dict: Pragma names and values
+    """
+    pragmas = dict(SQLITE_PRAGMAS)
+    if os.environ.get('SQLITE_BUSY_TIMEOUT'):
+        pragmas['busy_timeout'] = int(os.environ['SQLITE_BUSY_TIMEOUT'])
+    if os.environ.get('SQLITE_SYNCHRONOUS'):
+        pragmas['synchronous'] = os.environ['SQLITE_SYNCHRONOUS'].upper()
+    if is_memory_database(url):
+        del pragmas['journal_mode']
+        del pragmas['mmap_size']
+    return pragmas
+
+def configure_engine(engine):
+    """
+    Apply per-connection settings to an engine.
+    
+    Must be called before the engine opens its first connection.
+    
+    Args:
+        engine: SQLAlchemy engine
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    pragmas = sqlite_pragmas(engine.url)
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,188 @@
+"""
+Group commit for ticket writes.
+
+Committing every submitted ticket in its own transaction costs one
+journal write and sync per ticket, which caps the insert rate during
+ticket storms. GroupCommitWriter gathers the writes of concurrent
+requests for a short window and commits them together in one
+transaction. Every caller blocks until the transaction holding its write
+has committed, so it never reports success for a row that is not stored.
+A caller that gives up waiting cancels its write, so it never fails a
+write that is stored later either.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from sqlalchemy.orm import Session
+
+class _PendingWrite:
+    """
+    One caller's write, waiting for its group to commit.
+    """
+    
+    __slots__ = ('work', 'done', 'result', 'error', 'started', 'cancelled', '_lock')
+    
+    def __init__(self, work):
+        self.work = work
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.started = False
+        self.cancelled = False
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Mark the write as taken by the writer thread, unless it was cancelled"""
+        with self._lock:
+            if not self.cancelled:
+                self.started = True
+            return self.started
+    
+    def cancel(self):
+        """Drop the write, unless the writer thread has already taken it"""
+        with self._lock:
+            if not self.started:
+                self.cancelled = True
+            return self.cancelled
+
+class GroupCommitWriter:
+    """
+    Runs writes from many threads in shared transactions.
+    """
+    
+    def __init__(self, engine, window=0.005, max_batch=100, on_commit=None):
+        """
+        Initialize the GroupCommitWriter.
+        
+        Args:
+            engine: SQLAlchemy engine to write to
+            window (float, optional): Seconds to wait for more writes after
+                                      the first write of a group arrives
+            max_batch (int, optional): Most writes committed together
+            on_commit (callable, optional): Called with the number of writes
+                                            and the seconds the commit took
+                                            after every group commit
+        """
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self.on_commit = on_commit
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+    
+    def submit(self, work, timeout=None):
+        """
+        Run a write in the next group transaction and wait until it commits.
+        
+        If timeout passes while the write is still queued, it is cancelled
+        and never runs. A write the writer thread has already started is
+        waited for past the timeout, since it may still commit.
+        
+        Args:
+            work (callable): Called with the group's Session; adds or
+                             changes objects in it. Must not commit.
+            timeout (float, optional): Most seconds to wait
+        
+        Returns:
+            The value returned by work
+        
+        Raises:
+            Exception: What work raised, or the error that made the commit
+                       fail
+            TimeoutError: If the write did not start within timeout. It
+                          was cancelled and nothing was stored.
+        """
+        self._start()
+        pending = _PendingWrite(work)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            if pending.cancel():
+                raise TimeoutError("Group commit did not start in time; the write was dropped")
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+    
+    def close(self):
+        """Stop the writer thread after it has committed the queued writes"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._queue.put(None)
+                self._thread.join()
+                self._pid = None
+    
+    def _start(self):
+        """Start the writer thread of this process if it is not running"""
+        # A forked worker inherits the object but not the thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+    
+    def _run(self):
+        """Gather writes into groups and commit them until closed"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            group = [first]
+            deadline = time.monotonic() + self.window
+            while len(group) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    self._commit(group)
+                    return
+                group.append(pending)
+            self._commit(group)
+    
+    def _commit(self, group):
+        """
+        Commit one group of writes and wake up their callers.
+        
+        If the group fails, its writes are retried one at a time, so one
+        bad write does not fail the others. Writes whose callers gave up
+        waiting are dropped.
+        """
+        group = [pending for pending in group if pending.start()]
+        if not group:
+            return
+        
+        started = time.perf_counter()
+        try:
+            with Session(self.engine, expire_on_commit=False) as session:
+                results = [pending.work(session) for pending in group]
+                session.commit()
+        except Exception as e:
+            if len(group) == 1:
+                group[0].error = e
+                group[0].done.set()
+            else:
+                logging.warning(f"Group commit of {len(group)} writes failed, retrying them one by one: {e}")
+                for pending in group:
+                    self._commit([pending])
+            return
+        
+        elapsed = time.perf_counter() - started
+        for pending, result in zip(group, results):
+            pending.result = result
+            pending.done.set()
+        
+        if self.on_commit is not None:
+            try:
+                self.on_commit(len(group), elapsed)
+            except Exception as e:
+                logging.error(f"Error recording group commit: {e}")
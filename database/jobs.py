@@ -0,0 +1,252 @@
+"""
+Database-backed queue of background classification jobs.
+
+Tickets submitted in asynchronous mode are stored immediately with a
+pending state and one queued ClassificationJob. Worker processes claim
+due jobs in batches with a single guarded UPDATE, so two workers never
+run the same job; on PostgreSQL the claim also skips rows locked by a
+concurrent claim. A job whose worker died is released again once its
+lease expires; results and failures are only recorded while the claim
+that produced them is still current, so a worker that finishes after its
+lease expired cannot overwrite the job's next run. Failed jobs are retried with exponential backoff until
+they run out of attempts.
+"""
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func
+
+from database.models import (
+    db,
+    ClassificationJob,
+    STATUS_CLASSIFIED,
+    STATUS_PENDING,
+    STATUS_FAILED
+)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+def enqueue_ticket(ticket, session=None):
+    """
+    Queue a ticket for background classification.
+    
+    The job is added to the session; commit it together with the ticket.
+    
+    Args:
+        ticket (Ticket): Ticket to classify. Must have been flushed so it has an id.
+        session (Session, optional): Session holding the ticket, by default
+                                     the request's db.session
+    
+    Returns:
+        ClassificationJob: The queued job
+    """
+    ticket.status = STATUS_PENDING
+    job = ClassificationJob(ticket_id=ticket.id, status=QUEUED)
+    (session or db.session).add(job)
+    return job
+
+def claim_jobs(limit, now=None):
+    """
+    Claim up to ``limit`` due jobs for this worker and commit the claim.
+    
+    Args:
+        limit (int): Maximum number of jobs to claim
+        now (datetime, optional): Current time, for tests
+    
+    Returns:
+        list: Claimed ClassificationJob objects, oldest first
+    """
+    now = now or datetime.utcnow()
+    token = uuid.uuid4().hex
+    due = (ClassificationJob.status == QUEUED) & (ClassificationJob.available_at <= now)
+    
+    candidates = (
+        select(ClassificationJob.id)
+        .where(due)
+        .order_by(ClassificationJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    # Repeating the condition on the UPDATE makes a job that another worker
+    # claimed in the meantime drop out of this claim
+    db.session.execute(
+        update(ClassificationJob)
+        .where(ClassificationJob.id.in_(candidates), due)
+        .values(
+            status=RUNNING,
+            claim_token=token,
+            claimed_at=now,
+            attempts=ClassificationJob.attempts + 1,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    
+    return (
+        ClassificationJob.query
+        .filter_by(claim_token=token, status=RUNNING)
+        .order_by(ClassificationJob.id)
+        .all()
+    )
+
+def _update_claimed(job, **values):
+    """
+    Update a job with a guarded UPDATE that only matches while its claim is current.
+    
+    Args:
+        job (ClassificationJob): A claimed job
+        **values: Columns to set
+    
+    Returns:
+        bool: False if the job was released or claimed by another worker
+    """
+    result = db.session.execute(
+        update(ClassificationJob)
+        .where(
+            ClassificationJob.id == job.id,
+            ClassificationJob.claim_token == job.claim_token,
+            ClassificationJob.status == RUNNING
+        )
+        .values(**values)
+    )
+    return result.rowcount == 1
+
+def complete_job(job, priority, team, processed_text, model_version=None):
+    """
+    Store a job's classification on its ticket and mark the job done.
+    
+    Nothing is stored if the job's lease expired and it was released or
+    claimed again since this worker claimed it.
+    
+    Args:
+        job (ClassificationJob): A claimed job
+        priority (str): Predicted priority
+        team (str): Assigned team
+        processed_text (str): Preprocessed ticket text
+        model_version (str, optional): Version of the model that predicted the priority
+    
+    Returns:
+        bool: True if the result was stored, False if the claim was lost
+    """
+    if not _update_claimed(job, status=DONE, last_error=None):
+        return False
+    
+    ticket = job.ticket
+    ticket.priority = priority
+    ticket.team = team
+    ticket.processed_text = processed_text
+    ticket.model_version = model_version
+    ticket.status = STATUS_CLASSIFIED
+    return True
+
+def fail_job(job, error, max_attempts=3, retry_delay=30.0, now=None):
+    """
+    Record a failed attempt, scheduling a retry if attempts remain.
+    
+    Retries wait ``retry_delay`` seconds after the first failure, doubling
+    with every further failure. After ``max_attempts`` the job and its
+    ticket are marked failed. Nothing is recorded if the claim was lost,
+    as for complete_job.
+    
+    Args:
+        job (ClassificationJob): A claimed job
+        error (str): Description of the failure
+        max_attempts (int, optional): Attempts before giving up
+        retry_delay (float, optional): Seconds before the first retry
+        now (datetime, optional): Current time, for tests
+    
+    Returns:
+        bool: True if the job will be retried, False if it failed for good
+              or the claim was lost
+    """
+    now = now or datetime.utcnow()
+    
+    if job.attempts < max_attempts:
+        available_at = now + timedelta(seconds=retry_delay * 2 ** (job.attempts - 1))
+        return _update_claimed(job, status=QUEUED, available_at=available_at, last_error=error,
+                               claim_token=None)
+    
+    if _update_claimed(job, status=FAILED, last_error=error, claim_token=None):
+        job.ticket.status = STATUS_FAILED
+    return False
+
+def release_expired_jobs(lease_seconds, max_attempts=3, retry_delay=30.0, now=None):
+    """
+    Fail the running jobs of workers that stopped before finishing them.
+    
+    A job still running ``lease_seconds`` after it was claimed is treated
+    as a failed attempt, so it is retried or, after too many attempts,
+    failed for good. Commits the result.
+    
+    Args:
+        lease_seconds (float): Seconds a worker may spend on a claimed batch
+        max_attempts (int, optional): Attempts before giving up
+        retry_delay (float, optional): Seconds before the first retry
+        now (datetime, optional): Current time, for tests
+    
+    Returns:
+        int: Number of jobs released
+    """
+    now = now or datetime.utcnow()
+    expired = ClassificationJob.query.filter(
+        ClassificationJob.status == RUNNING,
+        ClassificationJob.claimed_at < now - timedelta(seconds=lease_seconds)
+    ).all()
+    
+    for job in expired:
+        fail_job(job, 'Worker stopped before finishing the job', max_attempts, retry_delay, now)
+    db.session.commit()
+    return len(expired)
+
+def retry_failed_jobs():
+    """
+    Queue every failed job again with a fresh set of attempts.
+    
+    Commits the result.
+    
+    Returns:
+        int: Number of jobs queued
+    """
+    jobs = ClassificationJob.query.filter_by(status=FAILED).all()
+    for job in jobs:
+        job.status = QUEUED
+        job.attempts = 0
+        job.available_at = datetime.utcnow()
+        job.ticket.status = STATUS_PENDING
+    db.session.commit()
+    return len(jobs)
+
+def latest_job(ticket_id):
+    """
+    Get the most recent classification job of a ticket.
+    
+    Args:
+        ticket_id (int): Ticket id
+    
+    Returns:
+        ClassificationJob: The job, or None if the ticket was never queued
+    """
+    return (
+        ClassificationJob.query
+        .filter_by(ticket_id=ticket_id)
+        .order_by(ClassificationJob.id.desc())
+        .first()
+    )
+
+def queue_counts():
+    """
+    Count jobs by state.
+    
+    Returns:
+        dict: Number of jobs in each state
+    """
+    counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+    rows = db.session.execute(
+        select(ClassificationJob.status, func.count()).group_by(ClassificationJob.status)
+    )
+    counts.update(dict(rows.all()))
+    return counts
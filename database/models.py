@@ -3,17 +3,41 @@ Database configuration and setup for the Smart IT Ticket Prioritizer.
 
 This module provides the SQLAlchemy database setup and connection.
 """
+import logging
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateColumn, CreateIndex
 from datetime import datetime
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+# Ticket states
+STATUS_CLASSIFIED = 'classified'
+STATUS_PENDING = 'pending'      # Waiting for a background worker
+STATUS_FAILED = 'failed'        # Classification failed on every attempt
+
+# Priority levels an agent can assign
+PRIORITIES = ('Critical', 'High', 'Medium', 'Low')
+
+# Stored in the required priority and team columns until a pending ticket
+# is classified
+PENDING_PRIORITY = 'Pending'
+UNASSIGNED_TEAM = 'unassigned'
+
 class Ticket(db.Model):
     """
     Ticket model for storing IT support tickets.
     """
     __tablename__ = 'tickets'
+    __table_args__ = (
+        # Newest-first listings and keyset pagination order by (created_at, id)
+        db.Index('ix_tickets_created_at_id', 'created_at', 'id'),
+        # The same order within one priority or team, for filtered searches
+        db.Index('ix_tickets_priority_created_at_id', 'priority', 'created_at', 'id'),
+        db.Index('ix_tickets_team_created_at_id', 'team', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -22,8 +46,20 @@ class Ticket(db.Model):
     team = db.Column(db.String(50), nullable=False)      # network, hardware, software, security
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     processed_text = db.Column(db.Text)  # Preprocessed text for reference
+    status = db.Column(db.String(20), nullable=False, default=STATUS_CLASSIFIED, server_default=STATUS_CLASSIFIED)
+    model_version = db.Column(db.String(64))  # Version of the model that predicted the priority
+    # First ticket of the near-duplicate group this ticket belongs to, whose
+    # classification it reuses
+    parent_id = db.Column(db.Integer, db.ForeignKey('tickets.id'), index=True)
+    
+    # MinHash LSH buckets of processed_text, for duplicate lookups (see database.duplicates)
+    lsh_buckets = db.relationship('TicketLshBucket', cascade='all, delete-orphan')
+    
+    # Priority changes made by agents, oldest first
+    corrections = db.relationship('PriorityCorrection', back_populates='ticket', order_by='PriorityCorrection.id')
     
-    def __init__(self, title, description, priority, team, processed_text=None):
+    def __init__(self, title, description, priority, team, processed_text=None, status=STATUS_CLASSIFIED,
+                 model_version=None, parent_id=None):
         """
         Initialize a new ticket.
         
@@ -33,41 +69,258 @@ class Ticket(db.Model):
             priority (str): Ticket priority level
             team (str): Team assignment
             processed_text (str, optional): Preprocessed text used for classification
+            status (str, optional): Classification state of the ticket
+            model_version (str, optional): Version of the model that predicted the priority
+            parent_id (int, optional): Ticket this one duplicates
         """
         self.title = title
         self.description = description
         self.priority = priority
         self.team = team
         self.processed_text = processed_text
+        self.status = status
+        self.model_version = model_version
+        self.parent_id = parent_id
     
-    def to_dict(self):
+    # Fields available through to_dict
+    FIELDS = ('id', 'title', 'description', 'priority', 'team', 'status', 'model_version', 'parent_id',
+              'created_at')
+    
+    def to_dict(self, fields=None):
         """
         Convert the ticket to a dictionary.
         
+        Args:
+            fields (list, optional): Names of the fields to include. Defaults
+                                     to all fields in Ticket.FIELDS. Fields
+                                     that are not requested are not read, so
+                                     they need not be loaded from the database.
+        
         Returns:
             dict: Ticket data as dictionary
         """
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'priority': self.priority,
-            'team': self.team,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
+        if fields is None:
+            fields = self.FIELDS
+        
+        data = {}
+        for field in fields:
+            if field == 'created_at':
+                data[field] = self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                data[field] = getattr(self, field)
+        return data
+
+
+class TicketLshBucket(db.Model):
+    """
+    One LSH band bucket of a ticket's MinHash signature.
+    
+    Every indexed ticket has one row per band. Tickets sharing a bucket in
+    any band are candidate near-duplicates, found through the primary key
+    without scanning the tickets table.
+    """
+    __tablename__ = 'ticket_lsh_buckets'
+    
+    band = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True)  # Hash of the band's signature rows
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id'), primary_key=True)
+
+
+class ImportCheckpoint(db.Model):
+    """
+    Progress of a bulk ticket import, committed together with each batch
+    so an interrupted import can resume exactly where it stopped.
+    """
+    __tablename__ = 'import_checkpoints'
+    
+    source = db.Column(db.String(1024), primary_key=True)  # Absolute path of the input file
+    rows_read = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PriorityCorrection(db.Model):
+    """
+    Priority change made by an agent, used to retrain the classifier.
+    
+    Rows are only ever added, so their ids tell the incremental trainer
+    (tools.retrain_corrections) which corrections it has already learned.
+    """
+    __tablename__ = 'priority_corrections'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id'), nullable=False, index=True)
+    old_priority = db.Column(db.String(50), nullable=False)
+    new_priority = db.Column(db.String(50), nullable=False)
+    model_version = db.Column(db.String(64))  # Model that made the corrected prediction
+    corrected_by = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    ticket = db.relationship('Ticket', back_populates='corrections')
+
+
+class TrainingCheckpoint(db.Model):
+    """
+    Last correction learned by the model at a given path, committed after
+    each incremental training run.
+    """
+    __tablename__ = 'training_checkpoints'
+    
+    model_path = db.Column(db.String(1024), primary_key=True)  # Absolute path of the model file
+    last_correction_id = db.Column(db.Integer, nullable=False, default=0)
+    model_version = db.Column(db.String(64))  # Version published by the last run
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TicketStat(db.Model):
+    """
+    Number of tickets with a given priority and team.
+    
+    Maintained by database triggers on the tickets table (see
+    database.stats), so it is updated in the same transaction as every
+    insert, reclassification and delete.
+    """
+    __tablename__ = 'ticket_stats'
+    
+    priority = db.Column(db.String(50), primary_key=True)
+    team = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class TicketStatHourly(db.Model):
+    """
+    Number of tickets with a given priority and team created in one hour
+    (UTC). Maintained by the same triggers as TicketStat.
+    """
+    __tablename__ = 'ticket_stats_hourly'
+    
+    bucket = db.Column(db.DateTime, primary_key=True)  # Start of the hour
+    priority = db.Column(db.String(50), primary_key=True)
+    team = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ClassificationJob(db.Model):
+    """
+    Queued classification of a ticket submitted in asynchronous mode.
+    
+    Background workers claim queued jobs in batches (see database.jobs),
+    fill in the ticket's priority and team, and retry failed jobs with
+    exponential backoff.
+    """
+    __tablename__ = 'classification_jobs'
+    __table_args__ = (
+        # Workers look for queued jobs that are due, oldest first
+        db.Index('ix_classification_jobs_status_available_at', 'status', 'available_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Not claimed before this time
+    claim_token = db.Column(db.String(32))  # Identifies the claim that is running the job
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    ticket = db.relationship('Ticket')
 
 
-def init_db(app):
+def add_missing_columns(engine, table):
+    """
+    Add columns defined on a model but missing from its existing table.
+    
+    create_all only creates missing tables, so databases created by an older
+    version need new columns added with ALTER TABLE. New columns must be
+    nullable or have a server default.
+    
+    Each column is added in its own transaction. Another process upgrading
+    the same database may add a column between the check and the ALTER;
+    the ALTER then fails, and the column is skipped once it is found.
+    
+    Args:
+        engine: SQLAlchemy engine
+        table (Table): Table of the model
+    
+    Returns:
+        list: Names of the columns that were added by this call
+    """
+    existing = {column['name'] for column in inspect(engine).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    
+    added = []
+    for column in missing:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {engine.dialect.identifier_preparer.format_table(table)} "
+                    f"ADD COLUMN {CreateColumn(column).compile(dialect=engine.dialect)}"
+                )
+        except (OperationalError, ProgrammingError):
+            # Re-raise unless the column now exists (a duplicate column)
+            if column.name not in {c['name'] for c in inspect(engine).get_columns(table.name)}:
+                raise
+            continue
+        added.append(column.name)
+    return added
+
+
+def upgrade_schema(engine):
+    """
+    Bring a database up to the current schema in place.
+    
+    Creates missing tables, then adds the columns and indexes that
+    databases created by an older version lack. Existing rows are kept.
+    Tables that get a new index are analyzed, so the query planner starts
+    using it right away. Safe to run on every startup, and from several
+    processes at once: tables, columns and indexes another process has
+    just created are skipped.
+    
+    Args:
+        engine: SQLAlchemy engine
+    
+    Returns:
+        list: Names of the columns and indexes that were added
+    """
+    try:
+        db.metadata.create_all(engine)
+    except (OperationalError, ProgrammingError):
+        # Another process created a table after create_all checked for it
+        db.metadata.create_all(engine)
+    
+    added = []
+    for table in db.metadata.sorted_tables:
+        added.extend(f"{table.name}.{name}" for name in add_missing_columns(engine, table))
+        
+        existing = {index['name'] for index in inspect(engine).get_indexes(table.name)}
+        new_indexes = [index for index in table.indexes if index.name not in existing]
+        if not new_indexes:
+            continue
+        with engine.begin() as conn:
+            for index in new_indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            conn.exec_driver_sql(f"ANALYZE {engine.dialect.identifier_preparer.format_table(table)}")
+        added.extend(index.name for index in new_indexes)
+    
+    if added:
+        logging.info(f"Upgraded database schema: added {', '.join(added)}")
+    return added
+
+def init_db(app, database_url=None):
     """
     Initialize the database with the Flask app.
     
     Args:
         app: The Flask application
+        database_url (str, optional): Database URL. Defaults to the
+                                      DATABASE_URL environment variable.
     """
     import os
     
     # Configure SQLite database - use environment variable if available
-    database_url = os.environ.get('DATABASE_URL', 'sqlite:///tickets.db')
+    database_url = database_url or os.environ.get('DATABASE_URL', 'sqlite:///tickets.db')
     
     # Handle SQLite URL for compatibility
     if database_url.startswith('postgres://'):
@@ -76,9 +329,27 @@ def init_db(app):
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Pool settings for server databases; options set by the app take precedence
+    from database.engine import engine_options, configure_engine
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(database_url),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+    
     # Initialize the app with the database
     db.init_app(app)
     
-    # Create all tables
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        # WAL and pragmas for SQLite, before the first connection is opened
+        configure_engine(db.engine)
+        
+        # Create missing tables and upgrade existing ones in place
+        upgrade_schema(db.engine)
+        
+        # Set up the full-text search index
+        from database.search import install_search_index
+        app.config['SEARCH_BACKEND'] = install_search_index(db.engine)
+        
+        # Set up the triggers that maintain the ticket statistics
+        from database.stats import install_stats_triggers
+        app.config['STATS_TRIGGERS'] = install_stats_triggers(db.engine)
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Keyset pagination for ticket listings.
+
+Tickets are listed newest first, ordered by (created_at, id). Each page
+continues from an opaque cursor holding the position of the last ticket
+of the previous page, so fetching a page is an index range scan whose
+cost does not depend on how deep the page is.
+"""
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
+
+from database.models import Ticket
+
+def encode_cursor(ticket):
+    """
+    Encode the position of a ticket as an opaque cursor.
+    
+    Args:
+        ticket (Ticket): The last ticket of a page
+    
+    Returns:
+        str: URL-safe cursor string
+    """
+    position = f"{ticket.created_at.isoformat()}|{ticket.id}"
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor (str): Cursor string
+    
+    Returns:
+        tuple: (created_at, id) of the ticket the cursor points at
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        position = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, ticket_id = position.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+def paginate_tickets(cursor=None, limit=50, columns=None, query=None):
+    """
+    Fetch one page of tickets, newest first.
+    
+    Args:
+        cursor (str, optional): Cursor returned with the previous page
+        limit (int, optional): Maximum number of tickets on the page
+        columns (list, optional): Ticket attribute names to load. The
+                                  ordering columns are always loaded.
+        query (Query, optional): Base query to paginate, e.g. with filters
+                                 applied. Defaults to all tickets.
+    
+    Returns:
+        tuple: (tickets, next_cursor). next_cursor is None on the last page.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if query is None:
+        query = Ticket.query
+    
+    if columns is not None:
+        names = set(columns) | {'id', 'created_at'}
+        query = query.options(load_only(*(getattr(Ticket, name) for name in names)))
+    
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, ticket_id))
+    
+    # Fetch one extra row to find out whether another page follows
+    tickets = (
+        query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = encode_cursor(tickets[-1])
+    
+    return tickets, next_cursor
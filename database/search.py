@@ -0,0 +1,210 @@
+"""
+Full-text search over tickets.
+
+On SQLite the index is an FTS5 virtual table over the ticket title,
+description and processed text, kept in sync with the tickets table by
+triggers. On PostgreSQL it is a generated tsvector column with a GIN
+index. Other databases fall back to an unindexed LIKE scan.
+"""
+import re
+import logging
+from sqlalchemy import text, or_
+from sqlalchemy.exc import OperationalError
+
+from database.models import db, Ticket
+
+# Search backends
+FTS5 = 'fts5'
+TSVECTOR = 'tsvector'
+LIKE = 'like'
+
+SQLITE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+        title, description, processed_text,
+        content='tickets', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, title, description, processed_text)
+        VALUES (new.id, new.title, new.description, new.processed_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description, processed_text)
+        VALUES ('delete', old.id, old.title, old.description, old.processed_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_update
+    AFTER UPDATE OF title, description, processed_text ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description, processed_text)
+        VALUES ('delete', old.id, old.title, old.description, old.processed_text);
+        INSERT INTO tickets_fts(rowid, title, description, processed_text)
+        VALUES (new.id, new.title, new.description, new.processed_text);
+    END
+    """
+]
+
+POSTGRES_STATEMENTS = [
+    """
+    ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(processed_text, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING GIN (search_vector)"
+]
+
+# bm25 column weights: title matches count most, processed text least
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+def install_search_index(engine):
+    """
+    Create the full-text index for the engine's database if needed.
+    
+    Safe to call on every startup. On SQLite, an index created for an
+    existing tickets table is populated from the current rows.
+    
+    Args:
+        engine: SQLAlchemy engine
+    
+    Returns:
+        str: The search backend in use (FTS5, TSVECTOR or LIKE)
+    """
+    dialect = engine.dialect.name
+    
+    try:
+        if dialect == 'sqlite':
+            with engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+                ).first()
+                for statement in SQLITE_STATEMENTS:
+                    conn.exec_driver_sql(statement)
+                if not exists:
+                    conn.exec_driver_sql("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+            return FTS5
+        
+        if dialect == 'postgresql':
+            with engine.begin() as conn:
+                for statement in POSTGRES_STATEMENTS:
+                    conn.exec_driver_sql(statement)
+            return TSVECTOR
+    except OperationalError as e:
+        # e.g. SQLite built without FTS5
+        logging.warning(f"Full-text index unavailable, falling back to LIKE search: {e}")
+    
+    return LIKE
+
+def fts5_query(query):
+    """
+    Turn free text into a safe FTS5 query.
+    
+    Every word must match; the last word also matches as a prefix so
+    partially typed words still find results. FTS5 operators in the input
+    are treated as plain words.
+    
+    Args:
+        query (str): User search text
+    
+    Returns:
+        str: FTS5 MATCH expression, or an empty string if there are no words
+    """
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def search_tickets(query, backend, priority=None, team=None, limit=20, offset=0):
+    """
+    Search tickets by relevance.
+    
+    Args:
+        query (str): Search text
+        backend (str): Search backend returned by install_search_index
+        priority (str, optional): Only return tickets with this priority
+        team (str, optional): Only return tickets assigned to this team
+        limit (int, optional): Maximum number of results
+        offset (int, optional): Number of results to skip
+    
+    Returns:
+        tuple: (results, has_more). results is a list of (ticket, score)
+               pairs, best match first.
+    """
+    filters = []
+    params = {'limit': limit + 1, 'offset': offset}
+    if priority:
+        filters.append('t.priority = :priority')
+        params['priority'] = priority
+    if team:
+        filters.append('t.team = :team')
+        params['team'] = team
+    
+    if backend == FTS5:
+        params['query'] = fts5_query(query)
+        if not params['query']:
+            return [], False
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        sql = f"""
+            SELECT t.id, -bm25(tickets_fts, {weights}) AS score
+            FROM tickets_fts JOIN tickets t ON t.id = tickets_fts.rowid
+            WHERE tickets_fts MATCH :query {''.join(' AND ' + f for f in filters)}
+            ORDER BY bm25(tickets_fts, {weights})
+            LIMIT :limit OFFSET :offset
+        """
+    elif backend == TSVECTOR:
+        params['query'] = query
+        sql = f"""
+            SELECT t.id, ts_rank_cd(t.search_vector, q) AS score
+            FROM tickets t, websearch_to_tsquery('english', :query) q
+            WHERE t.search_vector @@ q {''.join(' AND ' + f for f in filters)}
+            ORDER BY score DESC, t.id DESC
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        return _like_search(query, priority, team, limit, offset)
+    
+    rows = db.session.execute(text(sql), params).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # Load the matching tickets and return them in rank order
+    tickets = {ticket.id: ticket for ticket in Ticket.query.filter(Ticket.id.in_([row.id for row in rows]))}
+    return [(tickets[row.id], float(row.score)) for row in rows if row.id in tickets], has_more
+
+def _like_search(query, priority, team, limit, offset):
+    """
+    Unindexed fallback search, newest matches first.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return [], False
+    
+    ticket_query = Ticket.query
+    for word in words:
+        pattern = f'%{word}%'
+        ticket_query = ticket_query.filter(or_(
+            Ticket.title.ilike(pattern),
+            Ticket.description.ilike(pattern),
+            Ticket.processed_text.ilike(pattern)
+        ))
+    if priority:
+        ticket_query = ticket_query.filter(Ticket.priority == priority)
+    if team:
+        ticket_query = ticket_query.filter(Ticket.team == team)
+    
+    tickets = (
+        ticket_query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+        .all()
+    )
+    return [(ticket, 0.0) for ticket in tickets[:limit]], len(tickets) > limit
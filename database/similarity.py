@@ -0,0 +1,187 @@
+"""
+Similar-ticket lookups backed by a persisted TF-IDF index.
+
+The index (model.similarity_index) holds the feature vector of every
+ticket with preprocessed text, computed by the serving classifier's
+vectorizer. It is saved to a file, so a process starting up loads it and
+only indexes the tickets stored since it was saved. It is caught up with
+the tickets table incrementally, in ticket id order. A ticket still
+waiting for a background worker holds back the caught-up point until it
+is classified, so it is indexed once it has text. When the model changes,
+the vectors no longer match its vocabulary and the index is rebuilt.
+"""
+import os
+import time
+import logging
+import threading
+
+from model.similarity_index import SimilarityIndex
+from database.models import db, Ticket, STATUS_PENDING
+
+def build_similarity_index(classifier, prune_df=0.0, batch_size=1000):
+    """
+    Index every ticket with preprocessed text.
+    
+    Args:
+        classifier (TicketClassifier): Classifier whose vectorizer computes the rows
+        prune_df (float, optional): Query pruning, see SimilarityIndex
+        batch_size (int, optional): Tickets read and vectorized at a time
+    
+    Returns:
+        SimilarityIndex: The new index
+    """
+    index = SimilarityIndex(classifier.transform([]).shape[1], classifier.version, prune_df)
+    update_similarity_index(index, classifier, batch_size)
+    return index
+
+def update_similarity_index(index, classifier, batch_size=1000):
+    """
+    Add the tickets stored since the index was last caught up.
+    
+    Args:
+        index (SimilarityIndex): Index built with the classifier's vectorizer
+        classifier (TicketClassifier): Classifier whose vectorizer computes the rows
+        batch_size (int, optional): Tickets read and vectorized at a time
+    
+    Returns:
+        int: Number of tickets added
+    """
+    added = 0
+    cursor = index.settled_id
+    first_pending = None
+    while True:
+        rows = (
+            db.session.query(Ticket.id, Ticket.processed_text, Ticket.status)
+            .filter(Ticket.id > cursor)
+            .order_by(Ticket.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        
+        new = [(ticket_id, text) for ticket_id, text, _ in rows if text and ticket_id not in index]
+        if new:
+            index.add([ticket_id for ticket_id, _ in new], classifier.transform([text for _, text in new]))
+            added += len(new)
+        
+        if first_pending is None:
+            first_pending = next((ticket_id for ticket_id, text, status in rows
+                                  if status == STATUS_PENDING and not text), None)
+        cursor = rows[-1][0]
+    
+    index.settled_id = first_pending - 1 if first_pending is not None else cursor
+    return added
+
+class TicketSimilarity:
+    """
+    The similarity index of one process, loaded, caught up and saved on demand.
+    """
+    
+    def __init__(self, path, prune_df=0.0, refresh_interval=1.0, save_every=1000):
+        """
+        Initialize the TicketSimilarity.
+        
+        Args:
+            path (str): File the index is saved to and loaded from
+            prune_df (float, optional): Query pruning, see SimilarityIndex
+            refresh_interval (float, optional): Least seconds between two
+                                                catch-ups with the tickets table
+            save_every (int, optional): Tickets added before the file is
+                                        saved again
+        """
+        self.path = path
+        self.prune_df = prune_df
+        self.refresh_interval = refresh_interval
+        self.save_every = save_every
+        self.index = None
+        self._refreshed_at = 0.0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+    
+    def get(self, classifier):
+        """
+        Get an up-to-date index for a classifier.
+        
+        Loads the saved index, or builds it if there is none or it was
+        built by another model, then adds the tickets stored since.
+        
+        Args:
+            classifier (TicketClassifier): Classifier serving the request
+        
+        Returns:
+            SimilarityIndex: The index
+        """
+        with self._lock:
+            if self.index is None or self.index.model_version != classifier.version:
+                self._open(classifier)
+            elif time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                self._unsaved += update_similarity_index(self.index, classifier)
+                self._refreshed_at = time.monotonic()
+            
+            if self._unsaved >= self.save_every:
+                self._save()
+            return self.index
+    
+    def _open(self, classifier):
+        """Load or build the index for a classifier. Caller holds the lock."""
+        started = time.perf_counter()
+        index = None
+        if os.path.exists(self.path):
+            try:
+                index = SimilarityIndex.load(self.path, self.prune_df)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable similarity index {self.path}: {e}")
+            if index is not None and index.model_version != classifier.version:
+                index = None
+        
+        if index is None:
+            self.index = build_similarity_index(classifier, self.prune_df)
+            self._unsaved = len(self.index)
+            self._save()
+            logging.info(f"Built similarity index of {len(self.index)} tickets in "
+                         f"{time.perf_counter() - started:.2f}s")
+        else:
+            self.index = index
+            self._unsaved = update_similarity_index(index, classifier)
+            logging.info(f"Loaded similarity index of {len(index)} tickets "
+                         f"({self._unsaved} new) in {time.perf_counter() - started:.2f}s")
+        self._refreshed_at = time.monotonic()
+    
+    def _save(self):
+        """Save the index, keeping it usable if saving fails. Caller holds the lock."""
+        try:
+            self.index.save(self.path)
+            self._unsaved = 0
+        except OSError as e:
+            logging.error(f"Error saving similarity index to {self.path}: {e}")
+    
+    def similar(self, ticket, classifier, k=10, text=None):
+        """
+        Find the tickets most similar to a ticket.
+        
+        Args:
+            ticket (Ticket): Ticket to compare with
+            classifier (TicketClassifier): Classifier serving the request
+            k (int, optional): Number of tickets to return
+            text (str, optional): Preprocessed text to use if the ticket is
+                                  not indexed, by default its processed_text
+        
+        Returns:
+            list: (Ticket, similarity) pairs, most similar first
+        """
+        index = self.get(classifier)
+        vector = index.vector(ticket.id)
+        if vector is None:
+            text = text or ticket.processed_text
+            if not text:
+                return []
+            vector = classifier.transform([text])
+        
+        # A few spare matches in case some were deleted
+        matches = index.query(vector, k + 5, exclude=[ticket.id])
+        if not matches:
+            return []
+        
+        tickets = {t.id: t for t in Ticket.query.filter(Ticket.id.in_([ticket_id for ticket_id, _ in matches]))}
+        return [(tickets[ticket_id], score) for ticket_id, score in matches if ticket_id in tickets][:k]
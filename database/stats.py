@@ -0,0 +1,263 @@
+"""
+Ticket counts by priority and team for the dashboard.
+
+The counts live in two summary tables: ticket_stats holds one row per
+priority and team, and ticket_stats_hourly one row per hour, priority and
+team. Triggers on the tickets table keep them up to date in the same
+transaction as every insert, reclassification and delete, including bulk
+inserts that bypass the ORM. Reading the counts touches a handful of
+summary rows instead of scanning the tickets table. Databases other than
+SQLite and PostgreSQL fall back to aggregating the tickets table.
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from database.models import db, Ticket, TicketStat, TicketStatHourly
+
+# Hour buckets in the format SQLAlchemy stores datetimes in on SQLite, so
+# they compare correctly with bound datetime parameters
+SQLITE_BUCKET = "strftime('%Y-%m-%d %H:00:00.000000', {})"
+
+SQLITE_INCREMENT = f"""
+    INSERT INTO ticket_stats (priority, team, count) VALUES (new.priority, new.team, 1)
+    ON CONFLICT (priority, team) DO UPDATE SET count = count + 1;
+    INSERT INTO ticket_stats_hourly (bucket, priority, team, count)
+    SELECT {SQLITE_BUCKET.format('new.created_at')}, new.priority, new.team, 1
+    WHERE new.created_at IS NOT NULL
+    ON CONFLICT (bucket, priority, team) DO UPDATE SET count = count + 1;
+"""
+
+SQLITE_DECREMENT = f"""
+    UPDATE ticket_stats SET count = count - 1 WHERE priority = old.priority AND team = old.team;
+    UPDATE ticket_stats_hourly SET count = count - 1
+    WHERE bucket = {SQLITE_BUCKET.format('old.created_at')} AND priority = old.priority AND team = old.team;
+"""
+
+SQLITE_STATEMENTS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_insert AFTER INSERT ON tickets BEGIN
+        {SQLITE_INCREMENT}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_delete AFTER DELETE ON tickets BEGIN
+        {SQLITE_DECREMENT}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_stats_update AFTER UPDATE OF priority, team, created_at ON tickets
+    WHEN old.priority IS NOT new.priority OR old.team IS NOT new.team OR old.created_at IS NOT new.created_at
+    BEGIN
+        {SQLITE_DECREMENT}
+        {SQLITE_INCREMENT}
+    END
+    """
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM ticket_stats",
+    "DELETE FROM ticket_stats_hourly",
+    """
+    INSERT INTO ticket_stats (priority, team, count)
+    SELECT priority, team, count(*) FROM tickets GROUP BY priority, team
+    """,
+    f"""
+    INSERT INTO ticket_stats_hourly (bucket, priority, team, count)
+    SELECT {SQLITE_BUCKET.format('created_at')}, priority, team, count(*) FROM tickets
+    WHERE created_at IS NOT NULL GROUP BY 1, 2, 3
+    """
+]
+
+POSTGRES_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION ticket_stats_maintain() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE ticket_stats SET count = count - 1 WHERE priority = OLD.priority AND team = OLD.team;
+            UPDATE ticket_stats_hourly SET count = count - 1
+            WHERE bucket = date_trunc('hour', OLD.created_at) AND priority = OLD.priority AND team = OLD.team;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO ticket_stats AS s (priority, team, count) VALUES (NEW.priority, NEW.team, 1)
+            ON CONFLICT (priority, team) DO UPDATE SET count = s.count + 1;
+            IF NEW.created_at IS NOT NULL THEN
+                INSERT INTO ticket_stats_hourly AS s (bucket, priority, team, count)
+                VALUES (date_trunc('hour', NEW.created_at), NEW.priority, NEW.team, 1)
+                ON CONFLICT (bucket, priority, team) DO UPDATE SET count = s.count + 1;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS ticket_stats_insert_delete ON tickets",
+    """
+    CREATE TRIGGER ticket_stats_insert_delete AFTER INSERT OR DELETE ON tickets
+    FOR EACH ROW EXECUTE FUNCTION ticket_stats_maintain()
+    """,
+    "DROP TRIGGER IF EXISTS ticket_stats_update ON tickets",
+    """
+    CREATE TRIGGER ticket_stats_update AFTER UPDATE OF priority, team, created_at ON tickets
+    FOR EACH ROW WHEN (
+        OLD.priority IS DISTINCT FROM NEW.priority OR OLD.team IS DISTINCT FROM NEW.team
+        OR OLD.created_at IS DISTINCT FROM NEW.created_at
+    )
+    EXECUTE FUNCTION ticket_stats_maintain()
+    """
+]
+
+POSTGRES_REBUILD = [
+    "DELETE FROM ticket_stats",
+    "DELETE FROM ticket_stats_hourly",
+    """
+    INSERT INTO ticket_stats (priority, team, count)
+    SELECT priority, team, count(*) FROM tickets GROUP BY priority, team
+    """,
+    """
+    INSERT INTO ticket_stats_hourly (bucket, priority, team, count)
+    SELECT date_trunc('hour', created_at), priority, team, count(*) FROM tickets
+    WHERE created_at IS NOT NULL GROUP BY 1, 2, 3
+    """
+]
+
+def install_stats_triggers(engine):
+    """
+    Create the triggers that maintain the summary tables if needed.
+    
+    Safe to call on every startup. When the triggers are first created for
+    an existing tickets table, the summary tables are filled from its rows.
+    
+    Args:
+        engine: SQLAlchemy engine
+    
+    Returns:
+        bool: True if the summary tables are maintained by triggers, False
+              if counts have to be computed from the tickets table
+    """
+    dialect = engine.dialect.name
+    
+    try:
+        if dialect == 'sqlite':
+            with engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'ticket_stats_insert'"
+                ).first()
+                for statement in SQLITE_STATEMENTS:
+                    conn.exec_driver_sql(statement)
+                if not exists:
+                    for statement in SQLITE_REBUILD:
+                        conn.exec_driver_sql(statement)
+            return True
+        
+        if dialect == 'postgresql':
+            with engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM pg_trigger WHERE tgname = 'ticket_stats_insert_delete'"
+                ).first()
+                for statement in POSTGRES_STATEMENTS:
+                    conn.exec_driver_sql(statement)
+                if not exists:
+                    for statement in POSTGRES_REBUILD:
+                        conn.exec_driver_sql(statement)
+            return True
+    except (OperationalError, ProgrammingError) as e:
+        # e.g. SQLite older than 3.24, without upsert
+        logging.warning(f"Ticket statistics triggers unavailable, counting from the tickets table: {e}")
+    
+    return False
+
+def nest_counts(rows):
+    """
+    Arrange (priority, team, count) rows as nested dicts.
+    
+    Args:
+        rows (iterable): (priority, team, count) tuples
+    
+    Returns:
+        tuple: (counts, total), where counts maps priority to team to count
+    """
+    counts = {}
+    total = 0
+    for priority, team, count in rows:
+        if count:
+            counts.setdefault(priority, {})[team] = count
+            total += count
+    return counts, total
+
+def ticket_counts(maintained):
+    """
+    Count all tickets by priority and team.
+    
+    Args:
+        maintained (bool): Whether the summary tables are maintained, as
+                           returned by install_stats_triggers
+    
+    Returns:
+        tuple: (counts, total), where counts maps priority to team to count
+    """
+    if maintained:
+        query = db.session.query(TicketStat.priority, TicketStat.team, TicketStat.count)
+    else:
+        query = db.session.query(Ticket.priority, Ticket.team, func.count()).group_by(Ticket.priority, Ticket.team)
+    return nest_counts(query.all())
+
+def hourly_counts(maintained, since):
+    """
+    Count the tickets created in each hour since a point in time.
+    
+    Args:
+        maintained (bool): Whether the summary tables are maintained, as
+                           returned by install_stats_triggers
+        since (datetime): Start of the first hour to include (UTC)
+    
+    Returns:
+        list: One dict per hour with tickets, oldest first, with the start
+              of the hour as ``bucket``, the ``total`` and the ``counts``
+              by priority and team
+    """
+    since = since.replace(minute=0, second=0, microsecond=0)
+    buckets = {}
+    
+    if maintained:
+        rows = (
+            db.session.query(TicketStatHourly.bucket, TicketStatHourly.priority,
+                             TicketStatHourly.team, TicketStatHourly.count)
+            .filter(TicketStatHourly.bucket >= since, TicketStatHourly.count > 0)
+            .all()
+        )
+        for bucket, priority, team, count in rows:
+            buckets.setdefault(bucket, []).append((priority, team, count))
+    else:
+        rows = (
+            db.session.query(Ticket.created_at, Ticket.priority, Ticket.team)
+            .filter(Ticket.created_at >= since)
+            .all()
+        )
+        tallies = {}
+        for created_at, priority, team in rows:
+            key = (created_at.replace(minute=0, second=0, microsecond=0), priority, team)
+            tallies[key] = tallies.get(key, 0) + 1
+        for (bucket, priority, team), count in tallies.items():
+            buckets.setdefault(bucket, []).append((priority, team, count))
+    
+    results = []
+    for bucket in sorted(buckets):
+        counts, total = nest_counts(buckets[bucket])
+        results.append({'bucket': bucket.strftime('%Y-%m-%d %H:%M:%S'), 'total': total, 'counts': counts})
+    return results
+
+def recent_hours(hours, now=None):
+    """
+    Get the start of the hour window ending now.
+    
+    Args:
+        hours (int): Number of hours in the window, including the current one
+        now (datetime, optional): Current UTC time
+    
+    Returns:
+        datetime: Start of the first hour in the window
+    """
+    now = now or datetime.utcnow()
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
@@ -0,0 +1,66 @@
+"""
+Gunicorn configuration for the Smart IT Ticket Prioritizer.
+
+The application is imported and warmed up once in the master process,
+before any worker is forked: NLTK data is checked, the corpora and model
+are loaded, one dummy prediction is run and the similarity index is
+loaded. Workers inherit all of it (shared copy-on-write), so none of them
+pays the cold start on its first request. Worker count and bind address
+still come from WEB_CONCURRENCY and PORT as usual.
+
+Each worker writes its metrics to METRICS_DIR so that /metrics reports
+totals for all workers. Without METRICS_DIR, a fresh temporary directory is
+used.
+"""
+import os
+import tempfile
+
+if not os.environ.get('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='ticket-metrics-')
+
+# Import the application in the master process, before forking workers
+preload_app = True
+
+def on_starting(server):
+    """
+    Remove metrics left in METRICS_DIR by a previous run.
+    """
+    from utils.metrics import clear_directory
+    clear_directory(os.environ['METRICS_DIR'])
+
+def when_ready(server):
+    """
+    Warm up the preloaded application before workers are started.
+    """
+    if server.cfg.preload_app:
+        from app import warmup, load_similarity_index
+        warmup()
+        load_similarity_index()
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master process.
+    """
+    if server.cfg.preload_app:
+        from app import app
+        from database.models import db
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+def post_worker_init(worker):
+    """
+    Warm up a worker that loaded the application itself, and start its
+    model watcher (threads started in the master do not survive the fork).
+    """
+    from app import warmup, load_similarity_index, start_model_watcher
+    if not worker.cfg.preload_app:
+        warmup()
+        load_similarity_index()
+    start_model_watcher()
+
+def worker_exit(server, worker):
+    """
+    Write the exiting worker's final metrics.
+    """
+    from app import metrics_registry
+    metrics_registry.close()
@@ -5,28 +5,45 @@ This module provides the TicketClassifier class that handles
 loading, training, and predicting with the ticket classification model.
 """
 import os
+import uuid
 import pickle
+import hashlib
+import logging
 import numpy as np
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.multioutput import MultiOutputClassifier
-from sklearn.linear_model import LogisticRegression
+
+from model.compact_model import CompactLinearModel, export_pipeline, is_compact_model, read_version
+from model.native_scorer import NativeLinearScorer
 
 class TicketClassifier:
     """
     Class for ticket classification.
     
-    Handles priority classification using a sklearn pipeline with TF-IDF
-    vectorization and Logistic Regression classifier.
+    Handles priority classification using a sklearn pipeline. The default
+    ``tfidf`` engine uses TF-IDF vectorization and a Logistic Regression
+    classifier. The ``hashing`` engine uses a stateless HashingVectorizer and
+    an SGD classifier, and can be trained incrementally with partial_fit.
+    
+    A joint model is trained with teams as well as priorities and has a
+    second output, so one vectorization of a ticket predicts both.
+    
+    Fitted TF-IDF models are served by a NativeLinearScorer rather than
+    through scikit-learn, which avoids its per-call overhead on small batches.
     """
     
-    def __init__(self, model_path=None):
+    ENGINES = ('tfidf', 'hashing')
+    
+    def __init__(self, model_path=None, max_features=5000, C=1.0, engine='tfidf', n_features=2 ** 18, alpha=1e-5):
         """
         Initialize the TicketClassifier.
         
         Args:
             model_path (str, optional): Path to a saved model. If not provided, 
                                         a new model will be created.
+            max_features (int, optional): Vocabulary size of a new tfidf model
+            C (float, optional): Inverse regularization strength of a new tfidf model
+            engine (str, optional): 'tfidf' or 'hashing', for a new model
+            n_features (int, optional): Hashed feature space size of a new hashing model
+            alpha (float, optional): Regularization strength of a new hashing model
         """
         self.priority_mapping = {
             0: 'Low',
@@ -37,48 +54,330 @@ class TicketClassifier:
         
         self.reverse_priority_mapping = {v: k for k, v in self.priority_mapping.items()}
         
+        self.team_mapping = {
+            0: 'network',
+            1: 'hardware',
+            2: 'software',
+            3: 'security'
+        }
+        
+        self.reverse_team_mapping = {v: k for k, v in self.team_mapping.items()}
+        
+        # Identifies the fitted model; changes whenever it is trained or loaded
+        self.version = 'untrained'
+        
+        # Set instead of the pipeline when a compact model is loaded
+        self.compact_model = None
+        
+        # Scores fitted TF-IDF models without going through scikit-learn
+        self.scorer = None
+        
         if model_path and os.path.exists(model_path):
             self.load_model(model_path)
-        else:
-            # Create a new pipeline
+        elif engine == 'hashing':
+            from sklearn.pipeline import Pipeline
+            from sklearn.feature_extraction.text import HashingVectorizer
+            from sklearn.multioutput import MultiOutputClassifier
+            from sklearn.linear_model import SGDClassifier
+            
+            # No vocabulary to fit or store: the vectorizer is stateless, so
+            # the model can be trained one chunk at a time
             self.pipeline = Pipeline([
-                ('vectorizer', TfidfVectorizer(max_features=5000)),
-                ('classifier', MultiOutputClassifier(LogisticRegression(max_iter=1000)))
+                ('vectorizer', HashingVectorizer(n_features=n_features, alternate_sign=False)),
+                ('classifier', MultiOutputClassifier(SGDClassifier(loss='log_loss', alpha=alpha, random_state=0)))
             ])
+        elif engine == 'tfidf':
+            # Create a new pipeline. scikit-learn is imported here rather than
+            # at module level, so serving a compact model never loads it.
+            from sklearn.pipeline import Pipeline
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.multioutput import MultiOutputClassifier
+            from sklearn.linear_model import LogisticRegression
+            
+            self.pipeline = Pipeline([
+                ('vectorizer', TfidfVectorizer(max_features=max_features)),
+                ('classifier', MultiOutputClassifier(LogisticRegression(C=C, max_iter=1000)))
+            ])
+        else:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(self.ENGINES)}")
     
-    def train(self, texts, priorities):
+    def train(self, texts, priorities, teams=None):
         """
         Train the classifier model.
         
         Args:
             texts (list): List of preprocessed ticket texts
             priorities (list): List of priority labels
-            
+            teams (list, optional): List of team labels. If given, a joint
+                                    model predicting both is trained.
+        
         Returns:
             self: The trained classifier
         """
-        # Convert priority strings to numeric values
-        numeric_priorities = np.array([[self.reverse_priority_mapping[p]] for p in priorities])
-        
         # Train the model
-        self.pipeline.fit(texts, numeric_priorities)
+        self.pipeline.fit(texts, self._targets(priorities, teams))
+        self.version = uuid.uuid4().hex[:12]
+        self._build_scorer()
+        return self
+    
+    def _targets(self, priorities, teams=None):
+        """Numeric label matrix with a priority and optionally a team column"""
+        if teams is None:
+            return np.array([[self.reverse_priority_mapping[p]] for p in priorities])
+        if len(teams) != len(priorities):
+            raise ValueError("Expected one team per priority")
+        return np.array([
+            [self.reverse_priority_mapping[p], self.reverse_team_mapping[t]]
+            for p, t in zip(priorities, teams)
+        ])
+    
+    @property
+    def joint(self):
+        """Whether the model predicts teams as well as priorities"""
+        if self.scorer is not None:
+            return len(self.scorer.outputs) == 2
+        if self.compact_model is not None:
+            return len(self.compact_model.outputs) == 2
+        return len(getattr(self.pipeline.named_steps['classifier'], 'estimators_', ())) == 2
+    
+    def partial_fit(self, texts, priorities, teams=None):
+        """
+        Update the model with one batch of tickets.
+        
+        Only models using the hashing engine support this. Memory use
+        depends on the batch size, not on how much data the model has seen.
+        
+        Args:
+            texts (list): List of preprocessed ticket texts
+            priorities (list): List of priority labels
+            teams (list, optional): List of team labels, for a joint model
+        
+        Returns:
+            self: The updated classifier
+        
+        Raises:
+            ValueError: If the model cannot be trained incrementally
+        """
+        if self.pipeline is None or not hasattr(self.pipeline.named_steps['classifier'], 'partial_fit'):
+            raise ValueError("Only models using the hashing engine can be trained incrementally")
+        
+        features = self.pipeline.named_steps['vectorizer'].transform(texts)
+        targets = self._targets(priorities, teams)
+        
+        # Every batch lists all classes, since any of them may be missing from it
+        classes = [np.array(sorted(self.priority_mapping))]
+        if teams is not None:
+            classes.append(np.array(sorted(self.team_mapping)))
+        self.pipeline.named_steps['classifier'].partial_fit(features, targets, classes=classes)
+        self.version = uuid.uuid4().hex[:12]
         return self
     
+    def update(self, texts, priorities, epochs=3, learning_rate=0.5):
+        """
+        Adjust the fitted model towards a batch of corrected labels.
+        
+        Hashing models are updated with partial_fit. TF-IDF models keep their
+        vocabulary and take a few gradient steps on the log loss of the
+        batch, starting from the current weights. Either way the cost
+        depends on the size of the batch, not on the data the model was
+        originally trained on.
+        
+        Args:
+            texts (list): List of preprocessed ticket texts
+            priorities (list): List of corrected priority labels
+            epochs (int, optional): Passes over the batch
+            learning_rate (float, optional): Step size of the TF-IDF updates
+        
+        Returns:
+            self: The updated classifier
+        
+        Raises:
+            ValueError: If the model is a compact model, which cannot be changed
+        """
+        if self.pipeline is None:
+            raise ValueError("A compact model cannot be updated; load the pickle instead")
+        
+        classifier = self.pipeline.named_steps['classifier']
+        if hasattr(classifier, 'partial_fit') and not self.joint:
+            for _ in range(epochs):
+                self.partial_fit(texts, priorities)
+            return self
+        
+        # Corrections are for the priority, the first output of a joint model
+        features = self.pipeline.named_steps['vectorizer'].transform(texts)
+        targets = np.array([self.reverse_priority_mapping[p] for p in priorities])
+        estimator = classifier.estimators_[0]
+        if hasattr(classifier, 'partial_fit'):
+            for _ in range(epochs):
+                estimator.partial_fit(features, targets, classes=np.array(sorted(self.priority_mapping)))
+            self.version = uuid.uuid4().hex[:12]
+            return self
+        
+        for _ in range(epochs):
+            self._gradient_step(estimator, features, targets, learning_rate)
+        
+        # The scorer holds a copy of the coefficients
+        self._build_scorer()
+        self.version = uuid.uuid4().hex[:12]
+        return self
+    
+    @staticmethod
+    def _gradient_step(estimator, features, targets, learning_rate):
+        """
+        Take one gradient step of a fitted logistic regression on a batch.
+        
+        Labels the estimator was never trained on are ignored, since it has
+        no weights for them.
+        """
+        known = np.isin(targets, estimator.classes_)
+        if not known.any():
+            return
+        features, targets = features[known], targets[known]
+        
+        scores = features @ estimator.coef_.T + estimator.intercept_
+        if estimator.coef_.shape[0] == 1:
+            # Binary: one row of weights for the second class
+            errors = 1 / (1 + np.exp(-scores)) - (targets == estimator.classes_[1])[:, None]
+        else:
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            errors = probabilities - (targets[:, None] == estimator.classes_[None, :])
+        
+        # Only the feature weights move. The intercepts hold the class
+        # priors, which a batch of corrections does not represent.
+        step = learning_rate / len(targets)
+        estimator.coef_ -= step * np.asarray(features.T @ errors).T
+    
     def predict(self, text):
         """
         Predict the priority of a ticket.
         
         Args:
             text (str): Preprocessed ticket text
-            
+        
         Returns:
             str: Predicted priority level
         """
-        # Make prediction
-        prediction = self.pipeline.predict([text])[0][0]
+        return self.predict_many([text])[0]
+    
+    def predict_many(self, texts):
+        """
+        Predict the priorities of a batch of tickets.
+        
+        The whole batch is vectorized in one call and scored with a single
+        product over its sparse features.
+        
+        Args:
+            texts (list): List of preprocessed ticket texts
+        
+        Returns:
+            list: Predicted priority levels, in the same order as ``texts``
+        """
+        if not texts:
+            return []
+        
+        return self.predict_features(self.vectorize(texts))
+    
+    def vectorize(self, texts):
+        """
+        Compute the TF-IDF features of a batch of tickets.
         
-        # Convert numeric prediction to string label
-        return self.priority_mapping[prediction]
+        Args:
+            texts (list): List of preprocessed ticket texts
+        
+        Returns:
+            list or csr_matrix: (indices, weights) pairs from the native
+                                scorer, or a feature matrix, one row per text
+        """
+        if self.scorer is not None:
+            return self.scorer.vectorize(texts)
+        if self.compact_model is not None:
+            return self.compact_model.transform(texts)
+        return self.pipeline.named_steps['vectorizer'].transform(texts)
+    
+    def transform(self, texts):
+        """
+        Compute the feature matrix of a batch of tickets.
+        
+        Args:
+            texts (list): List of preprocessed ticket texts
+        
+        Returns:
+            csr_matrix: Features of the fitted vectorizer, one row per text
+        """
+        features = self.vectorize(texts)
+        if self.scorer is not None:
+            return self.scorer.to_matrix(features)
+        return features
+    
+    def predict_features(self, features):
+        """
+        Predict priorities from features computed by vectorize().
+        
+        Args:
+            features (list or csr_matrix): Features of each ticket
+        
+        Returns:
+            list: Predicted priority levels, one per row
+        """
+        if self.scorer is not None:
+            predictions = self.scorer.predict_features(features)
+        elif self.compact_model is not None:
+            predictions = self.compact_model.predict_features(features)
+        else:
+            predictions = self.pipeline.named_steps['classifier'].predict(features)
+        
+        # Convert numeric predictions to string labels
+        return [self.priority_mapping[row[0]] for row in predictions]
+    
+    def classify_many(self, texts):
+        """
+        Predict the priorities and, with a joint model, the teams of a batch
+        of tickets.
+        
+        Args:
+            texts (list): List of preprocessed ticket texts
+        
+        Returns:
+            list: (priority, team, team_confidence) per text, see
+                  classify_features()
+        """
+        if not texts:
+            return []
+        
+        return self.classify_features(self.vectorize(texts))
+    
+    def classify_features(self, features):
+        """
+        Predict priorities and teams from features computed by vectorize().
+        
+        Args:
+            features (list or csr_matrix): Features of each ticket
+        
+        Returns:
+            list: (priority, team, team_confidence) per row, where
+                  team_confidence is the predicted probability of the team.
+                  Without a team output, team and team_confidence are None.
+        """
+        if not self.joint:
+            return [(priority, None, None) for priority in self.predict_features(features)]
+        
+        if self.scorer is not None:
+            predictions, confidences = self.scorer.predict_features(features, confidence=True)
+        elif self.compact_model is not None:
+            predictions, confidences = self.compact_model.predict_features(features, confidence=True)
+        else:
+            classifier = self.pipeline.named_steps['classifier']
+            predictions = classifier.predict(features)
+            confidences = np.column_stack([
+                probabilities.max(axis=1) for probabilities in classifier.predict_proba(features)
+            ])
+        
+        return [
+            (self.priority_mapping[row[0]], self.team_mapping[row[1]], float(confidence[1]))
+            for row, confidence in zip(predictions, confidences)
+        ]
     
     def save_model(self, model_path):
         """
@@ -87,15 +386,104 @@ class TicketClassifier:
         Args:
             model_path (str): Path where to save the model
         """
-        with open(model_path, 'wb') as f:
+        if self.pipeline is None:
+            raise ValueError("A compact model cannot be saved as a pickle")
+        
+        # Write to a temporary file first so a process reloading the model
+        # never reads a partly written file
+        temp_path = f"{model_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
             pickle.dump(self.pipeline, f)
+        os.replace(temp_path, model_path)
+        
+        self.version = self.file_version(model_path)
+    
+    def save_compact(self, model_path):
+        """
+        Save the model in the compact, memory-mappable format.
+        
+        Args:
+            model_path (str): Directory where to save the model
+        """
+        export_pipeline(self.pipeline, model_path, version=self.version)
     
     def load_model(self, model_path):
         """
         Load the model from disk.
         
+        Args:
+            model_path (str): Path to the saved model, either a pickle or a
+                              compact model directory
+        """
+        if is_compact_model(model_path):
+            self.compact_model = CompactLinearModel(model_path)
+            self.pipeline = None
+        else:
+            with open(model_path, 'rb') as f:
+                self.pipeline = pickle.load(f)
+            self.compact_model = None
+        
+        self._build_scorer()
+        self.version = self.file_version(model_path)
+    
+    def _build_scorer(self):
+        """
+        Extract a native scorer from the fitted model.
+        
+        Models the scorer cannot reproduce, such as hashing models, keep
+        using the scikit-learn pipeline.
+        """
+        try:
+            if self.compact_model is not None:
+                self.scorer = NativeLinearScorer.from_compact(self.compact_model)
+            else:
+                self.scorer = NativeLinearScorer.from_pipeline(self.pipeline)
+        except ValueError:
+            self.scorer = None
+    
+    @staticmethod
+    def file_version(model_path):
+        """
+        Compute the version of a saved model from its content.
+        
         Args:
             model_path (str): Path to the saved model
+        
+        Returns:
+            str: Short content hash of the model file
         """
+        # Compact models carry the version of the model they were exported from
+        if is_compact_model(model_path):
+            version = read_version(model_path)
+            if version:
+                return version
+            model_path = os.path.join(model_path, 'meta.json')
+        
+        digest = hashlib.sha256()
         with open(model_path, 'rb') as f:
-            self.pipeline = pickle.load(f)
\ No newline at end of file
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:12]
+
+
+def load_classifier(model_path, compact_path=None):
+    """
+    Load the classifier, preferring the compact model when it is current.
+    
+    The compact model is only used if it was exported from the pickled
+    model at model_path (or no pickle exists); otherwise the pickle is
+    loaded so a stale compact model never shadows a retrained one.
+    
+    Args:
+        model_path (str): Path to the pickled model
+        compact_path (str, optional): Path to the compact model directory
+    
+    Returns:
+        TicketClassifier: The loaded classifier
+    """
+    if compact_path and is_compact_model(compact_path):
+        if not os.path.exists(model_path) or read_version(compact_path) == TicketClassifier.file_version(model_path):
+            return TicketClassifier(compact_path)
+        logging.warning(f"Compact model {compact_path} is out of date; loading {model_path} instead")
+    
+    return TicketClassifier(model_path)
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+Compact, memory-mappable model format for ticket classification.
+
+A fitted TF-IDF + logistic regression pipeline is stored as a directory
+of raw NumPy arrays instead of a pickle:
+
+    meta.json           vectorizer settings, output classes and version
+    vocabulary.npy      sorted vocabulary; a term's position is its feature index
+    idf.npy             float32 idf weights
+    coef_<i>.npy        float32 coefficients of output i
+    intercept_<i>.npy   float32 intercepts of output i
+
+The arrays are opened with numpy memory mapping, so loading is nearly
+instant and every gunicorn worker shares the same pages through the OS
+page cache instead of holding its own unpickled copy.
+
+Usage (convert an existing pickled model):
+    python -m model.compact_model model/ticket_classifier.pkl model/ticket_classifier.compact
+"""
+import os
+import re
+import sys
+import json
+import shutil
+import pickle
+import argparse
+import numpy as np
+from scipy import sparse
+
+# Add parent directory to path to import from model
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+
+# Vectorizer settings the compact scorer reproduces
+SUPPORTED_VECTORIZER = {
+    'analyzer': 'word',
+    'ngram_range': (1, 1),
+    'preprocessor': None,
+    'tokenizer': None,
+    'stop_words': None,
+    'strip_accents': None,
+    'binary': False
+}
+
+def softmax_max(scores):
+    """
+    Probability of the most likely class of each row of multiclass scores.
+    
+    Args:
+        scores (ndarray): Decision function values, one row per text
+    
+    Returns:
+        ndarray: Largest softmax probability of each row
+    """
+    # exp(max - max) is 1, so the largest probability is 1 / sum
+    return 1 / np.exp(scores - scores.max(axis=1, keepdims=True)).sum(axis=1)
+
+def export_pipeline(pipeline, path, version=None):
+    """
+    Write a fitted pipeline in the compact format.
+    
+    Args:
+        pipeline (Pipeline): Fitted pipeline with a TfidfVectorizer
+                             'vectorizer' step and a MultiOutputClassifier of
+                             linear models as 'classifier' step
+        path (str): Output directory. Replaced if it already exists.
+        version (str, optional): Model version recorded in the artifact
+    
+    Raises:
+        ValueError: If the pipeline uses features the compact format
+                    cannot reproduce
+    """
+    vectorizer = pipeline.named_steps['vectorizer']
+    estimators = pipeline.named_steps['classifier'].estimators_
+    
+    params = vectorizer.get_params()
+    for name, expected in SUPPORTED_VECTORIZER.items():
+        if params.get(name) != expected:
+            raise ValueError(f"Compact format does not support {name}={params.get(name)!r}")
+    if not hasattr(vectorizer, 'vocabulary_'):
+        raise ValueError("Compact format needs a fitted vocabulary")
+    
+    vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    if vocabulary != sorted(vocabulary):
+        raise ValueError("Vectorizer vocabulary is not in sorted order")
+    
+    # Write everything to a temporary directory, then swap it into place
+    temp_path = f"{path.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    
+    np.save(os.path.join(temp_path, 'vocabulary.npy'), np.array(vocabulary, dtype=np.str_))
+    idf = vectorizer.idf_ if params['use_idf'] else np.ones(len(vocabulary))
+    np.save(os.path.join(temp_path, 'idf.npy'), idf.astype(np.float32))
+    
+    outputs = []
+    for i, estimator in enumerate(estimators):
+        np.save(os.path.join(temp_path, f'coef_{i}.npy'), estimator.coef_.astype(np.float32))
+        np.save(os.path.join(temp_path, f'intercept_{i}.npy'),
+                np.atleast_1d(estimator.intercept_).astype(np.float32))
+        outputs.append({'classes': estimator.classes_.tolist()})
+    
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'version': version,
+        'lowercase': params['lowercase'],
+        'token_pattern': params['token_pattern'],
+        'norm': params['norm'],
+        'sublinear_tf': params['sublinear_tf'],
+        'outputs': outputs
+    }
+    with open(os.path.join(temp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    
+    old_path = f"{path.rstrip(os.sep)}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(temp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+def is_compact_model(path):
+    """
+    Check whether a path holds a compact model.
+    
+    Args:
+        path (str): Model path
+    
+    Returns:
+        bool: True if path is a compact model directory
+    """
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+def read_version(path):
+    """
+    Read the model version recorded in a compact model.
+    
+    Args:
+        path (str): Compact model directory
+    
+    Returns:
+        str: Model version, or None if none was recorded
+    """
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        return json.load(f).get('version')
+
+class CompactLinearModel:
+    """
+    TF-IDF + linear classifier scorer backed by memory-mapped arrays.
+    
+    Predictions match the pipeline the artifact was exported from, up to
+    float32 rounding.
+    """
+    
+    def __init__(self, path):
+        """
+        Open a compact model.
+        
+        Args:
+            path (str): Compact model directory
+        """
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact model format: {meta.get('format_version')}")
+        
+        self.path = path
+        self.version = meta.get('version')
+        self.lowercase = meta['lowercase']
+        self.norm = meta['norm']
+        self.sublinear_tf = meta['sublinear_tf']
+        self.token_pattern = re.compile(meta['token_pattern'])
+        
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode='r')
+        
+        self.vocabulary = load('vocabulary.npy')
+        self.idf = load('idf.npy')
+        self.outputs = [
+            (load(f'coef_{i}.npy'), load(f'intercept_{i}.npy'), np.array(output['classes']))
+            for i, output in enumerate(meta['outputs'])
+        ]
+    
+    @property
+    def n_features(self):
+        return len(self.vocabulary)
+    
+    def transform(self, texts):
+        """
+        Compute TF-IDF features the same way the fitted vectorizer does.
+        
+        Args:
+            texts (list): Preprocessed ticket texts
+        
+        Returns:
+            csr_matrix: float32 feature matrix, one row per text
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            if self.lowercase:
+                text = text.lower()
+            tokens = self.token_pattern.findall(text)
+            if tokens:
+                # Binary search in the sorted, memory-mapped vocabulary
+                candidates = np.searchsorted(self.vocabulary, tokens)
+                candidates[candidates == self.n_features] = 0
+                found = candidates[self.vocabulary[candidates] == np.array(tokens)]
+                columns, counts = np.unique(found, return_counts=True)
+                indices.extend(columns.tolist())
+                data.extend(counts.tolist())
+            indptr.append(len(indices))
+        
+        features = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(texts), self.n_features)
+        )
+        
+        if self.sublinear_tf:
+            np.log(features.data, features.data)
+            features.data += 1
+        features = features.multiply(self.idf).tocsr()
+        
+        if self.norm:
+            if self.norm == 'l2':
+                row_norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+            else:
+                row_norms = np.asarray(abs(features).sum(axis=1)).ravel()
+            row_norms[row_norms == 0] = 1
+            features = sparse.diags(1 / row_norms).dot(features).tocsr()
+        
+        return features.astype(np.float32)
+    
+    def predict(self, texts):
+        """
+        Predict every output for a batch of texts.
+        
+        Args:
+            texts (list): Preprocessed ticket texts
+        
+        Returns:
+            ndarray: Predicted class labels, shape (n_texts, n_outputs)
+        """
+        return self.predict_features(self.transform(texts))
+    
+    def predict_features(self, features, confidence=False):
+        """
+        Predict every output for already vectorized texts.
+        
+        Args:
+            features (csr_matrix): Feature matrix from transform()
+            confidence (bool, optional): Also return the probability of
+                                         each predicted label
+        
+        Returns:
+            ndarray: Predicted class labels, shape (n_texts, n_outputs),
+                     and with confidence, their probabilities in an array
+                     of the same shape
+        """
+        columns = []
+        probabilities = []
+        for coef, intercept, classes in self.outputs:
+            scores = features.dot(np.asarray(coef).T) + intercept
+            if scores.shape[1] == 1:
+                # Binary classifier: positive score means the second class
+                columns.append(classes[(scores[:, 0] > 0).astype(int)])
+                if confidence:
+                    probabilities.append(1 / (1 + np.exp(-np.abs(scores[:, 0]))))
+            else:
+                columns.append(classes[np.argmax(scores, axis=1)])
+                if confidence:
+                    probabilities.append(softmax_max(scores))
+        
+        if confidence:
+            return np.column_stack(columns), np.column_stack(probabilities)
+        return np.column_stack(columns)
+
+def convert(pickle_path, compact_path):
+    """
+    Convert a pickled pipeline into a compact model.
+    
+    Args:
+        pickle_path (str): Path to the pickled pipeline
+        compact_path (str): Output directory
+    """
+    # Imported here to avoid a circular import with model.classifier
+    from model.classifier import TicketClassifier
+    
+    with open(pickle_path, 'rb') as f:
+        pipeline = pickle.load(f)
+    export_pipeline(pipeline, compact_path, version=TicketClassifier.file_version(pickle_path))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert a pickled ticket classifier to the compact format.')
+    parser.add_argument('pickle_path', help='pickled model, e.g. model/ticket_classifier.pkl')
+    parser.add_argument('compact_path', help='output directory, e.g. model/ticket_classifier.compact')
+    args = parser.parse_args(argv)
+    
+    convert(args.pickle_path, args.compact_path)
+    print(f"Wrote compact model to {args.compact_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Hot-swappable holder for the active ticket classifier.
+
+A new model is loaded and warmed up next to the one serving requests, then
+swapped in with a single reference assignment. Requests read
+``registry.current`` once and use that classifier throughout, so a request
+never mixes two models and never waits for a reload.
+"""
+import os
+import time
+import logging
+import threading
+
+from model.classifier import load_classifier
+from model.compact_model import META_FILE
+
+class ModelRegistry:
+    """
+    Holds the classifier in use and replaces it when the artifact changes.
+    """
+    
+    def __init__(self, model_path, compact_path=None, loader=load_classifier):
+        """
+        Load the initial model.
+        
+        Args:
+            model_path (str): Path to the pickled model
+            compact_path (str, optional): Path to the compact model directory
+            loader (callable, optional): Function loading a classifier from
+                                         (model_path, compact_path)
+        """
+        self.model_path = model_path
+        self.compact_path = compact_path
+        self.loader = loader
+        
+        # Serializes reloads; requests never take it
+        self._lock = threading.Lock()
+        self._signature = self.artifact_signature()
+        self._changed_signature = None
+        self._watcher = None
+        self._stop = threading.Event()
+        
+        self.current = loader(model_path, compact_path)
+        self.loaded_at = time.time()
+    
+    def artifact_signature(self):
+        """
+        Describe the model files on disk, to notice when they change.
+        
+        Returns:
+            tuple: (path, modification time, size) of each model file that exists
+        """
+        paths = [self.model_path]
+        if self.compact_path:
+            paths.append(os.path.join(self.compact_path, META_FILE))
+        
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+    
+    def reload(self, force=False):
+        """
+        Load the model from disk and swap it in if its version changed.
+        
+        The new model runs one prediction before the swap, so the first
+        request it serves is not slower than any other.
+        
+        Args:
+            force (bool, optional): Swap even if the version is unchanged
+        
+        Returns:
+            bool: True if a new model was swapped in
+        """
+        with self._lock:
+            signature = self.artifact_signature()
+            try:
+                model = self.loader(self.model_path, self.compact_path)
+                model.predict_many(["warm up"])
+            finally:
+                # Retry a broken artifact only once it changes again
+                self._signature = signature
+                self._changed_signature = None
+            
+            # The compact copy of a model can appear just after its pickle;
+            # prefer it even though the version is the same
+            same_format = (model.compact_model is None) == (self.current.compact_model is None)
+            if not force and model.version == self.current.version and same_format:
+                return False
+            
+            previous = self.current.version
+            self.current = model
+            self.loaded_at = time.time()
+            logging.info(f"Swapped model {previous} for {model.version}")
+            return True
+    
+    def reload_if_changed(self):
+        """
+        Reload the model if its files changed and have stopped changing.
+        
+        A change is only acted on once two calls in a row see the same files,
+        so a model that is still being written is never loaded.
+        
+        Returns:
+            bool: True if a new model was swapped in
+        """
+        signature = self.artifact_signature()
+        if signature == self._signature:
+            self._changed_signature = None
+            return False
+        if signature != self._changed_signature:
+            self._changed_signature = signature
+            return False
+        return self.reload()
+    
+    def start_watcher(self, interval=5.0):
+        """
+        Check the model files for changes in a background thread.
+        
+        Args:
+            interval (float, optional): Seconds between checks
+        """
+        if self._watcher is not None:
+            return
+        
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logging.error(f"Error reloading model: {e}")
+        
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watcher(self):
+        """
+        Stop the background watcher thread.
+        """
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+    
+    def info(self):
+        """
+        Describe the model in use.
+        
+        Returns:
+            dict: Model version, type and load time
+        """
+        return {
+            'version': self.current.version,
+            'format': 'compact' if self.current.compact_model is not None else 'pickle',
+            'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(self.loaded_at))
+        }
@@ -0,0 +1,255 @@
+"""
+Nearest-neighbour index of ticket TF-IDF vectors.
+
+Holds one L2-normalised sparse row per ticket, computed with the fitted
+vectorizer of the classifier, so the dot product of two rows is their
+cosine similarity. A query scores every row with one sparse matrix-vector
+product and keeps the top k. Optionally, an inverted index (the matrix in
+column-major form) limits scoring to the rows that share a term with the
+query, leaving out terms so common that they would select most rows
+while adding little to any score.
+
+New rows go to a small delta matrix that is merged into the main matrix
+once it grows past a fraction of it, so appending a ticket does not copy
+the whole index. The index can be saved to and loaded from a single .npz
+file.
+"""
+import os
+import json
+import threading
+from collections import namedtuple
+import numpy as np
+from scipy import sparse
+
+FORMAT_VERSION = 1
+
+# Rows held outside the main matrix before they are merged into it
+MIN_DELTA_ROWS = 1024
+
+# Matrices and ids swapped in together, so queries never see a half update
+_State = namedtuple('_State', ['main', 'main_ids', 'postings', 'delta', 'delta_ids'])
+
+def normalize_rows(matrix):
+    """
+    Scale the rows of a sparse matrix to unit L2 length.
+    
+    Args:
+        matrix (csr_matrix): Feature matrix
+    
+    Returns:
+        csr_matrix: float32 copy with unit-length rows; empty rows stay empty
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32, copy=True)
+    lengths = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    lengths[lengths == 0] = 1
+    matrix.data /= np.repeat(lengths, np.diff(matrix.indptr)).astype(np.float32)
+    return matrix
+
+class SimilarityIndex:
+    """
+    Top-k cosine similarity search over ticket feature vectors.
+    """
+    
+    def __init__(self, n_features, model_version=None, prune_df=0.0):
+        """
+        Initialize an empty SimilarityIndex.
+        
+        Args:
+            n_features (int): Number of features of the vectorizer
+            model_version (str, optional): Version of the model whose
+                                           vectorizer computes the rows
+            prune_df (float, optional): Score only rows sharing a query
+                                        term found in at most this share
+                                        of the rows. 0 scores every row.
+        """
+        self.n_features = n_features
+        self.model_version = model_version
+        self.prune_df = prune_df
+        
+        # Every ticket up to this id is indexed or has nothing to index
+        self.settled_id = 0
+        
+        empty = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        no_ids = np.zeros(0, dtype=np.int64)
+        self._state = _State(empty, no_ids, self._postings(empty), empty, no_ids)
+        self._positions = {}  # ticket id -> row, counting main rows first
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._positions)
+    
+    def __contains__(self, ticket_id):
+        return ticket_id in self._positions
+    
+    def _postings(self, matrix):
+        """Column-major copy of a matrix, the inverted index used for pruning"""
+        return matrix.tocsc() if self.prune_df else None
+    
+    def add(self, ids, matrix):
+        """
+        Append tickets to the index.
+        
+        Tickets already in the index are skipped.
+        
+        Args:
+            ids (list): Ticket ids
+            matrix (csr_matrix): Their feature rows, in the same order
+        """
+        with self._lock:
+            keep = [i for i, ticket_id in enumerate(ids) if ticket_id not in self._positions]
+            if not keep:
+                return
+            
+            rows = normalize_rows(matrix[keep])
+            new_ids = np.asarray(ids, dtype=np.int64)[keep]
+            state = self._state
+            start = len(state.main_ids) + len(state.delta_ids)
+            delta = sparse.vstack([state.delta, rows], format='csr')
+            delta_ids = np.concatenate([state.delta_ids, new_ids])
+            
+            if len(delta_ids) > max(MIN_DELTA_ROWS, len(state.main_ids) // 8):
+                main = sparse.vstack([state.main, delta], format='csr')
+                main_ids = np.concatenate([state.main_ids, delta_ids])
+                empty = sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+                state = _State(main, main_ids, self._postings(main), empty, np.zeros(0, dtype=np.int64))
+            else:
+                state = state._replace(delta=delta, delta_ids=delta_ids)
+            
+            for offset, ticket_id in enumerate(new_ids.tolist()):
+                self._positions[ticket_id] = start + offset
+            self._state = state
+    
+    def vector(self, ticket_id):
+        """
+        Get the indexed row of a ticket.
+        
+        Args:
+            ticket_id (int): Ticket id
+        
+        Returns:
+            csr_matrix: 1 x n_features unit-length row, or None if the
+                        ticket is not indexed
+        """
+        # add() records positions before it publishes the state holding them
+        with self._lock:
+            state = self._state
+            position = self._positions.get(ticket_id)
+        if position is None:
+            return None
+        if position < len(state.main_ids):
+            return state.main[position]
+        return state.delta[position - len(state.main_ids)]
+    
+    def query(self, vector, k=10, exclude=()):
+        """
+        Find the indexed tickets most similar to a feature vector.
+        
+        Args:
+            vector (csr_matrix): 1 x n_features feature row, normalised or not
+            k (int, optional): Number of tickets to return
+            exclude (iterable, optional): Ticket ids to leave out
+        
+        Returns:
+            list: (ticket_id, similarity) pairs, most similar first, with
+                  similarity above 0
+        """
+        state = self._state
+        vector = normalize_rows(vector)
+        if not vector.nnz:
+            return []
+        query = np.zeros(self.n_features, dtype=np.float32)
+        query[vector.indices] = vector.data
+        
+        ids = [state.delta_ids]
+        scores = [state.delta @ query]
+        terms = None
+        if state.postings is not None:
+            # Query terms rare enough to select candidates
+            frequencies = np.diff(state.postings.indptr)[vector.indices]
+            terms = vector.indices[frequencies <= self.prune_df * len(state.main_ids)]
+        if terms is not None and len(terms):
+            rows = np.unique(np.concatenate([
+                state.postings.indices[state.postings.indptr[term]:state.postings.indptr[term + 1]]
+                for term in terms
+            ]))
+            ids.append(state.main_ids[rows])
+            scores.append(state.main[rows] @ query)
+        else:
+            ids.append(state.main_ids)
+            scores.append(state.main @ query)
+        
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        exclude = set(exclude)
+        
+        # Enough spare results to drop the excluded ones
+        wanted = min(k + len(exclude), len(scores))
+        if wanted <= 0:
+            return []
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        
+        results = []
+        for position in top:
+            ticket_id = int(ids[position])
+            if scores[position] <= 0 or ticket_id in exclude:
+                continue
+            results.append((ticket_id, float(scores[position])))
+            if len(results) == k:
+                break
+        return results
+    
+    def save(self, path):
+        """
+        Write the index to an .npz file, replacing it atomically.
+        
+        Args:
+            path (str): File path
+        """
+        with self._lock:
+            state = self._state
+            matrix = sparse.vstack([state.main, state.delta], format='csr')
+            ids = np.concatenate([state.main_ids, state.delta_ids])
+            meta = {
+                'format': FORMAT_VERSION,
+                'model_version': self.model_version,
+                'settled_id': self.settled_id
+            }
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                     shape=np.array(matrix.shape), ids=ids, meta=np.array(json.dumps(meta)))
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path, prune_df=0.0):
+        """
+        Read an index written by save().
+        
+        Args:
+            path (str): File path
+            prune_df (float, optional): As for the constructor
+        
+        Returns:
+            SimilarityIndex: The loaded index
+        
+        Raises:
+            ValueError: If the file has an unknown format
+        """
+        with np.load(path) as f:
+            meta = json.loads(str(f['meta']))
+            if meta.get('format') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported similarity index format: {meta.get('format')}")
+            shape = tuple(int(size) for size in f['shape'])
+            matrix = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=shape)
+            ids = f['ids']
+        
+        index = cls(shape[1], meta['model_version'], prune_df)
+        index.settled_id = meta['settled_id']
+        index._state = index._state._replace(main=matrix, main_ids=ids, postings=index._postings(matrix))
+        index._positions = {ticket_id: row for row, ticket_id in enumerate(ids.tolist())}
+        return index
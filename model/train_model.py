@@ -2,17 +2,33 @@
 Training script for the IT ticket classifier.
 
 This script loads the sample dataset, preprocesses the text, and trains
-the ticket classifier model for priority prediction.
+the ticket classifier model for priority prediction. With --joint, the
+model is trained on the Team column as well and predicts both.
+
+Preprocessing can be split across a process pool (--parallel), and the
+preprocessed corpus is cached on disk keyed by a hash of the dataset, so
+retraining with different hyperparameters skips the NLP work.
+
+With --engine hashing, the dataset is instead streamed in chunks into an
+incrementally trained model (see train_online), so datasets larger than
+memory can be used.
 """
 import os
+import time
+import shutil
+import pickle
+import hashlib
+import argparse
+import numpy as np
 import pandas as pd
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path to import from utils and model
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.text_preprocessing import preprocess_text, combine_title_description
+from utils.text_preprocessing import combine_title_description, PREPROCESSING_VERSION
 from model.classifier import TicketClassifier
 
 # Set up logging
@@ -21,41 +37,326 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def train_model():
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(SCRIPT_DIR, 'sample_tickets.csv')
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'ticket_classifier.pkl')
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache')
+
+def compact_path_for(model_path):
     """
-    Train the ticket classifier model using the sample dataset.
+    Get the compact model directory saved alongside a pickled model.
+    
+    Args:
+        model_path (str): Path to the pickled model
+    
+    Returns:
+        str: Path of the compact model directory
+    """
+    return os.path.splitext(model_path)[0] + '.compact'
+
+def preprocess_frame(df):
+    """
+    Preprocess the tickets in a DataFrame.
+    
+    Args:
+        df (DataFrame): Tickets with Title and Description columns
+    
+    Returns:
+        list: Combined and preprocessed text, one entry per row
+    """
+    return [
+        combine_title_description(title, description)
+        for title, description in zip(df['Title'], df['Description'])
+    ]
+
+def preprocess_parallel(df, workers=None, pool=None):
+    """
+    Preprocess the tickets in a DataFrame across a process pool.
+    
+    Args:
+        df (DataFrame): Tickets with Title and Description columns
+        workers (int, optional): Number of processes. Defaults to one per CPU.
+        pool (ProcessPoolExecutor, optional): Pool to use instead of starting one
+    
+    Returns:
+        list: Combined and preprocessed text, in row order
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    # A few chunks per worker keeps the pool busy when chunks finish unevenly
+    n_chunks = min(len(df), workers * 4) or 1
+    chunks = [df.iloc[indices] for indices in np.array_split(np.arange(len(df)), n_chunks)]
+    
+    if pool is not None:
+        return [text for chunk_texts in pool.map(preprocess_frame, chunks) for text in chunk_texts]
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        processed_texts = []
+        for chunk_texts in pool.map(preprocess_frame, chunks):
+            processed_texts.extend(chunk_texts)
+    return processed_texts
+
+def dataset_hash(dataset_path):
     """
-    # Path to the dataset and model
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    dataset_path = os.path.join(script_dir, 'sample_tickets.csv')
-    model_path = os.path.join(script_dir, 'ticket_classifier.pkl')
+    Hash a dataset file together with the preprocessing version.
+    
+    Args:
+        dataset_path (str): Path to the dataset
+    
+    Returns:
+        str: Hex digest identifying the preprocessed corpus
+    """
+    digest = hashlib.sha256(f"preprocessing-v{PREPROCESSING_VERSION}:".encode('utf-8'))
+    with open(dataset_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_preprocessed_texts(df, dataset_path, parallel=False, workers=None, cache_dir=CACHE_DIR):
+    """
+    Get the preprocessed corpus, from the on-disk cache when possible.
+    
+    Args:
+        df (DataFrame): Tickets loaded from dataset_path
+        dataset_path (str): Path to the dataset, used as the cache key
+        parallel (bool, optional): Preprocess across a process pool
+        workers (int, optional): Number of processes for parallel mode
+        cache_dir (str, optional): Cache directory. None disables caching.
+    
+    Returns:
+        tuple: (processed_texts, cache_hit)
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"preprocessed-{dataset_hash(dataset_path)}.pkl")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                processed_texts = pickle.load(f)
+            if len(processed_texts) == len(df):
+                return processed_texts, True
+            logging.warning(f"Ignoring cached corpus {cache_path} with the wrong number of rows")
+    
+    if parallel:
+        processed_texts = preprocess_parallel(df, workers)
+    else:
+        processed_texts = preprocess_frame(df)
     
+    if cache_path:
+        # Write to a temporary file first so an interrupted run never leaves
+        # a truncated cache behind
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(processed_texts, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    
+    return processed_texts, False
+
+def train_model(dataset_path=DATASET_PATH, model_path=MODEL_PATH, parallel=False, workers=None,
+                cache_dir=CACHE_DIR, max_features=5000, C=1.0, joint=False):
+    """
+    Train the ticket classifier model using the sample dataset.
+    
+    Args:
+        dataset_path (str, optional): CSV with Title, Description and Priority columns
+        model_path (str, optional): Where to save the trained model
+        parallel (bool, optional): Preprocess across a process pool
+        workers (int, optional): Number of processes for parallel mode
+        cache_dir (str, optional): Preprocessed corpus cache directory.
+                                   None disables caching.
+        max_features (int, optional): TF-IDF vocabulary size
+        C (float, optional): Inverse regularization strength
+        joint (bool, optional): Also train on the Team column, so the model
+                                predicts teams as well
+    
+    Returns:
+        TicketClassifier: The trained classifier, or None if the dataset
+                          could not be loaded
+    """
     logging.info(f"Loading dataset from {dataset_path}")
     
     # Load the dataset
+    started = time.perf_counter()
     try:
         df = pd.read_csv(dataset_path)
-        logging.info(f"Loaded {len(df)} tickets from dataset")
+        logging.info(f"Loaded {len(df)} tickets from dataset in {time.perf_counter() - started:.2f}s")
     except Exception as e:
         logging.error(f"Error loading dataset: {e}")
-        return
+        return None
     
     # Preprocess the text
-    logging.info("Preprocessing ticket text...")
-    processed_texts = []
-    for _, row in df.iterrows():
-        combined_text = combine_title_description(row['Title'], row['Description'])
-        processed_texts.append(combined_text)
+    logging.info(f"Preprocessing ticket text{' in parallel' if parallel else ''}...")
+    started = time.perf_counter()
+    processed_texts, cache_hit = load_preprocessed_texts(
+        df, dataset_path, parallel=parallel, workers=workers, cache_dir=cache_dir
+    )
+    logging.info(
+        f"Preprocessing {'loaded from cache' if cache_hit else 'finished'} "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
     
     # Create and train the classifier
-    logging.info("Training the classifier...")
-    classifier = TicketClassifier()
-    classifier.train(processed_texts, df['Priority'].tolist())
+    logging.info(f"Training the {'joint priority and team' if joint else 'priority'} classifier...")
+    started = time.perf_counter()
+    classifier = TicketClassifier(max_features=max_features, C=C)
+    classifier.train(processed_texts, df['Priority'].tolist(), df['Team'].tolist() if joint else None)
+    logging.info(f"Training finished in {time.perf_counter() - started:.2f}s")
     
     # Save the model
     logging.info(f"Saving model to {model_path}")
+    started = time.perf_counter()
     classifier.save_model(model_path)
+    classifier.save_compact(compact_path_for(model_path))
+    logging.info(f"Model saved in {time.perf_counter() - started:.2f}s")
     logging.info("Model training complete")
+    return classifier
+
+def read_chunks(dataset_path, chunk_size, priorities, teams=None):
+    """
+    Read a training CSV in chunks, skipping unusable rows.
+    
+    Args:
+        dataset_path (str): CSV with Title, Description and Priority columns
+        chunk_size (int): Rows per chunk
+        priorities (iterable): Known priority labels
+        teams (iterable, optional): Known team labels. If given, the Team
+                                    column is read too.
+    
+    Yields:
+        DataFrame: Chunk of at most chunk_size rows with a known priority
+                   (and team) and non-empty text
+    """
+    priorities = set(priorities)
+    columns = ['Title', 'Description', 'Priority'] + (['Team'] if teams is not None else [])
+    reader = pd.read_csv(dataset_path, chunksize=chunk_size, usecols=columns)
+    for chunk in reader:
+        usable = chunk.dropna()
+        usable = usable[usable['Priority'].isin(priorities)]
+        if teams is not None:
+            usable = usable[usable['Team'].isin(set(teams))]
+        if len(usable) < len(chunk):
+            logging.warning(f"Skipping {len(chunk) - len(usable)} rows without text or a known label")
+        if len(usable):
+            yield usable
+
+def train_online(dataset_path=DATASET_PATH, model_path=MODEL_PATH, chunk_size=10000, epochs=1,
+                 parallel=False, workers=None, n_features=2 ** 18, alpha=1e-5, joint=False):
+    """
+    Train a hashing-engine classifier by streaming the dataset in chunks.
+    
+    Each chunk is read, preprocessed and passed to partial_fit, then
+    discarded, so memory use depends on chunk_size and not on the size of
+    the dataset. Before training on a chunk, the model predicts it, which
+    gives a running accuracy estimate on data it has not trained on yet.
+    
+    The hashed model has no vocabulary and cannot be exported in the compact
+    format, so any compact model at the output location is removed.
+    
+    Args:
+        dataset_path (str, optional): CSV with Title, Description and Priority columns
+        model_path (str, optional): Where to save the trained model
+        chunk_size (int, optional): Rows read and trained on at a time
+        epochs (int, optional): Passes over the dataset
+        parallel (bool, optional): Preprocess each chunk across a process pool
+        workers (int, optional): Number of processes for parallel mode
+        n_features (int, optional): Size of the hashed feature space
+        alpha (float, optional): Regularization strength
+        joint (bool, optional): Also train on the Team column, so the model
+                                predicts teams as well
+    
+    Returns:
+        TicketClassifier: The trained classifier, or None if the dataset
+                          could not be read
+    """
+    classifier = TicketClassifier(engine='hashing', n_features=n_features, alpha=alpha)
+    pool = ProcessPoolExecutor(max_workers=workers) if parallel else None
+    started = time.perf_counter()
+    
+    try:
+        for epoch in range(1, epochs + 1):
+            rows = scored = correct = 0
+            teams = classifier.team_mapping.values() if joint else None
+            for chunk in read_chunks(dataset_path, chunk_size, classifier.priority_mapping.values(), teams):
+                if pool is not None:
+                    processed_texts = preprocess_parallel(chunk, workers, pool=pool)
+                else:
+                    processed_texts = preprocess_frame(chunk)
+                priorities = chunk['Priority'].tolist()
+                
+                # Score the chunk before learning from it
+                if classifier.version != 'untrained':
+                    predictions = classifier.predict_many(processed_texts)
+                    correct += sum(p == t for p, t in zip(predictions, priorities))
+                    scored += len(priorities)
+                
+                classifier.partial_fit(processed_texts, priorities, chunk['Team'].tolist() if joint else None)
+                rows += len(chunk)
+                logging.info(
+                    f"Epoch {epoch}: trained on {rows} tickets "
+                    f"({rows / (time.perf_counter() - started):.0f} tickets/s)"
+                )
+            
+            if rows == 0:
+                logging.error(f"No usable tickets in {dataset_path}")
+                return None
+            if scored:
+                logging.info(f"Epoch {epoch}: accuracy on chunks before training on them {correct / scored:.3f}")
+    except (OSError, ValueError) as e:
+        logging.error(f"Error reading dataset: {e}")
+        return None
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    logging.info(f"Saving model to {model_path}")
+    classifier.save_model(model_path)
+    shutil.rmtree(compact_path_for(model_path), ignore_errors=True)
+    logging.info(f"Model training complete in {time.perf_counter() - started:.2f}s")
+    return classifier
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the ticket priority classifier.')
+    parser.add_argument('--dataset', default=DATASET_PATH, help='training CSV (default: sample_tickets.csv)')
+    parser.add_argument('--output', default=MODEL_PATH, help='model output path (default: ticket_classifier.pkl)')
+    parser.add_argument('--parallel', action='store_true', help='preprocess across a process pool')
+    parser.add_argument('--workers', type=int, default=None, help='processes for --parallel (default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true', help='do not read or write the preprocessed corpus cache')
+    parser.add_argument('--max-features', type=int, default=5000, help='TF-IDF vocabulary size (default: 5000)')
+    parser.add_argument('--C', type=float, default=1.0, help='inverse regularization strength (default: 1.0)')
+    parser.add_argument('--joint', action='store_true', help='also predict the team, from the Team column')
+    parser.add_argument('--engine', choices=TicketClassifier.ENGINES, default='tfidf',
+                        help='tfidf trains in memory; hashing streams the dataset in chunks (default: tfidf)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='rows per chunk for --engine hashing (default: 10000)')
+    parser.add_argument('--epochs', type=int, default=1, help='passes over the dataset for --engine hashing (default: 1)')
+    parser.add_argument('--n-features', type=int, default=2 ** 18,
+                        help='hashed feature space size for --engine hashing (default: 262144)')
+    parser.add_argument('--alpha', type=float, default=1e-5, help='regularization for --engine hashing (default: 1e-5)')
+    args = parser.parse_args(argv)
+    
+    if args.engine == 'hashing':
+        train_online(
+            dataset_path=args.dataset,
+            model_path=args.output,
+            chunk_size=args.chunk_size,
+            epochs=args.epochs,
+            parallel=args.parallel,
+            workers=args.workers,
+            n_features=args.n_features,
+            alpha=args.alpha,
+            joint=args.joint
+        )
+        return
+    
+    train_model(
+        dataset_path=args.dataset,
+        model_path=args.output,
+        parallel=args.parallel,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else CACHE_DIR,
+        max_features=args.max_features,
+        C=args.C,
+        joint=args.joint
+    )
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    main()
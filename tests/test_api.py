@@ -3,15 +3,32 @@ API tests for the Flask application.
 """
 import sys
 import os
+import io
 import unittest
 import json
+import shutil
 import tempfile
+from unittest import mock
+from datetime import datetime, timedelta
 
 # Add the parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import app as flask_app
+# The app opens its database and similarity index when it is imported, so
+# point both at a temporary directory first; the tests never touch the
+# files under instance/
+TEST_DIR = tempfile.mkdtemp()
+with mock.patch.dict(os.environ, {
+    'DATABASE_URL': 'sqlite:///' + os.path.join(TEST_DIR, 'tickets.db'),
+    'SIMILARITY_INDEX_PATH': os.path.join(TEST_DIR, 'similarity_index.npz')
+}):
+    import app as flask_app
 from model.train_model import train_model
+from model.classifier import TicketClassifier
+from database.models import Ticket, ClassificationJob, PriorityCorrection
+from database.jobs import claim_jobs
+from tools.classify_worker import process_jobs
+from database.similarity import TicketSimilarity
 
 class TestFlaskAPI(unittest.TestCase):
     """Test cases for the Flask API endpoints"""
@@ -22,9 +39,6 @@ class TestFlaskAPI(unittest.TestCase):
         flask_app.app.config['TESTING'] = True
         flask_app.app.config['WTF_CSRF_ENABLED'] = False
         
-        # Create a temporary database
-        self.db_fd, flask_app.app.config['SQLALCHEMY_DATABASE_URI'] = tempfile.mkstemp()
-        
         # Make sure we have a model for testing
         model_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'model', 'ticket_classifier.pkl')
         if not os.path.exists(model_path):
@@ -37,11 +51,6 @@ class TestFlaskAPI(unittest.TestCase):
         with flask_app.app.app_context():
             flask_app.db.create_all()
     
-    def tearDown(self):
-        """Clean up after testing"""
-        os.close(self.db_fd)
-        os.unlink(flask_app.app.config['SQLALCHEMY_DATABASE_URI'])
-    
     def test_index_page(self):
         """Test the index page route"""
         response = self.client.get('/')
@@ -67,6 +76,171 @@ class TestFlaskAPI(unittest.TestCase):
         # Check that our ticket is now visible
         self.assertIn(b'Test Ticket', response.data)
     
+    def test_submit_ticket_async(self):
+        """Test that asynchronous submissions are queued for the workers"""
+        flask_app.app.config['CLASSIFY_ASYNC'] = True
+        try:
+            response = self.client.post('/submit', data={
+                'title': 'Queued Ticket',
+                'description': 'The VPN gateway rejects every connection attempt.'
+            })
+        finally:
+            flask_app.app.config['CLASSIFY_ASYNC'] = False
+        self.assertEqual(response.status_code, 302)
+        
+        with flask_app.app.app_context():
+            ticket = Ticket.query.filter_by(title='Queued Ticket').order_by(Ticket.id.desc()).first()
+            ticket_id = ticket.id
+            self.assertEqual((ticket.status, ticket.priority, ticket.team), ('pending', 'Pending', 'unassigned'))
+        
+        try:
+            data = json.loads(self.client.get(f'/api/tickets/{ticket_id}/status').data)
+            self.assertEqual(data['status'], 'pending')
+            self.assertEqual(data['job']['status'], 'queued')
+            
+            with flask_app.app.app_context():
+                process_jobs(claim_jobs(100), flask_app.model_registry.current)
+            
+            data = json.loads(self.client.get(f'/api/tickets/{ticket_id}/status').data)
+            self.assertEqual(data['status'], 'classified')
+            self.assertEqual(data['job'], {'status': 'done', 'attempts': 1, 'error': None})
+            self.assertIn(data['priority'], ['Critical', 'High', 'Medium', 'Low'])
+            self.assertEqual(data['team'], 'network')
+        finally:
+            with flask_app.app.app_context():
+                ClassificationJob.query.filter_by(ticket_id=ticket_id).delete()
+                flask_app.db.session.commit()
+            self._delete_tickets([ticket_id])
+    
+    def test_submit_ticket_group_commit(self):
+        """Test that group commit mode stores the ticket before redirecting"""
+        flask_app.app.config['GROUP_COMMIT'] = True
+        flask_app.app.config['CLASSIFY_ASYNC'] = True
+        try:
+            response = self.client.post('/submit', data={
+                'title': 'Grouped Ticket',
+                'description': 'The office printer jams on every page.'
+            })
+        finally:
+            flask_app.app.config['GROUP_COMMIT'] = False
+            flask_app.app.config['CLASSIFY_ASYNC'] = False
+        self.assertEqual(response.status_code, 302)
+        
+        with flask_app.app.app_context():
+            ticket = Ticket.query.filter_by(title='Grouped Ticket').order_by(Ticket.id.desc()).first()
+            ticket_id = ticket.id
+            self.assertEqual(ticket.status, 'pending')
+            job = ClassificationJob.query.filter_by(ticket_id=ticket_id).one()
+            self.assertEqual(job.status, 'queued')
+            ClassificationJob.query.filter_by(ticket_id=ticket_id).delete()
+            flask_app.db.session.commit()
+        self._delete_tickets([ticket_id])
+        
+        self.assertIn('ticket_group_commit_size_count', flask_app.metrics_registry.render())
+    
+    def test_submit_ticket_group_commit_timeout(self):
+        """Test that a ticket dropped by a timed-out group commit asks to be submitted again"""
+        config = {'GROUP_COMMIT': True, 'CLASSIFY_ASYNC': True}
+        with mock.patch.dict(flask_app.app.config, config), \
+                mock.patch.object(flask_app.group_commit_writer, 'submit', side_effect=TimeoutError):
+            response = self.client.post('/submit', data={
+                'title': 'Dropped Ticket',
+                'description': 'The office printer jams on every page.'
+            })
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertIn(b'was not stored', response.data)
+    
+    def test_submit_duplicate_ticket(self):
+        """Test that a near-duplicate submission reuses the first ticket's classification"""
+        description = 'Zorbulon badge reader at the east gate rejects every badge since the firmware update.'
+        with mock.patch.dict(flask_app.app.config, {'DUPLICATE_DETECTION': True}):
+            for suffix in ('', '!'):
+                self.client.post('/submit', data={'title': 'Badge reader outage', 'description': description + suffix})
+        
+        with flask_app.app.app_context():
+            first, second = Ticket.query.filter_by(title='Badge reader outage').order_by(Ticket.id).all()[-2:]
+            ticket_ids = [first.id, second.id]
+            self.assertIsNone(first.parent_id)
+            self.assertEqual(second.parent_id, first.id)
+            self.assertEqual((second.priority, second.team), (first.priority, first.team))
+            self.assertEqual(len(second.lsh_buckets), 16)
+        self._delete_tickets(ticket_ids)
+        
+        self.assertIn('ticket_duplicate_lookups_total{result="duplicate"}', flask_app.metrics_registry.render())
+    
+    def test_ticket_status_not_found(self):
+        """Test the status endpoint with an unknown ticket"""
+        response = self.client.get('/api/tickets/999999999/status')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_submit_records_model_version(self):
+        """Test that stored tickets record the model that classified them"""
+        self.client.post('/submit', data={
+            'title': 'Versioned Ticket',
+            'description': 'The database server is not responding to queries.'
+        })
+        
+        with flask_app.app.app_context():
+            ticket = Ticket.query.filter_by(title='Versioned Ticket').order_by(Ticket.id.desc()).first()
+            self.assertEqual(ticket.model_version, flask_app.model_registry.current.version)
+            self._delete_tickets([ticket.id])
+    
+    def test_admin_model_reload(self):
+        """Test the model reload endpoint and its authorization"""
+        flask_app.app.config['ADMIN_TOKEN'] = 'secret-token'
+        try:
+            self.assertEqual(self.client.post('/api/admin/model/reload').status_code, 403)
+            self.assertEqual(self.client.post(
+                '/api/admin/model/reload', headers={'Authorization': 'Bearer wrong'}
+            ).status_code, 403)
+            
+            response = self.client.post(
+                '/api/admin/model/reload', headers={'Authorization': 'Bearer secret-token'}
+            )
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            self.assertFalse(data['reloaded'])
+            self.assertEqual(data['version'], flask_app.model_registry.current.version)
+            
+            response = self.client.get('/api/admin/model', headers={'Authorization': 'Bearer secret-token'})
+            self.assertEqual(json.loads(response.data)['version'], data['version'])
+        finally:
+            flask_app.app.config['ADMIN_TOKEN'] = None
+        
+        # Disabled without a configured token
+        self.assertEqual(self.client.get('/api/admin/model').status_code, 403)
+    
+    def test_correct_ticket_priority(self):
+        """Test that correcting a priority records a correction"""
+        ticket_id = self._add_tickets(1)[0]
+        headers = {'Authorization': 'Bearer secret-token'}
+        flask_app.app.config['ADMIN_TOKEN'] = 'secret-token'
+        try:
+            url = f'/api/tickets/{ticket_id}'
+            self.assertEqual(self.client.patch(url, json={'priority': 'High'}).status_code, 403)
+            self.assertEqual(self.client.patch(url, json={'priority': 'Urgent'}, headers=headers).status_code, 400)
+            self.assertEqual(self.client.patch('/api/tickets/999999', json={'priority': 'High'},
+                                               headers=headers).status_code, 404)
+            
+            response = self.client.patch(url, json={'priority': 'High', 'corrected_by': 'agent7'}, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.data)['priority'], 'High')
+            
+            # Setting the same priority again is not a correction
+            self.client.patch(url, json={'priority': 'High'}, headers=headers)
+            
+            with flask_app.app.app_context():
+                corrections = PriorityCorrection.query.filter_by(ticket_id=ticket_id).all()
+                self.assertEqual(len(corrections), 1)
+                self.assertEqual((corrections[0].old_priority, corrections[0].new_priority), ('Low', 'High'))
+                self.assertEqual(corrections[0].corrected_by, 'agent7')
+                flask_app.db.session.delete(corrections[0])
+                flask_app.db.session.commit()
+        finally:
+            flask_app.app.config['ADMIN_TOKEN'] = None
+            self._delete_tickets([ticket_id])
+    
     def test_missing_fields_submit(self):
         """Test submitting a ticket with missing fields"""
         response = self.client.post('/submit', data={
@@ -107,6 +281,53 @@ class TestFlaskAPI(unittest.TestCase):
         # Check that team is one of the valid options
         self.assertIn(data['team'], ['network', 'hardware', 'software', 'security'])
     
+    def test_api_classify_uses_cache(self):
+        """Test that repeated classification requests are served from the cache"""
+        test_data = {
+            'title': 'VPN keeps disconnecting',
+            'description': 'The VPN connection drops every few minutes when working from home.'
+        }
+        
+        hits_before = flask_app.result_cache.hits
+        responses = [
+            self.client.post('/api/classify', data=json.dumps(test_data), content_type='application/json')
+            for _ in range(2)
+        ]
+        
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(json.loads(responses[0].data), json.loads(responses[1].data))
+        self.assertEqual(flask_app.result_cache.hits, hits_before + 1)
+    
+    def test_api_classify_joint_model(self):
+        """Test that a joint model's confident team is used instead of the keyword matcher"""
+        texts = ["router switch port down", "printer paper jam tray"]
+        joint = TicketClassifier().train(texts * 5, ['High', 'Low'] * 5, ['security', 'hardware'] * 5)
+        self.assertTrue(joint.joint)
+        
+        payload = {'title': 'Router down', 'description': 'Router switch port down on the second floor'}
+        with mock.patch.object(flask_app.model_registry, 'current', joint):
+            response = self.client.post('/api/classify', data=json.dumps(payload), content_type='application/json')
+            self.assertEqual(json.loads(response.data)['team'], 'security')
+            
+            # Below the threshold the keyword matcher decides (new text, so nothing is cached)
+            with mock.patch.dict(flask_app.app.config, {'TEAM_MIN_CONFIDENCE': 1.01}):
+                payload['description'] += ' since monday'
+                response = self.client.post('/api/classify', data=json.dumps(payload), content_type='application/json')
+                self.assertEqual(json.loads(response.data)['team'], 'network')
+        
+        metrics = flask_app.metrics_registry.render()
+        self.assertIn('ticket_team_assignments_total{source="model"}', metrics)
+        self.assertIn('ticket_team_assignments_total{source="keywords"}', metrics)
+    
+    def test_warmup(self):
+        """Test that warming up does not touch the result cache"""
+        size_before = len(flask_app.result_cache)
+        hits_before = flask_app.result_cache.hits
+        
+        self.assertGreaterEqual(flask_app.warmup(), 0)
+        self.assertEqual(len(flask_app.result_cache), size_before)
+        self.assertEqual(flask_app.result_cache.hits, hits_before)
+    
     def test_api_missing_fields(self):
         """Test the API with missing fields"""
         # Missing description
@@ -124,6 +345,323 @@ class TestFlaskAPI(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn('error', data)
     
+    def test_api_classify_batch(self):
+        """Test the batch classify endpoint"""
+        test_data = {
+            'tickets': [
+                {
+                    'title': 'Server Down',
+                    'description': 'Our main database server is not responding. Users cannot access any applications.'
+                },
+                {
+                    'title': 'Cannot connect to WiFi',
+                    'description': 'My laptop cannot connect to the company WiFi network.'
+                }
+            ]
+        }
+        
+        response = self.client.post(
+            '/api/classify/batch',
+            data=json.dumps(test_data),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        
+        # Results come back in input order
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([r['title'] for r in data['results']], ['Server Down', 'Cannot connect to WiFi'])
+        
+        for result in data['results']:
+            self.assertIn(result['priority'], ['Critical', 'High', 'Medium', 'Low'])
+            self.assertIn(result['team'], ['network', 'hardware', 'software', 'security'])
+    
+    def test_api_classify_batch_item_errors(self):
+        """Test that invalid batch items get per-item errors"""
+        test_data = [
+            {'title': 'Server Down'},
+            {'title': 'Printer jammed', 'description': 'The office printer keeps jamming.'},
+            'not a ticket'
+        ]
+        
+        response = self.client.post(
+            '/api/classify/batch',
+            data=json.dumps(test_data),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data)['results']
+        
+        self.assertIn('error', results[0])
+        self.assertIn('priority', results[1])
+        self.assertIn('error', results[2])
+        self.assertEqual([r['index'] for r in results], [0, 1, 2])
+    
+    def test_api_classify_batch_invalid_payload(self):
+        """Test the batch endpoint with a non-list payload"""
+        response = self.client.post(
+            '/api/classify/batch',
+            data=json.dumps({'title': 'Server Down'}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', json.loads(response.data))
+    
+    def test_api_classify_stream(self):
+        """Test the streaming endpoint with valid and invalid lines"""
+        lines = [
+            json.dumps({'title': 'Server Down', 'description': 'The main database server is not responding.'}),
+            '',
+            '{not json',
+            json.dumps({'title': 'Printer jammed'}),
+            json.dumps('not a ticket'),
+            json.dumps({'title': 'WiFi down', 'description': 'Nobody on the third floor can connect to WiFi.'}),
+            'x' * 200
+        ]
+        
+        batch_size = flask_app.app.config['CLASSIFY_STREAM_BATCH']
+        max_line = flask_app.app.config['CLASSIFY_STREAM_MAX_LINE']
+        flask_app.app.config.update(CLASSIFY_STREAM_BATCH=2, CLASSIFY_STREAM_MAX_LINE=100)
+        try:
+            response = self.client.post('/api/classify/stream', data='\n'.join(lines) + '\n',
+                                        content_type='application/x-ndjson')
+        finally:
+            flask_app.app.config.update(CLASSIFY_STREAM_BATCH=batch_size, CLASSIFY_STREAM_MAX_LINE=max_line)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        # Blank lines are skipped; every other line gets a result, in order
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3, 4, 5])
+        self.assertEqual(results[0]['title'], 'Server Down')
+        self.assertIn(results[0]['priority'], ['Critical', 'High', 'Medium', 'Low'])
+        self.assertEqual(results[1]['error'], 'Invalid JSON')
+        self.assertIn('error', results[2])
+        self.assertIn('error', results[3])
+        self.assertIn(results[4]['team'], ['network', 'hardware', 'software', 'security'])
+        self.assertIn('exceeds', results[5]['error'])
+    
+    def test_api_classify_stream_is_incremental(self):
+        """Test that results are streamed before the whole body has been read"""
+        ticket = json.dumps({'title': 'Printer jammed', 'description': 'The office printer keeps jamming.'})
+        body = io.BytesIO(('\n'.join([ticket] * 50) + '\n').encode())
+        
+        batch_size = flask_app.app.config['CLASSIFY_STREAM_BATCH']
+        flask_app.app.config['CLASSIFY_STREAM_BATCH'] = 10
+        try:
+            response = self.client.post('/api/classify/stream', input_stream=body,
+                                        content_length=len(body.getvalue()),
+                                        content_type='application/x-ndjson', buffered=False)
+            chunks = response.response
+            first = next(iter(chunks))
+            read_after_first = body.tell()
+            rest = b''.join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in chunks)
+            response.close()
+        finally:
+            flask_app.app.config['CLASSIFY_STREAM_BATCH'] = batch_size
+        
+        first = first if isinstance(first, bytes) else first.encode()
+        self.assertEqual(len(first.splitlines()), 10)
+        self.assertLess(read_after_first, len(body.getvalue()) // 2)
+        self.assertEqual(len((first + rest).splitlines()), 50)
+    
+    def _add_tickets(self, count):
+        """Insert tickets newer than any existing ticket and return their IDs, newest first"""
+        base_time = datetime(2099, 1, 1)
+        with flask_app.app.app_context():
+            tickets = []
+            for i in range(count):
+                ticket = Ticket(
+                    title=f'Paged Ticket {i}',
+                    description=f'Description for paged ticket {i}',
+                    priority='Low',
+                    team='software'
+                )
+                ticket.created_at = base_time + timedelta(minutes=i)
+                tickets.append(ticket)
+            flask_app.db.session.add_all(tickets)
+            flask_app.db.session.commit()
+            return [ticket.id for ticket in reversed(tickets)]
+    
+    def _delete_tickets(self, ticket_ids):
+        """Remove tickets created by a test"""
+        with flask_app.app.app_context():
+            Ticket.query.filter(Ticket.id.in_(ticket_ids)).delete(synchronize_session=False)
+            flask_app.db.session.commit()
+    
+    def test_api_similar_tickets(self):
+        """Test finding the tickets most similar to a ticket"""
+        texts = ['vpn connection drop laptop', 'vpn connection drop', 'printer jam paper']
+        with flask_app.app.app_context():
+            tickets = [Ticket(title='Similar Ticket', description=text, priority='Low', team='network',
+                              processed_text=text) for text in texts]
+            flask_app.db.session.add_all(tickets)
+            flask_app.db.session.commit()
+            ticket_ids = [ticket.id for ticket in tickets]
+        
+        temp_dir = tempfile.mkdtemp()
+        similarity = TicketSimilarity(os.path.join(temp_dir, 'similarity_index.npz'), refresh_interval=0)
+        try:
+            with mock.patch.object(flask_app, 'ticket_similarity', similarity):
+                response = self.client.get(f'/api/tickets/{ticket_ids[0]}/similar?k=50')
+                self.assertEqual(response.status_code, 200)
+                data = json.loads(response.data)
+                self.assertEqual(data['id'], ticket_ids[0])
+                
+                scores = {ticket['id']: ticket['score'] for ticket in data['results']}
+                self.assertNotIn(ticket_ids[0], scores)
+                self.assertGreater(scores[ticket_ids[1]], scores.get(ticket_ids[2], 0))
+                self.assertEqual(list(scores.values()), sorted(scores.values(), reverse=True))
+                self.assertTrue(os.path.exists(similarity.path))
+                
+                self.assertEqual(self.client.get('/api/tickets/999999999/similar').status_code, 404)
+                for k in ('0', '51'):
+                    response = self.client.get(f'/api/tickets/{ticket_ids[0]}/similar?k={k}')
+                    self.assertEqual(response.status_code, 400)
+        finally:
+            self._delete_tickets(ticket_ids)
+            shutil.rmtree(temp_dir)
+    
+    def test_api_tickets_pagination(self):
+        """Test walking the ticket listing with cursors"""
+        ticket_ids = self._add_tickets(5)
+        try:
+            seen = []
+            cursor = None
+            for _ in range(3):
+                url = '/api/tickets?limit=2' + (f'&cursor={cursor}' if cursor else '')
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                data = json.loads(response.data)
+                seen.extend(ticket['id'] for ticket in data['tickets'])
+                cursor = data['next_cursor']
+            
+            # Newest first, no gaps or repeats across pages
+            self.assertEqual(seen[:5], ticket_ids)
+            self.assertEqual(len(seen), len(set(seen)))
+        finally:
+            self._delete_tickets(ticket_ids)
+    
+    def test_api_tickets_field_projection(self):
+        """Test that only the requested fields are returned"""
+        ticket_ids = self._add_tickets(1)
+        try:
+            response = self.client.get('/api/tickets?limit=1&fields=id,priority')
+            self.assertEqual(response.status_code, 200)
+            ticket = json.loads(response.data)['tickets'][0]
+            self.assertEqual(ticket, {'id': ticket_ids[0], 'priority': 'Low'})
+        finally:
+            self._delete_tickets(ticket_ids)
+    
+    def test_api_tickets_invalid_parameters(self):
+        """Test the listing API with bad parameters"""
+        for url in ['/api/tickets?cursor=not-a-cursor',
+                    '/api/tickets?fields=id,secret',
+                    '/api/tickets?limit=0']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', json.loads(response.data))
+    
+    def test_api_search_tickets(self):
+        """Test full-text search with ranking and filters"""
+        with flask_app.app.app_context():
+            tickets = [
+                Ticket(title='Zorblax gateway outage', description='The zorblax gateway is down for everyone',
+                       priority='Critical', team='network'),
+                Ticket(title='Printer queue stuck', description='Jobs sent via the zorblax print server never finish',
+                       priority='Low', team='hardware'),
+                Ticket(title='Unrelated request', description='Please order a new chair',
+                       priority='Low', team='hardware')
+            ]
+            flask_app.db.session.add_all(tickets)
+            flask_app.db.session.commit()
+            ticket_ids = [ticket.id for ticket in tickets]
+        
+        try:
+            response = self.client.get('/api/tickets/search?q=zorblax')
+            self.assertEqual(response.status_code, 200)
+            results = json.loads(response.data)['results']
+            
+            # Both matches are found, with the title match ranked first
+            self.assertEqual([r['id'] for r in results], ticket_ids[:2])
+            self.assertGreater(results[0]['score'], results[1]['score'])
+            
+            response = self.client.get('/api/tickets/search?q=zorblax&team=hardware')
+            results = json.loads(response.data)['results']
+            self.assertEqual([r['id'] for r in results], [ticket_ids[1]])
+            
+            # Partially typed last word matches as a prefix
+            response = self.client.get('/api/tickets/search?q=zorbl')
+            self.assertEqual(len(json.loads(response.data)['results']), 2)
+            
+            response = self.client.get('/api/tickets/search?q=zorblax&limit=1')
+            data = json.loads(response.data)
+            self.assertEqual(len(data['results']), 1)
+            self.assertTrue(data['has_more'])
+        finally:
+            self._delete_tickets(ticket_ids)
+        
+        # Deleted tickets leave the index
+        response = self.client.get('/api/tickets/search?q=zorblax')
+        self.assertEqual(json.loads(response.data)['results'], [])
+    
+    def test_api_stats(self):
+        """Test that the stats endpoint counts tickets by priority and team"""
+        before = json.loads(self.client.get('/api/stats?hours=2').data)
+        
+        with flask_app.app.app_context():
+            tickets = [Ticket(title='Stats', description='Stats ticket', priority='Critical', team='security')
+                       for _ in range(3)]
+            flask_app.db.session.add_all(tickets)
+            flask_app.db.session.commit()
+            ticket_ids = [ticket.id for ticket in tickets]
+        
+        try:
+            response = self.client.get('/api/stats?hours=2')
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            
+            def critical_security(counts):
+                return counts.get('Critical', {}).get('security', 0)
+            
+            self.assertEqual(data['total'], before['total'] + 3)
+            self.assertEqual(critical_security(data['counts']), critical_security(before['counts']) + 3)
+            self.assertEqual(sum(critical_security(bucket['counts']) for bucket in data['hourly']),
+                             sum(critical_security(bucket['counts']) for bucket in before['hourly']) + 3)
+            
+            self.assertIn(b'Tickets by Priority and Team', self.client.get('/').data)
+        finally:
+            self._delete_tickets(ticket_ids)
+        
+        self.assertEqual(json.loads(self.client.get('/api/stats').data)['total'], before['total'])
+        self.assertEqual(self.client.get('/api/stats?hours=0').status_code, 400)
+    
+    def test_api_search_requires_query(self):
+        """Test the search API without a query"""
+        response = self.client.get('/api/tickets/search?q=')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', json.loads(response.data))
+    
+    def test_view_tickets_pages(self):
+        """Test that the tickets page links to the next page"""
+        ticket_ids = self._add_tickets(3)
+        page_size = flask_app.app.config['TICKETS_PAGE_SIZE']
+        flask_app.app.config['TICKETS_PAGE_SIZE'] = 2
+        try:
+            response = self.client.get('/tickets')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'Paged Ticket 2', response.data)
+            self.assertNotIn(b'Paged Ticket 0', response.data)
+            self.assertIn(b'Older Tickets', response.data)
+        finally:
+            flask_app.app.config['TICKETS_PAGE_SIZE'] = page_size
+            self._delete_tickets(ticket_ids)
+    
     def test_view_tickets_page(self):
         """Test the view tickets page route"""
         # First add a ticket
@@ -137,6 +675,68 @@ class TestFlaskAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'All Support Tickets', response.data)
         self.assertIn(b'Test Ticket for View', response.data)
+    
+    def test_metrics_endpoint(self):
+        """Test that requests and processing stages show up in the metrics"""
+        self.client.post('/api/classify', json={
+            'title': 'Metrics test ticket',
+            'description': 'The VPN disconnects every few minutes for the whole team'
+        })
+        self.client.get('/tickets')
+        
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        
+        text = response.get_data(as_text=True)
+        self.assertIn('ticket_http_requests_total{route="/api/classify",method="POST",status="200"}', text)
+        self.assertIn('ticket_http_request_duration_seconds_bucket{route="/tickets",le="+Inf"}', text)
+        for stage in ('preprocess', 'vectorize', 'predict', 'team_assignment', 'db_query', 'render'):
+            self.assertIn(f'ticket_stage_duration_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn('ticket_classify_cache_requests_total{result="miss"}', text)
+        version = flask_app.model_registry.current.version
+        self.assertIn(f'ticket_model_info{{version="{version}",', text)
+    
+    def test_server_timing_and_profiling(self):
+        """Test the Server-Timing header and sampled request profiles"""
+        profile_dir = tempfile.mkdtemp()
+        profiler = flask_app.request_profiler
+        saved = (profiler.directory, profiler.sample_rate)
+        profiler.directory, profiler.sample_rate = profile_dir, 1.0
+        flask_app.app.config['SERVER_TIMING'] = True
+        try:
+            response = self.client.post('/api/classify', json={
+                'title': 'Profiled ticket',
+                'description': 'Outlook crashes whenever I open a shared calendar'
+            })
+            self.assertEqual(response.status_code, 200)
+            
+            header = response.headers['Server-Timing']
+            for stage in ('preprocess', 'vectorize', 'predict', 'team_assignment', 'total'):
+                self.assertIn(f'{stage};dur=', header)
+            
+            profiles = os.listdir(profile_dir)
+            self.assertEqual(len(profiles), 1)
+            self.assertIn(f'profile;desc="{profiles[0]}"', header)
+            self.assertIn('classify_ticket_api', profiles[0])
+            
+            # Only the classification endpoints are profiled
+            self.client.get('/api/tickets')
+            self.assertEqual(len(os.listdir(profile_dir)), 1)
+        finally:
+            profiler.directory, profiler.sample_rate = saved
+            flask_app.app.config['SERVER_TIMING'] = False
+            shutil.rmtree(profile_dir)
+        
+        response = self.client.get('/api/tickets')
+        self.assertNotIn('Server-Timing', response.headers)
+
+
+def tearDownModule():
+    """Close the temporary database and remove it"""
+    with flask_app.app.app_context():
+        flask_app.db.engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
 
 
 if __name__ == '__main__':
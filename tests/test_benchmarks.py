@@ -0,0 +1,79 @@
+"""
+Unit tests for the benchmark corpus and result comparison.
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_tickets, parse_scale
+from benchmarks.suite import StageTimer, compare_results
+
+class TestCorpus(unittest.TestCase):
+    """Test cases for the synthetic ticket corpus"""
+    
+    def test_parse_scale(self):
+        """Test corpus size suffixes"""
+        self.assertEqual(parse_scale('1000'), 1000)
+        self.assertEqual(parse_scale('100k'), 100000)
+        self.assertEqual(parse_scale('1M'), 1000000)
+        with self.assertRaises(ValueError):
+            parse_scale('lots')
+    
+    def test_generate_is_deterministic(self):
+        """Test that a seed always produces the same corpus"""
+        first = list(generate_tickets(50, seed=3))
+        
+        self.assertEqual(len(first), 50)
+        self.assertEqual(first, list(generate_tickets(50, seed=3)))
+        self.assertNotEqual(first, list(generate_tickets(50, seed=4)))
+    
+    def test_generated_tickets_are_labelled(self):
+        """Test that tickets keep the labels of their templates"""
+        for ticket in generate_tickets(100):
+            self.assertTrue(ticket['Title'])
+            self.assertTrue(ticket['Description'])
+            self.assertIn(ticket['Priority'], ['Critical', 'High', 'Medium', 'Low'])
+            self.assertTrue(ticket['Team'])
+
+class TestSuiteResults(unittest.TestCase):
+    """Test cases for benchmark summaries and comparison"""
+    
+    def test_stage_timer_summary(self):
+        """Test throughput and percentiles of recorded calls"""
+        timer = StageTimer()
+        for _ in range(99):
+            timer.add(1000000)
+        timer.add(100000000, items=10)
+        
+        summary = timer.summary()
+        self.assertEqual(summary['calls'], 100)
+        self.assertEqual(summary['items'], 109)
+        self.assertAlmostEqual(summary['total_s'], 0.199)
+        self.assertEqual(summary['p50_us'], 1000.0)
+        self.assertEqual(summary['max_us'], 100000.0)
+        self.assertEqual(StageTimer().summary(), {'calls': 0, 'items': 0})
+    
+    def test_compare_flags_regressions(self):
+        """Test that only drops beyond the threshold are regressions"""
+        def results(predict, preprocess):
+            return {'runs': [{'scale': 1000, 'stages': {
+                'predict': {'throughput_per_s': predict},
+                'preprocess': {'throughput_per_s': preprocess}
+            }}]}
+        
+        rows, regressions = compare_results(results(1000, 5000), results(950, 4000), threshold=0.1)
+        
+        self.assertEqual(len(rows), 2)
+        self.assertEqual([(row[0], row[1]) for row in regressions], [(1000, 'preprocess')])
+        self.assertAlmostEqual(regressions[0][4], -0.2)
+        
+        # Scales missing from the baseline are skipped
+        rows, regressions = compare_results({'runs': []}, results(1, 1))
+        self.assertEqual((rows, regressions), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -119,6 +119,28 @@ class TestTicketClassifier(unittest.TestCase):
                 prediction = self.classifier.predict(processed_text)
                 self.assertEqual(prediction, "Low")
     
+    def test_version_changes_on_train(self):
+        """Test that retraining produces a new model version"""
+        self.assertNotEqual(TicketClassifier().version, self.classifier.version)
+        
+        previous_version = self.classifier.version
+        self.classifier.train(self.train_texts, self.train_priorities)
+        self.assertNotEqual(self.classifier.version, previous_version)
+    
+    def test_predict_many(self):
+        """Test that batch prediction matches single predictions in order"""
+        test_texts = [
+            "main database server crashed all systems down",
+            "need help changing email signature",
+            "printer not working in marketing department"
+        ]
+        processed_texts = [preprocess_text(text) for text in test_texts]
+        
+        predictions = self.classifier.predict_many(processed_texts)
+        
+        self.assertEqual(predictions, [self.classifier.predict(text) for text in processed_texts])
+        self.assertEqual(self.classifier.predict_many([]), [])
+    
     def test_save_load_model(self):
         """Test saving and loading the model"""
         # Create a temporary file
@@ -140,10 +162,75 @@ class TestTicketClassifier(unittest.TestCase):
             loaded_prediction = new_classifier.predict(processed_text)
             
             self.assertEqual(original_prediction, loaded_prediction)
+            
+            # The saved and loaded models share a content-based version
+            self.assertEqual(self.classifier.version, new_classifier.version)
+            self.assertEqual(new_classifier.version, TicketClassifier.file_version(temp_path))
         finally:
             # Clean up the temporary file
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
+    
+    def test_hashing_engine_partial_fit(self):
+        """Test incremental training with the hashing engine"""
+        classifier = TicketClassifier(engine='hashing', n_features=2 ** 12)
+        
+        classifier.partial_fit(["server down urgent", "password reset"], ["Critical", "Low"])
+        version = classifier.version
+        classifier.partial_fit(["website slow", "printer jam"], ["High", "Medium"])
+        
+        self.assertNotEqual(classifier.version, version)
+        self.assertEqual(len(classifier.predict_many(["server down", "printer jam"])), 2)
+        
+        # Hashed models have no vocabulary to export
+        with self.assertRaises(ValueError):
+            classifier.save_compact(os.path.join(tempfile.gettempdir(), 'unused.compact'))
+    
+    def test_partial_fit_needs_hashing_engine(self):
+        """Test that the default engine rejects incremental training"""
+        with self.assertRaises(ValueError):
+            TicketClassifier().partial_fit(["server down"], ["Critical"])
+        with self.assertRaises(ValueError):
+            TicketClassifier(engine='word2vec')
+    
+    
+    def test_joint_model(self):
+        """Test that a model trained with teams predicts both from one call"""
+        teams = ['network', 'network', 'security', 'hardware', 'network',
+                 'security', 'software', 'hardware', 'software']
+        self.assertFalse(self.classifier.joint)
+        self.assertEqual(self.classifier.classify_many(["printer jam"]), [(self.classifier.predict("printer jam"), None, None)])
+        
+        joint = TicketClassifier().train(self.train_texts, self.train_priorities, teams)
+        self.assertTrue(joint.joint)
+        results = joint.classify_many(self.train_texts)
+        self.assertEqual([priority for priority, _, _ in results], joint.predict_many(self.train_texts))
+        self.assertEqual(results[7][1], 'hardware')
+        for _, team, confidence in results:
+            self.assertIn(team, joint.reverse_team_mapping)
+            self.assertTrue(0.25 <= confidence <= 1)
+        self.assertEqual(joint.classify_many([]), [])
+        
+        # Corrections change the priority output only
+        joint.update(self.train_texts[:3], ['Low'] * 3)
+        self.assertEqual([team for _, team, _ in joint.classify_many(self.train_texts)],
+                         [team for _, team, _ in results])
+        
+        with self.assertRaises(ValueError):
+            TicketClassifier().train(self.train_texts, self.train_priorities, teams[:2])
+    
+    def test_hashing_engine_joint_model(self):
+        """Test incremental training of a joint hashing model"""
+        classifier = TicketClassifier(engine='hashing', n_features=2 ** 12)
+        classifier.partial_fit(["server down urgent", "password reset"], ["Critical", "Low"], ["network", "security"])
+        self.assertTrue(classifier.joint)
+        
+        priority, team, confidence = classifier.classify_many(["password reset"])[0]
+        self.assertIn(team, classifier.reverse_team_mapping)
+        self.assertTrue(0 < confidence <= 1)
+        
+        classifier.update(["password reset"], ["High"])
+        self.assertEqual(len(classifier.pipeline.named_steps['classifier'].estimators_), 2)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,237 @@
+"""
+Tests for the background classification queue and workers.
+"""
+import sys
+import os
+import shutil
+import sqlite3
+import unittest
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.import_tickets import create_app
+from tools.classify_worker import process_jobs, run_worker
+from model.classifier import TicketClassifier
+from database.models import db, Ticket, ClassificationJob, PENDING_PRIORITY, UNASSIGNED_TEAM
+from database.jobs import (
+    enqueue_ticket,
+    claim_jobs,
+    fail_job,
+    release_expired_jobs,
+    retry_failed_jobs,
+    queue_counts
+)
+
+class TestClassifyWorker(unittest.TestCase):
+    """Test cases for the job queue and worker"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a small classifier shared by all tests"""
+        cls.classifier = TicketClassifier()
+        cls.classifier.train(
+            ["server down critical", "printer broken", "password reset request", "network slow"],
+            ["Critical", "Medium", "Low", "High"]
+        )
+    
+    def setUp(self):
+        """Create a temporary database"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.database_url = 'sqlite:///' + os.path.join(self.temp_dir, 'jobs.db')
+        self.app = create_app(self.database_url)
+        self.context = self.app.app_context()
+        self.context.push()
+    
+    def tearDown(self):
+        """Remove the temporary database"""
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _submit(self, count):
+        """Store pending tickets with queued jobs, as the web app does"""
+        tickets = []
+        for i in range(count):
+            ticket = Ticket(
+                title=f'Printer {i} broken',
+                description='The office printer is jammed and will not print',
+                priority=PENDING_PRIORITY,
+                team=UNASSIGNED_TEAM
+            )
+            db.session.add(ticket)
+            db.session.flush()
+            enqueue_ticket(ticket)
+            tickets.append(ticket)
+        db.session.commit()
+        return [ticket.id for ticket in tickets]
+    
+    def test_claims_are_exclusive(self):
+        """Test that a job is handed to one claim only"""
+        self._submit(5)
+        
+        first = claim_jobs(3)
+        second = claim_jobs(3)
+        third = claim_jobs(3)
+        
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertEqual(third, [])
+        self.assertFalse({job.id for job in first} & {job.id for job in second})
+        self.assertTrue(all(job.attempts == 1 for job in first + second))
+    
+    def test_process_jobs_classifies_tickets(self):
+        """Test that processing a batch fills in priority and team"""
+        ticket_ids = self._submit(3)
+        
+        completed, failed = process_jobs(claim_jobs(10), self.classifier)
+        
+        self.assertEqual((completed, failed), (3, 0))
+        for ticket in Ticket.query.filter(Ticket.id.in_(ticket_ids)):
+            self.assertEqual(ticket.status, 'classified')
+            self.assertIn(ticket.priority, ['Critical', 'High', 'Medium', 'Low'])
+            self.assertEqual(ticket.team, 'hardware')
+            self.assertTrue(ticket.processed_text)
+        self.assertEqual(queue_counts()['done'], 3)
+    
+    def test_duplicates_reuse_parent_classification(self):
+        """Test that a near-duplicate of a classified ticket is not classified again"""
+        first_id, = self._submit(1)
+        process_jobs(claim_jobs(10), self.classifier, duplicate_threshold=0.8)
+        parent = db.session.get(Ticket, first_id)
+        parent.priority = 'Critical'
+        db.session.commit()
+        
+        ticket_ids = self._submit(2)
+        broken = mock.Mock(classify_many=mock.Mock(side_effect=RuntimeError('model missing')))
+        completed, failed = process_jobs(claim_jobs(10), broken, duplicate_threshold=0.8)
+        
+        self.assertEqual((completed, failed), (2, 0))
+        for ticket in Ticket.query.filter(Ticket.id.in_(ticket_ids)):
+            self.assertEqual((ticket.parent_id, ticket.priority, ticket.team), (first_id, 'Critical', 'hardware'))
+            self.assertEqual(ticket.status, 'classified')
+            self.assertEqual(len(ticket.lsh_buckets), 16)
+    
+    def test_no_write_lock_during_model_call(self):
+        """Test that a batch takes the write lock only after the model call"""
+        first_id, = self._submit(1)
+        process_jobs(claim_jobs(10), self.classifier, duplicate_threshold=0.8)
+        parent = db.session.get(Ticket, first_id)
+        parent.priority = 'Critical'
+        db.session.commit()
+        
+        # Duplicates of the first ticket (or, without NLTK data, tickets
+        # that fail preprocessing) were stored before the model call
+        self._submit(2)
+        ticket = Ticket(title='VPN drops', description='The VPN disconnects every hour',
+                        priority=PENDING_PRIORITY, team=UNASSIGNED_TEAM)
+        db.session.add(ticket)
+        db.session.flush()
+        enqueue_ticket(ticket)
+        db.session.commit()
+        
+        locked = []
+        def classify_many(texts):
+            # A web request storing a ticket would wait here if the worker held the lock
+            conn = sqlite3.connect(self.database_url[len('sqlite:///'):], timeout=0.1)
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.rollback()
+            except sqlite3.OperationalError as e:
+                locked.append(str(e))
+            finally:
+                conn.close()
+            return [('Low', None, None)] * len(texts)
+        
+        completed, failed = process_jobs(claim_jobs(10), mock.Mock(classify_many=classify_many, version='stub'),
+                                         duplicate_threshold=0.8)
+        
+        self.assertEqual(locked, [])
+        self.assertEqual(completed + failed, 3)
+    
+    def test_failed_jobs_are_retried_with_backoff(self):
+        """Test retry scheduling and giving up after the last attempt"""
+        self._submit(1)
+        now = datetime.utcnow()
+        broken = mock.Mock(classify_many=mock.Mock(side_effect=RuntimeError('model missing')))
+        
+        # First two attempts are retried after 10s, then 20s
+        for delay in (10, 20):
+            failed_at = datetime.utcnow()
+            jobs = claim_jobs(1, now=now)
+            self.assertEqual(process_jobs(jobs, broken, max_attempts=3, retry_delay=10), (0, 1))
+            
+            job = db.session.get(ClassificationJob, jobs[0].id)
+            self.assertEqual(job.status, 'queued')
+            self.assertIn('model missing', job.last_error)
+            self.assertGreaterEqual(job.available_at, failed_at + timedelta(seconds=delay))
+            self.assertEqual(claim_jobs(1, now=job.available_at - timedelta(seconds=1)), [])
+            now = job.available_at
+        
+        jobs = claim_jobs(1, now=now)
+        process_jobs(jobs, broken, max_attempts=3, retry_delay=10)
+        self.assertEqual(jobs[0].status, 'failed')
+        self.assertEqual(jobs[0].ticket.status, 'failed')
+        
+        # Failed jobs can be queued again by hand
+        self.assertEqual(retry_failed_jobs(), 1)
+        self.assertEqual(jobs[0].ticket.status, 'pending')
+        self.assertEqual(len(claim_jobs(1)), 1)
+    
+    def test_expired_jobs_are_released(self):
+        """Test that jobs of a worker that stopped are retried"""
+        self._submit(1)
+        now = datetime.utcnow()
+        job = claim_jobs(1, now=now)[0]
+        
+        self.assertEqual(release_expired_jobs(60, now=now + timedelta(seconds=30)), 0)
+        self.assertEqual(release_expired_jobs(60, retry_delay=0, now=now + timedelta(seconds=90)), 1)
+        
+        job = db.session.get(ClassificationJob, job.id)
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(len(claim_jobs(1, now=now + timedelta(seconds=90))), 1)
+    
+    def test_late_worker_does_not_overwrite_next_claim(self):
+        """Test that a worker finishing after its lease expired drops its result"""
+        ticket_id = self._submit(1)[0]
+        now = datetime.utcnow()
+        late = claim_jobs(1, now=now)
+        
+        # Another worker, with its own session, releases the job and claims it again
+        with self.app.app_context():
+            release_expired_jobs(60, retry_delay=0, now=now + timedelta(seconds=90))
+            token = claim_jobs(1, now=now + timedelta(seconds=90))[0].claim_token
+        
+        self.assertFalse(fail_job(late[0], 'boom'))
+        completed, _ = process_jobs(late, self.classifier)
+        self.assertEqual(completed, 0)
+        
+        job = db.session.get(ClassificationJob, late[0].id)
+        self.assertEqual((job.status, job.claim_token, job.attempts), ('running', token, 2))
+        self.assertEqual(db.session.get(Ticket, ticket_id).status, 'pending')
+    
+    def test_fail_job_without_attempts_left(self):
+        """Test that a job on its last attempt fails its ticket"""
+        self._submit(1)
+        job = claim_jobs(1)[0]
+        
+        self.assertFalse(fail_job(job, 'boom', max_attempts=1))
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.ticket.status, 'failed')
+    
+    def test_run_worker_drains_queue(self):
+        """Test that a worker run with once=True classifies every queued ticket"""
+        self._submit(7)
+        
+        totals = run_worker(self.database_url, batch_size=3, once=True, classifier=self.classifier)
+        
+        self.assertEqual(totals, {'completed': 7, 'failed': 0})
+        self.assertEqual(Ticket.query.filter_by(status='pending').count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
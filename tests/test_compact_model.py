@@ -0,0 +1,126 @@
+"""
+Unit tests for the compact, memory-mappable model format.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import numpy as np
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import TicketClassifier, load_classifier
+from model.compact_model import CompactLinearModel, convert, is_compact_model
+
+class TestCompactModel(unittest.TestCase):
+    """Test cases for the compact model format"""
+    
+    def setUp(self):
+        """Train a small classifier and export it"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.pickle_path = os.path.join(self.temp_dir, 'model.pkl')
+        self.compact_path = os.path.join(self.temp_dir, 'model.compact')
+        
+        self.classifier = TicketClassifier()
+        self.classifier.train(
+            [
+                "server down cannot access email critical",
+                "website not loading customers urgent",
+                "password reset user account",
+                "printer not working office",
+                "internet connection slow employees",
+                "virus detected computer security"
+            ],
+            ["Critical", "Critical", "Low", "Medium", "High", "High"]
+        )
+        self.classifier.save_model(self.pickle_path)
+        
+        self.texts = [
+            "database server crashed all systems down",
+            "printer jammed again printer",
+            "need a password reset",
+            "",
+            "completely unknown words"
+        ]
+    
+    def tearDown(self):
+        """Remove the temporary directory"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_predictions_match_pipeline(self):
+        """Test that the compact model predicts like the pickled pipeline"""
+        self.classifier.save_compact(self.compact_path)
+        compact = TicketClassifier(self.compact_path)
+        
+        self.assertIsNotNone(compact.compact_model)
+        self.assertEqual(compact.predict_many(self.texts), self.classifier.predict_many(self.texts))
+    
+    def test_features_match_vectorizer(self):
+        """Test that TF-IDF features match the fitted vectorizer"""
+        self.classifier.save_compact(self.compact_path)
+        model = CompactLinearModel(self.compact_path)
+        
+        expected = self.classifier.pipeline.named_steps['vectorizer'].transform(self.texts).toarray()
+        np.testing.assert_allclose(model.transform(self.texts).toarray(), expected, atol=1e-6)
+    
+    def test_arrays_are_memory_mapped(self):
+        """Test that large arrays are opened with memory mapping"""
+        self.classifier.save_compact(self.compact_path)
+        model = CompactLinearModel(self.compact_path)
+        
+        self.assertIsInstance(model.vocabulary, np.memmap)
+        self.assertIsInstance(model.idf, np.memmap)
+        self.assertEqual(model.idf.dtype, np.float32)
+        for coef, intercept, _ in model.outputs:
+            self.assertIsInstance(coef, np.memmap)
+            self.assertEqual(coef.dtype, np.float32)
+    
+    def test_scorer_reads_memory_mapped_arrays(self):
+        """Test that the native scorer of a compact model does not copy its arrays"""
+        self.classifier.save_compact(self.compact_path)
+        compact = TicketClassifier(self.compact_path)
+        scorer = compact.scorer
+        
+        self.assertIsNotNone(scorer)
+        self.assertIsInstance(scorer.vocabulary, np.memmap)
+        self.assertIsInstance(scorer.idf, np.memmap)
+        for block, (coef, _, _) in zip(scorer.coef_blocks, compact.compact_model.outputs):
+            self.assertIsInstance(block, np.memmap)
+            self.assertTrue(np.shares_memory(block, coef))
+        
+        # One ticket at a time and as a batch
+        expected = self.classifier.predict_many(self.texts)
+        self.assertEqual([compact.predict_many([text])[0] for text in self.texts], expected)
+        self.assertEqual(compact.predict_many(self.texts), expected)
+    
+    def test_convert_from_pickle(self):
+        """Test converting a pickled model keeps its version"""
+        convert(self.pickle_path, self.compact_path)
+        
+        self.assertTrue(is_compact_model(self.compact_path))
+        self.assertEqual(TicketClassifier(self.compact_path).version, self.classifier.version)
+    
+    def test_load_classifier_prefers_current_compact_model(self):
+        """Test that only an up-to-date compact model is preferred"""
+        convert(self.pickle_path, self.compact_path)
+        self.assertIsNotNone(load_classifier(self.pickle_path, self.compact_path).compact_model)
+        
+        # Retrain and overwrite the pickle; the compact model is now stale
+        self.classifier.train(["printer broken", "server down"], ["Medium", "Critical"])
+        self.classifier.save_model(self.pickle_path)
+        
+        loaded = load_classifier(self.pickle_path, self.compact_path)
+        self.assertIsNone(loaded.compact_model)
+        self.assertEqual(loaded.version, self.classifier.version)
+    
+    def test_compact_model_cannot_be_pickled(self):
+        """Test that saving a compact-backed classifier as a pickle fails clearly"""
+        self.classifier.save_compact(self.compact_path)
+        with self.assertRaises(ValueError):
+            TicketClassifier(self.compact_path).save_model(self.pickle_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
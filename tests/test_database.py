@@ -0,0 +1,201 @@
+"""
+Tests for the database engine configuration and schema upgrades.
+"""
+import sys
+import os
+import shutil
+import sqlite3
+import unittest
+import tempfile
+import subprocess
+from unittest import mock
+
+# Add the parent directory to path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import inspect
+
+from tools.import_tickets import create_app
+from database.models import db, Ticket, add_missing_columns, upgrade_schema
+from database.engine import engine_options
+from database.stats import ticket_counts
+
+# Commits tickets one at a time, as a gunicorn worker handling submissions would
+WRITER_SCRIPT = """
+import sys
+from tools.import_tickets import create_app
+from database.models import db, Ticket
+app = create_app(sys.argv[1])
+with app.app_context():
+    for i in range(int(sys.argv[2])):
+        db.session.add(Ticket(title=f'Ticket {i}', description='Concurrent write', priority='Low', team='software'))
+        db.session.commit()
+"""
+
+# Schema of the tickets table before status, model_version and the indexes were added
+OLD_SCHEMA = """
+CREATE TABLE tickets (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    priority VARCHAR(50) NOT NULL,
+    team VARCHAR(50) NOT NULL,
+    created_at DATETIME,
+    processed_text TEXT
+);
+INSERT INTO tickets (title, description, priority, team, created_at)
+VALUES ('Old ticket', 'Created by an older version', 'High', 'network', '2024-01-01 10:00:00.000000');
+"""
+
+class TestDatabase(unittest.TestCase):
+    """Test cases for the engine configuration and schema upgrades"""
+    
+    def setUp(self):
+        """Create a temporary directory for databases"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'tickets.db')
+        self.url = 'sqlite:///' + self.path
+    
+    def tearDown(self):
+        """Remove the temporary directory"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _open(self, url=None):
+        """Create an app for a database and push its context"""
+        app = create_app(url or self.url)
+        context = app.app_context()
+        context.push()
+        
+        def close():
+            db.session.remove()
+            db.engine.dispose()
+            context.pop()
+        self.addCleanup(close)
+        return app
+    
+    def _pragma(self, name):
+        """Read a pragma on a pooled connection"""
+        with db.engine.connect() as conn:
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    
+    def test_sqlite_pragmas(self):
+        """Test that SQLite connections use WAL and the tuned pragmas"""
+        self._open()
+        
+        self.assertEqual(self._pragma('journal_mode'), 'wal')
+        self.assertEqual(self._pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self._pragma('busy_timeout'), 5000)
+        self.assertEqual(self._pragma('temp_store'), 2)  # MEMORY
+    
+    def test_synchronous_override(self):
+        """Test that SQLITE_SYNCHRONOUS changes the sync level"""
+        with mock.patch.dict(os.environ, {'SQLITE_SYNCHRONOUS': 'full'}):
+            self._open()
+        self.assertEqual(self._pragma('synchronous'), 2)  # FULL
+    
+    def test_memory_database_keeps_default_journal(self):
+        """Test that in-memory databases are not switched to WAL"""
+        self._open('sqlite://')
+        self.assertEqual(self._pragma('journal_mode'), 'memory')
+        self.assertEqual(self._pragma('busy_timeout'), 5000)
+    
+    def test_pool_options(self):
+        """Test that server databases get pool settings from the environment"""
+        self.assertEqual(engine_options(self.url), {})
+        
+        with mock.patch.dict(os.environ, {'DB_POOL_SIZE': '20', 'DB_MAX_OVERFLOW': '0'}):
+            options = engine_options('postgresql://user@localhost/tickets')
+        self.assertEqual(options['pool_size'], 20)
+        self.assertEqual(options['max_overflow'], 0)
+        self.assertTrue(options['pool_pre_ping'])
+    
+    def test_upgrade_existing_database(self):
+        """Test that a database created by an older version is upgraded in place"""
+        with sqlite3.connect(self.path) as conn:
+            conn.executescript(OLD_SCHEMA)
+        
+        self._open()
+        
+        columns = {column['name'] for column in inspect(db.engine).get_columns('tickets')}
+        self.assertTrue({'status', 'model_version'} <= columns)
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('tickets')}
+        self.assertTrue({'ix_tickets_created_at_id', 'ix_tickets_priority_created_at_id',
+                         'ix_tickets_team_created_at_id'} <= indexes)
+        
+        ticket = Ticket.query.one()
+        self.assertEqual((ticket.title, ticket.status), ('Old ticket', 'classified'))
+        self.assertEqual(ticket_counts(True), ({'High': {'network': 1}}, 1))
+        
+        # The new indexes have planner statistics, and a second run changes nothing
+        with db.engine.connect() as conn:
+            analyzed = {row[0] for row in conn.exec_driver_sql("SELECT idx FROM sqlite_stat1")}
+        self.assertIn('ix_tickets_priority_created_at_id', analyzed)
+        self.assertEqual(upgrade_schema(db.engine), [])
+    
+    def test_column_added_by_another_process(self):
+        """Test that a column added by another process after the check is skipped"""
+        self._open()
+        columns = [c for c in inspect(db.engine).get_columns('tickets') if c['name'] != 'status']
+        
+        # The first inspection is stale, as if another process added the
+        # column right after this one looked
+        inspections = [mock.Mock(get_columns=lambda name: columns)]
+        def stale_inspect(engine):
+            return inspections.pop() if inspections else inspect(engine)
+        
+        with mock.patch('database.models.inspect', side_effect=stale_inspect):
+            self.assertEqual(add_missing_columns(db.engine, Ticket.__table__), [])
+    
+    def test_filtered_listing_uses_index(self):
+        """Test that a priority-filtered, newest-first listing reads the composite index"""
+        self._open()
+        query = (
+            Ticket.query.filter(Ticket.priority == 'High')
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(20)
+        )
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        
+        with db.engine.connect() as conn:
+            plan = ' '.join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        self.assertIn('ix_tickets_priority_created_at_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_reader_does_not_block_writer(self):
+        """Test that a commit succeeds while another connection is reading"""
+        with mock.patch.dict(os.environ, {'SQLITE_BUSY_TIMEOUT': '200'}):
+            self._open()
+        
+        with db.engine.connect() as reader:
+            reader.exec_driver_sql("BEGIN")
+            self.assertEqual(reader.exec_driver_sql("SELECT count(*) FROM tickets").scalar(), 0)
+            
+            # With a rollback journal this would wait for the reader and fail
+            db.session.add(Ticket(title='Title', description='Description', priority='Low', team='software'))
+            db.session.commit()
+            
+            # The reader keeps its snapshot until its transaction ends
+            self.assertEqual(reader.exec_driver_sql("SELECT count(*) FROM tickets").scalar(), 0)
+            reader.exec_driver_sql("COMMIT")
+        
+        self.assertEqual(Ticket.query.count(), 1)
+    
+    def test_concurrent_writers(self):
+        """Test that processes writing at the same time wait for each other instead of failing"""
+        self._open()
+        db.engine.dispose()
+        
+        writers = [
+            subprocess.Popen([sys.executable, '-c', WRITER_SCRIPT, self.url, '50'],
+                             cwd=PROJECT_ROOT, stderr=subprocess.PIPE, text=True)
+            for _ in range(4)
+        ]
+        for writer in writers:
+            _, stderr = writer.communicate(timeout=120)
+            self.assertEqual(writer.returncode, 0, stderr)
+        
+        self.assertEqual(Ticket.query.count(), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
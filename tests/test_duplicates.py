@@ -0,0 +1,165 @@
+"""
+Tests for near-duplicate ticket detection.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+
+from utils.minhash import MinHasher, shingles, jaccard
+from tools.import_tickets import create_app
+from database.models import db, Ticket, TicketLshBucket, STATUS_PENDING
+from database.duplicates import index_ticket, find_duplicate, index_tickets
+
+WIFI = 'cannot connect wifi network office laptop drop connection every minute'
+WIFI_AGAIN = 'cannot connect wifi network office laptop drop connection every minutes'
+PRINTER = 'printer third floor jam every page paper tray empty'
+
+class TestMinHash(unittest.TestCase):
+    """Test cases for MinHash signatures and bucket keys"""
+    
+    def test_shingles(self):
+        """Test character shingles of short and long texts"""
+        self.assertEqual(shingles('abcdef', 5), {'abcde', 'bcdef'})
+        self.assertEqual(shingles('  ab   c ', 5), {'ab c'})
+        self.assertEqual(shingles('', 5), set())
+        self.assertEqual(jaccard({'a', 'b'}, {'b', 'c'}), 1 / 3)
+    
+    def test_signature_estimates_similarity(self):
+        """Test that matching signature positions approximate the Jaccard similarity"""
+        hasher = MinHasher(num_perm=256, bands=32)
+        exact = jaccard(hasher.shingles(WIFI), hasher.shingles(WIFI + ' since monday morning'))
+        estimate = (hasher.signature(WIFI) == hasher.signature(WIFI + ' since monday morning')).mean()
+        self.assertAlmostEqual(estimate, exact, delta=0.1)
+        self.assertIsNone(hasher.signature(''))
+    
+    def test_bucket_keys(self):
+        """Test that similar texts share buckets and different ones do not"""
+        hasher = MinHasher()
+        keys = hasher.text_keys(WIFI)
+        self.assertEqual([band for band, _ in keys], list(range(16)))
+        self.assertEqual(keys, MinHasher().text_keys(WIFI))
+        self.assertTrue(set(keys) & set(hasher.text_keys(WIFI_AGAIN)))
+        self.assertFalse(set(keys) & set(hasher.text_keys(PRINTER)))
+    
+    def test_bands_must_divide_signature(self):
+        """Test that the band count is validated"""
+        with self.assertRaises(ValueError):
+            MinHasher(num_perm=128, bands=10)
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    """Test cases for the database-backed duplicate index"""
+    
+    def setUp(self):
+        """Create a temporary database"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'tickets.db'))
+        self.context = self.app.app_context()
+        self.context.push()
+    
+    def tearDown(self):
+        """Remove the temporary database"""
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _add(self, processed_text, priority='High', team='network', parent_id=None, status=None):
+        """Store and index a classified ticket"""
+        ticket = Ticket(title='Title', description='Description', priority=priority, team=team,
+                        processed_text=processed_text, parent_id=parent_id)
+        if status:
+            ticket.status = status
+        index_ticket(ticket)
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket
+    
+    def test_find_duplicate(self):
+        """Test that a near-identical ticket is matched and a different one is not"""
+        original = self._add(WIFI)
+        self._add(PRINTER, priority='Low', team='hardware')
+        self.assertEqual(TicketLshBucket.query.count(), 32)
+        
+        parent, similarity = find_duplicate(WIFI_AGAIN, 0.8)
+        self.assertEqual(parent.id, original.id)
+        self.assertGreater(similarity, 0.9)
+        self.assertIsNone(find_duplicate('keyboard key stuck', 0.8))
+        self.assertIsNone(find_duplicate(WIFI_AGAIN, 0.99))
+        self.assertIsNone(find_duplicate('', 0.8))
+    
+    def test_groups_are_flat(self):
+        """Test that a duplicate of a duplicate is linked to the first ticket"""
+        original = self._add(WIFI)
+        duplicate = self._add(WIFI_AGAIN, parent_id=original.id)
+        db.session.delete(original.lsh_buckets[0])
+        db.session.commit()
+        
+        parent, _ = find_duplicate(WIFI_AGAIN + ' today', 0.8)
+        self.assertEqual(parent.id, original.id)
+        self.assertNotEqual(parent.id, duplicate.id)
+    
+    def test_pending_tickets_are_not_parents(self):
+        """Test that unclassified tickets are not used as parents"""
+        self._add(WIFI, status=STATUS_PENDING)
+        self.assertIsNone(find_duplicate(WIFI_AGAIN, 0.8))
+    
+    def test_lookup_does_not_scan_tickets(self):
+        """Test that candidates are found through the bucket index"""
+        self._add(WIFI)
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            find_duplicate(WIFI_AGAIN, 0.8)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        statement, parameters = statements[0]
+        with db.engine.connect() as conn:
+            plan = ' '.join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        self.assertIn('FROM ticket_lsh_buckets', statement)
+        # One index search per band, and no table scan
+        self.assertEqual(plan.count('SEARCH ticket_lsh_buckets USING COVERING INDEX'), 16)
+        self.assertNotIn('SCAN', plan)
+    
+    def test_index_tickets(self):
+        """Test indexing tickets stored without buckets, and rebuilding the index"""
+        rows = [
+            {'title': 'Title', 'description': 'Description', 'priority': 'High', 'team': 'network',
+             'processed_text': text}
+            for text in (WIFI, PRINTER, None)
+        ]
+        db.session.execute(insert(Ticket), rows)
+        db.session.commit()
+        self.assertIsNone(find_duplicate(WIFI_AGAIN, 0.8))
+        
+        self.assertEqual(index_tickets(batch_size=1), 2)
+        self.assertEqual(TicketLshBucket.query.count(), 32)
+        self.assertIsNotNone(find_duplicate(WIFI_AGAIN, 0.8))
+        
+        # Indexed tickets are skipped, unless the index is rebuilt
+        self.assertEqual(index_tickets(), 0)
+        self.assertEqual(index_tickets(rebuild=True), 2)
+        self.assertEqual(TicketLshBucket.query.count(), 32)
+    
+    def test_deleting_ticket_removes_buckets(self):
+        """Test that a deleted ticket leaves no buckets behind"""
+        ticket = self._add(WIFI)
+        db.session.delete(ticket)
+        db.session.commit()
+        self.assertEqual(TicketLshBucket.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the group commit writer.
+"""
+import sys
+import os
+import shutil
+import unittest
+import time
+import tempfile
+import threading
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.import_tickets import create_app
+from database.models import db, Ticket
+from database.group_commit import GroupCommitWriter
+
+class TestGroupCommitWriter(unittest.TestCase):
+    """Test cases for GroupCommitWriter"""
+    
+    def setUp(self):
+        """Create a temporary database and a writer for it"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'tickets.db'))
+        self.context = self.app.app_context()
+        self.context.push()
+        self.commits = []
+        self.writer = GroupCommitWriter(db.engine, window=0.05, max_batch=10,
+                                        on_commit=lambda size, seconds: self.commits.append(size))
+    
+    def tearDown(self):
+        """Stop the writer and remove the temporary database"""
+        self.writer.close()
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _ticket(self, title, priority='Low'):
+        """Create a new, unsaved ticket"""
+        return Ticket(title=title, description='Description', priority=priority, team='software')
+    
+    def _submit_concurrently(self, tickets):
+        """Submit one ticket per thread and collect the results by title"""
+        results = {}
+        
+        def submit(ticket):
+            def write(session):
+                session.add(ticket)
+                return ticket.title
+            try:
+                results[ticket.title] = self.writer.submit(write, timeout=30)
+            except Exception as e:
+                results[ticket.title] = e
+        
+        threads = [threading.Thread(target=submit, args=(ticket,)) for ticket in tickets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+    
+    def test_concurrent_writes_share_commits(self):
+        """Test that writes arriving together are committed in a few transactions"""
+        tickets = [self._ticket(f'Ticket {i}') for i in range(25)]
+        results = self._submit_concurrently(tickets)
+        
+        self.assertEqual(results, {ticket.title: ticket.title for ticket in tickets})
+        self.assertEqual(Ticket.query.count(), 25)
+        self.assertEqual(sum(self.commits), 25)
+        self.assertLess(len(self.commits), 25)
+        self.assertLessEqual(max(self.commits), 10)
+        
+        # Every caller sees its committed row, with its id
+        self.assertTrue(all(ticket.id for ticket in tickets))
+    
+    def test_failed_write_does_not_fail_the_group(self):
+        """Test that one invalid ticket only fails its own submission"""
+        tickets = [self._ticket(f'Ticket {i}') for i in range(5)]
+        tickets.append(self._ticket('Invalid', priority=None))
+        results = self._submit_concurrently(tickets)
+        
+        self.assertIsInstance(results.pop('Invalid'), Exception)
+        self.assertEqual(results, {f'Ticket {i}': f'Ticket {i}' for i in range(5)})
+        self.assertEqual(Ticket.query.count(), 5)
+    
+    def test_error_raised_by_work(self):
+        """Test that an error raised by a write reaches its caller"""
+        def write(session):
+            raise ValueError("Bad ticket")
+        
+        with self.assertRaisesRegex(ValueError, "Bad ticket"):
+            self.writer.submit(write, timeout=30)
+        self.assertEqual(Ticket.query.count(), 0)
+    
+    def test_timed_out_write_is_dropped(self):
+        """Test that a write still queued when its caller gives up is never stored"""
+        running = threading.Event()
+        release = threading.Event()
+        
+        def block(session):
+            session.add(self._ticket('Blocking'))
+            running.set()
+            release.wait(30)
+        
+        blocker = threading.Thread(target=self.writer.submit, args=(block, 30))
+        blocker.start()
+        running.wait(30)
+        
+        with self.assertRaises(TimeoutError):
+            self.writer.submit(lambda session: session.add(self._ticket('Late')), timeout=0.1)
+        release.set()
+        blocker.join()
+        self.writer.close()
+        
+        self.assertEqual([ticket.title for ticket in Ticket.query.all()], ['Blocking'])
+    
+    def test_started_write_is_waited_for(self):
+        """Test that a write already running when the timeout passes still reports its result"""
+        def slow(session):
+            session.add(self._ticket('Slow'))
+            time.sleep(0.5)
+            return 'stored'
+        
+        # Longer than the group window, so the write has started
+        self.assertEqual(self.writer.submit(slow, timeout=0.2), 'stored')
+        self.assertEqual(Ticket.query.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for the bulk ticket import tool.
+"""
+import sys
+import os
+import json
+import unittest
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.import_tickets import create_app, import_tickets, normalize_record
+from model.classifier import TicketClassifier
+from database.models import db, Ticket, ImportCheckpoint
+
+class TestImportTickets(unittest.TestCase):
+    """Test cases for the bulk import tool"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a small classifier shared by all tests"""
+        cls.classifier = TicketClassifier()
+        cls.classifier.train(
+            ["server down critical", "printer broken", "password reset request", "network slow"],
+            ["Critical", "Medium", "Low", "High"]
+        )
+    
+    def setUp(self):
+        """Create a temporary database and input directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'import.db'))
+    
+    def tearDown(self):
+        """Remove the temporary files"""
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        for name in os.listdir(self.temp_dir):
+            os.unlink(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+    
+    def _write(self, name, content):
+        """Write an input file and return its path"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def test_import_csv(self):
+        """Test importing CSV rows, keeping given labels"""
+        path = self._write('tickets.csv', (
+            "ID,Title,Description,Priority,Team\n"
+            "1,Cannot connect to WiFi,Laptop cannot connect to the WiFi network,Medium,network\n"
+            "2,Website down,Customers cannot reach the website,Critical,network\n"
+            "3,Missing description,,Low,software\n"
+        ))
+        
+        with self.app.app_context():
+            summary = import_tickets(path, batch_size=2, workers=0, classifier=self.classifier)
+            tickets = Ticket.query.order_by(Ticket.id).all()
+            
+            self.assertEqual(summary['rows_read'], 3)
+            self.assertEqual(summary['rows_imported'], 2)
+            self.assertEqual([t.priority for t in tickets], ['Medium', 'Critical'])
+            self.assertEqual([t.team for t in tickets], ['network', 'network'])
+            self.assertTrue(all(t.processed_text for t in tickets))
+    
+    def test_import_jsonl_classifies_missing_labels(self):
+        """Test importing JSON Lines records without labels"""
+        path = self._write('tickets.jsonl', "\n".join([
+            json.dumps({'title': 'Printer broken', 'body': 'The office printer is broken again'}),
+            'not json',
+            json.dumps({'title': 'Password reset', 'description': 'Please reset my login password'})
+        ]))
+        
+        with self.app.app_context():
+            summary = import_tickets(path, workers=0, classifier=self.classifier)
+            tickets = Ticket.query.order_by(Ticket.id).all()
+            
+            self.assertEqual(summary['rows_imported'], 2)
+            self.assertEqual(summary['rows_skipped'], 1)
+            for ticket in tickets:
+                self.assertIn(ticket.priority, ['Critical', 'High', 'Medium', 'Low'])
+                self.assertIn(ticket.team, ['network', 'hardware', 'software', 'security'])
+            self.assertEqual(tickets[1].team, 'security')
+    
+    def test_resume_from_checkpoint(self):
+        """Test that a second run only imports rows after the checkpoint"""
+        lines = [json.dumps({'title': f'Ticket {i}', 'description': f'Printer {i} is broken'}) for i in range(5)]
+        path = self._write('tickets.jsonl', "\n".join(lines[:3]))
+        
+        with self.app.app_context():
+            import_tickets(path, workers=0, classifier=self.classifier)
+            
+            # The file grows; only the new rows are imported
+            self._write('tickets.jsonl', "\n".join(lines))
+            summary = import_tickets(path, workers=0, classifier=self.classifier)
+            
+            self.assertEqual(summary['rows_imported'], 2)
+            self.assertEqual(Ticket.query.count(), 5)
+            checkpoint = db.session.get(ImportCheckpoint, os.path.abspath(path))
+            self.assertEqual(checkpoint.rows_read, 5)
+            
+            # Restarting imports everything again
+            summary = import_tickets(path, workers=0, restart=True, classifier=self.classifier)
+            self.assertEqual(summary['rows_imported'], 5)
+    
+    def test_normalize_record(self):
+        """Test mapping raw records onto ticket fields"""
+        self.assertIsNone(normalize_record({'title': 'No description'}))
+        self.assertIsNone(normalize_record(None))
+        
+        ticket = normalize_record({'Title': 'VPN down', 'Body': 'VPN fails', 'Team': ' Network '})
+        self.assertEqual(ticket['description'], 'VPN fails')
+        self.assertEqual(ticket['team'], 'network')
+        self.assertIsNone(ticket['priority'])
+
+
+if __name__ == '__main__':
+    unittest.main()
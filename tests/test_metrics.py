@@ -0,0 +1,138 @@
+"""
+Unit tests for the Prometheus metrics registry.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import subprocess
+
+# Add the parent directory to path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.metrics import MetricsRegistry, clear_directory
+
+# Records one request in a separate process, as another gunicorn worker would
+WORKER_SCRIPT = """
+import sys
+from utils.metrics import MetricsRegistry
+registry = MetricsRegistry(sys.argv[1])
+registry.counter('requests_total', 'Requests', ['route']).inc(route='/api/classify')
+registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0)).observe(0.5)
+registry.gauge('workers', 'Live workers').set(1)
+"""
+
+def define_metrics(registry):
+    """Define the same metrics as WORKER_SCRIPT"""
+    return (
+        registry.counter('requests_total', 'Requests', ['route']),
+        registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0)),
+        registry.gauge('workers', 'Live workers')
+    )
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for the MetricsRegistry class"""
+    
+    def setUp(self):
+        """Create a temporary metrics directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.registries = []
+    
+    def tearDown(self):
+        """Close the registries and remove the temporary metrics directory"""
+        for registry in self.registries:
+            registry.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _registry(self):
+        """Create a registry writing to the temporary directory"""
+        registry = MetricsRegistry(self.temp_dir)
+        self.registries.append(registry)
+        return registry
+    
+    def test_render_format(self):
+        """Test the Prometheus text format of each metric type"""
+        registry = MetricsRegistry()
+        requests, latency, workers = define_metrics(registry)
+        
+        requests.inc(route='/api/classify')
+        requests.inc(2, route='/api/classify')
+        requests.inc(route='/say "hi"')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(3)
+        workers.set(1)
+        
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE requests_total counter', lines)
+        self.assertIn('requests_total{route="/api/classify"} 3.0', lines)
+        self.assertIn('requests_total{route="/say \\"hi\\""} 1.0', lines)
+        self.assertIn('# TYPE latency_seconds histogram', lines)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1.0', lines)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2.0', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3.0', lines)
+        self.assertIn('latency_seconds_sum 3.55', lines)
+        self.assertIn('latency_seconds_count 3.0', lines)
+        self.assertIn('workers 1.0', lines)
+    
+    def test_labels_are_checked(self):
+        """Test that missing labels and duplicate metrics are rejected"""
+        registry = MetricsRegistry()
+        requests, _, _ = define_metrics(registry)
+        
+        with self.assertRaises(ValueError):
+            requests.inc()
+        with self.assertRaises(ValueError):
+            registry.counter('requests_total', 'Requests again')
+    
+    def test_timer(self):
+        """Test that a timed block is observed once"""
+        registry = MetricsRegistry()
+        _, latency, _ = define_metrics(registry)
+        
+        with latency.time():
+            pass
+        
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1.0', registry.render().splitlines())
+    
+    def test_merges_other_processes(self):
+        """Test that totals include workers that have written their values"""
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', WORKER_SCRIPT, self.temp_dir], cwd=PROJECT_ROOT, check=True)
+        self.assertEqual(len(os.listdir(self.temp_dir)), 2)
+        
+        registry = self._registry()
+        requests, latency, workers = define_metrics(registry)
+        requests.inc(route='/api/classify')
+        latency.observe(0.05)
+        workers.set(1)
+        
+        lines = registry.render().splitlines()
+        self.assertIn('requests_total{route="/api/classify"} 3.0', lines)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1.0', lines)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3.0', lines)
+        self.assertIn('latency_seconds_count 3.0', lines)
+        
+        # The two workers have exited, so only this process is live
+        self.assertIn('workers 1.0', lines)
+    
+    def test_flush_only_when_changed(self):
+        """Test that flushing writes this process's file only after a change"""
+        registry = self._registry()
+        requests, _, _ = define_metrics(registry)
+        
+        registry.flush()
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        
+        requests.inc(route='/')
+        registry.flush()
+        self.assertEqual(os.listdir(self.temp_dir), [f'metrics-{os.getpid()}.json'])
+        
+        clear_directory(self.temp_dir)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
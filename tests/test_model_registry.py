@@ -0,0 +1,141 @@
+"""
+Unit tests for hot model reloading.
+"""
+import sys
+import os
+import time
+import shutil
+import unittest
+import tempfile
+import threading
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import TicketClassifier
+from model.registry import ModelRegistry
+from model.compact_model import convert
+
+TEXTS = [
+    "server down cannot access email critical",
+    "website not loading customers urgent",
+    "password reset user account",
+    "printer not working office"
+]
+
+class TestModelRegistry(unittest.TestCase):
+    """Test cases for the ModelRegistry class"""
+    
+    def setUp(self):
+        """Save a first model to a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.temp_dir, 'model.pkl')
+        self.compact_path = os.path.join(self.temp_dir, 'model.compact')
+        self._save(["Critical", "Critical", "Low", "Medium"])
+        self.registry = ModelRegistry(self.model_path, self.compact_path)
+    
+    def tearDown(self):
+        """Stop the watcher and remove the temporary directory"""
+        self.registry.stop_watcher()
+        shutil.rmtree(self.temp_dir)
+    
+    def _save(self, priorities):
+        """Train and save a model, returning its version"""
+        classifier = TicketClassifier().train(TEXTS, priorities)
+        classifier.save_model(self.model_path)
+        return classifier.version
+    
+    def _touch_later(self):
+        """Make sure the next save gets a different modification time"""
+        time.sleep(0.01)
+    
+    def test_reload_swaps_new_version(self):
+        """Test that a retrained model replaces the current one"""
+        before = self.registry.current
+        
+        self.assertFalse(self.registry.reload())
+        self.assertIs(self.registry.current, before)
+        
+        version = self._save(["Low", "Low", "High", "High"])
+        self.assertTrue(self.registry.reload())
+        self.assertEqual(self.registry.current.version, version)
+        
+        # A reference taken before the swap keeps using the old model
+        self.assertNotEqual(before.version, version)
+        self.assertEqual(before.predict_many(TEXTS[:1]), ['Critical'])
+    
+    def test_reload_if_changed_waits_for_stable_files(self):
+        """Test that a change is picked up once the files stop changing"""
+        self.assertFalse(self.registry.reload_if_changed())
+        
+        self._touch_later()
+        version = self._save(["Low", "Low", "High", "High"])
+        self.assertFalse(self.registry.reload_if_changed())
+        self.assertTrue(self.registry.reload_if_changed())
+        self.assertEqual(self.registry.current.version, version)
+        self.assertFalse(self.registry.reload_if_changed())
+    
+    def test_broken_model_keeps_current(self):
+        """Test that an unreadable model leaves the current model in place"""
+        before = self.registry.current
+        self._touch_later()
+        with open(self.model_path, 'wb') as f:
+            f.write(b'not a pickle')
+        
+        with self.assertRaises(Exception):
+            self.registry.reload()
+        self.assertIs(self.registry.current, before)
+        
+        # Not retried until the file changes again
+        self.assertFalse(self.registry.reload_if_changed())
+        self.assertFalse(self.registry.reload_if_changed())
+    
+    def test_prefers_compact_copy_of_same_model(self):
+        """Test that a compact export of the current model is swapped in"""
+        version = self.registry.current.version
+        self.assertEqual(self.registry.info()['format'], 'pickle')
+        
+        convert(self.model_path, self.compact_path)
+        
+        self.assertTrue(self.registry.reload())
+        self.assertEqual(self.registry.current.version, version)
+        self.assertEqual(self.registry.info()['format'], 'compact')
+        self.assertFalse(self.registry.reload())
+    
+    def test_watcher_reloads_while_serving(self):
+        """Test that the watcher swaps models without failing concurrent predictions"""
+        errors = []
+        stop = threading.Event()
+        
+        def serve():
+            while not stop.is_set():
+                try:
+                    model = self.registry.current
+                    predictions = model.predict_many(TEXTS)
+                    if len(predictions) != len(TEXTS):
+                        errors.append(predictions)
+                except Exception as e:
+                    errors.append(e)
+        
+        threads = [threading.Thread(target=serve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        
+        self.registry.start_watcher(interval=0.02)
+        self._touch_later()
+        version = self._save(["Low", "Low", "High", "High"])
+        
+        deadline = time.monotonic() + 5
+        while self.registry.current.version != version and time.monotonic() < deadline:
+            time.sleep(0.02)
+        
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.registry.current.version, version)
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
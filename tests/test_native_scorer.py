@@ -0,0 +1,154 @@
+"""
+Parity tests for the native TF-IDF + linear scorer.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import numpy as np
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import TicketClassifier
+from model.native_scorer import NativeLinearScorer
+from benchmarks.corpus import generate_tickets
+
+def corpus_texts(count, seed):
+    """Raw texts of synthetic tickets, with their priorities"""
+    tickets = list(generate_tickets(count, seed=seed))
+    return [f"{t['Title']} {t['Description']}" for t in tickets], [t['Priority'] for t in tickets]
+
+class TestNativeScorer(unittest.TestCase):
+    """Test cases for the NativeLinearScorer class"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a classifier on a synthetic corpus"""
+        texts, priorities = corpus_texts(1000, seed=0)
+        cls.classifier = TicketClassifier().train(texts, priorities)
+        
+        # Unseen tickets, plus edge cases
+        cls.texts = corpus_texts(2000, seed=1)[0] + [
+            "",
+            "completely unknown vocabulary zzz",
+            "SERVER DOWN server down Server Down",
+            "a",
+            "email " * 50
+        ]
+    
+    def assert_parity(self, pipeline, texts):
+        """Assert that the scorer predicts and scores exactly like the pipeline"""
+        scorer = NativeLinearScorer.from_pipeline(pipeline)
+        features = pipeline.named_steps['vectorizer'].transform(texts)
+        estimators = pipeline.named_steps['classifier'].estimators_
+        
+        np.testing.assert_array_equal(scorer.predict(texts), pipeline.predict(texts))
+        
+        expected = np.hstack([
+            estimator.decision_function(features).reshape(len(texts), -1) for estimator in estimators
+        ])
+        scores = np.vstack([scorer.decision_function(pair) for pair in scorer.vectorize(texts)])
+        np.testing.assert_allclose(scores, expected, rtol=1e-12, atol=1e-12)
+    
+    def test_classifier_uses_native_scorer(self):
+        """Test that TicketClassifier predictions come from the scorer and match the pipeline"""
+        self.assertIsNotNone(self.classifier.scorer)
+        
+        pipeline = self.classifier.pipeline
+        expected = [self.classifier.priority_mapping[row[0]] for row in pipeline.predict(self.texts)]
+        self.assertEqual(self.classifier.predict_many(self.texts), expected)
+        self.assertEqual([self.classifier.predict(text) for text in self.texts[:50]], expected[:50])
+    
+    def test_parity_with_pipeline(self):
+        """Test exact parity with the default pipeline"""
+        self.assert_parity(self.classifier.pipeline, self.texts)
+    
+    def test_parity_with_vectorizer_options(self):
+        """Test parity with sublinear tf, l1 and no normalization, and without idf"""
+        from sklearn.pipeline import Pipeline
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.multioutput import MultiOutputClassifier
+        from sklearn.linear_model import LogisticRegression
+        
+        texts, priorities = corpus_texts(500, seed=2)
+        labels = np.array([[self.classifier.reverse_priority_mapping[p]] for p in priorities])
+        for options in ({'sublinear_tf': True}, {'norm': 'l1'}, {'norm': None}, {'use_idf': False}):
+            with self.subTest(**options):
+                pipeline = Pipeline([
+                    ('vectorizer', TfidfVectorizer(**options)),
+                    ('classifier', MultiOutputClassifier(LogisticRegression(max_iter=1000)))
+                ]).fit(texts, labels)
+                self.assert_parity(pipeline, self.texts[:500])
+    
+    def test_parity_binary_classifier(self):
+        """Test parity with a two-class estimator, which has a single row of weights"""
+        texts, priorities = corpus_texts(500, seed=3)
+        classifier = TicketClassifier().train(
+            texts, ['Critical' if p == 'Critical' else 'Low' for p in priorities]
+        )
+        self.assertEqual(classifier.pipeline.named_steps['classifier'].estimators_[0].coef_.shape[0], 1)
+        self.assert_parity(classifier.pipeline, self.texts[:500])
+    
+    def test_scorer_follows_updates(self):
+        """Test that the scorer uses the weights after an incremental update"""
+        classifier = TicketClassifier().train(*corpus_texts(300, seed=4))
+        classifier.update(self.texts[:20], ['Critical'] * 20)
+        self.assert_parity(classifier.pipeline, self.texts[:200])
+    
+    def test_compact_model(self):
+        """Test that a compact model is served by a scorer and predicts like it did before"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'model.compact')
+            self.classifier.save_compact(path)
+            compact = TicketClassifier(path)
+            
+            self.assertIsNotNone(compact.scorer)
+            expected = compact.compact_model.predict(self.texts)
+            np.testing.assert_array_equal(compact.scorer.predict(self.texts), expected)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_joint_model(self):
+        """Test parity of both outputs of a joint model, and of their probabilities"""
+        tickets = list(generate_tickets(1000, seed=6))
+        classifier = TicketClassifier().train(
+            [f"{t['Title']} {t['Description']}" for t in tickets],
+            [t['Priority'] for t in tickets],
+            [t['Team'] for t in tickets]
+        )
+        self.assert_parity(classifier.pipeline, self.texts[:500])
+        
+        features = classifier.pipeline.named_steps['vectorizer'].transform(self.texts[:500])
+        expected = np.column_stack([
+            probabilities.max(axis=1)
+            for probabilities in classifier.pipeline.named_steps['classifier'].predict_proba(features)
+        ])
+        for features in (classifier.scorer.vectorize(self.texts[:500]), classifier.scorer.vectorize(self.texts[:1])):
+            _, confidences = classifier.scorer.predict_features(features, confidence=True)
+            np.testing.assert_allclose(confidences, expected[:len(features)], rtol=1e-12)
+        
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'model.compact')
+            classifier.save_compact(path)
+            compact = TicketClassifier(path).compact_model
+            predictions, confidences = compact.predict_features(compact.transform(self.texts[:500]), confidence=True)
+            np.testing.assert_array_equal(predictions, classifier.pipeline.predict(self.texts[:500]))
+            np.testing.assert_allclose(confidences, expected, rtol=1e-4)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_hashing_model_has_no_scorer(self):
+        """Test that models without a vocabulary keep using the pipeline"""
+        classifier = TicketClassifier(engine='hashing', n_features=2 ** 12)
+        classifier.partial_fit(*corpus_texts(200, seed=5))
+        
+        self.assertIsNone(classifier.scorer)
+        self.assertEqual(len(classifier.predict_many(self.texts[:10])), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
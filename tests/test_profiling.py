@@ -0,0 +1,91 @@
+"""
+Unit tests for request profiling.
+"""
+import sys
+import os
+import pstats
+import shutil
+import unittest
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import MetricsRegistry
+from utils.profiling import RequestProfiler, StageTimer, format_server_timing
+
+class TestRequestProfiler(unittest.TestCase):
+    """Test cases for the RequestProfiler class"""
+    
+    def setUp(self):
+        """Create a temporary profile directory"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Remove the temporary profile directory"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_samples_requests(self):
+        """Test that only the sampled fraction of requests is profiled"""
+        values = iter([0.05, 0.5, 0.09, 0.1])
+        profiler = RequestProfiler(self.temp_dir, 0.1, rng=lambda: next(values))
+        
+        sampled = []
+        for _ in range(4):
+            profile = profiler.start()
+            sampled.append(profile is not None)
+            if profile is not None:
+                profile.disable()
+        
+        self.assertEqual(sampled, [True, False, True, False])
+    
+    def test_writes_loadable_stats(self):
+        """Test that a profile is written in the pstats format"""
+        profiler = RequestProfiler(self.temp_dir, 1.0)
+        
+        profile = profiler.start()
+        sorted(range(1000), key=lambda x: -x)
+        filename = profiler.stop(profile, 'classify_ticket_api')
+        
+        self.assertEqual(os.listdir(self.temp_dir), [filename])
+        stats = pstats.Stats(os.path.join(self.temp_dir, filename))
+        self.assertGreater(stats.total_calls, 0)
+    
+    def test_stops_when_directory_full(self):
+        """Test that no profile is started once max_files is reached"""
+        profiler = RequestProfiler(self.temp_dir, 1.0, max_files=1)
+        profiler.stop(profiler.start(), 'submit_ticket')
+        
+        self.assertIsNone(profiler.start())
+
+class TestServerTiming(unittest.TestCase):
+    """Test cases for stage timing and the Server-Timing header"""
+    
+    def test_stage_timer_records_durations(self):
+        """Test that a stage is recorded in the histogram and the timings"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('stage_seconds', 'Stages', ['stage'])
+        timings = {}
+        
+        for _ in range(2):
+            with StageTimer(histogram, 'predict', timings):
+                pass
+        with StageTimer(histogram, 'preprocess'):
+            pass
+        
+        self.assertEqual(list(timings), ['predict'])
+        self.assertIn('stage_seconds_count{stage="predict"} 2.0', registry.render().splitlines())
+        self.assertIn('stage_seconds_count{stage="preprocess"} 1.0', registry.render().splitlines())
+    
+    def test_format_server_timing(self):
+        """Test the header format"""
+        header = format_server_timing({'preprocess': 0.0012, 'predict': 0.0003}, 0.002, 'a.prof')
+        
+        self.assertEqual(
+            header,
+            'preprocess;dur=1.200, predict;dur=0.300, total;dur=2.000, profile;desc="a.prof"'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
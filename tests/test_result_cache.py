@@ -0,0 +1,90 @@
+"""
+Unit tests for the classification result cache.
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.result_cache import ResultCache
+
+class FakeClock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the result cache"""
+    
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses"""
+        cache = ResultCache(maxsize=10)
+        key = ResultCache.make_key("server down")
+        
+        self.assertIsNone(cache.get(key, 'v1'))
+        cache.set(key, ('Critical', 'network'), 'v1')
+        self.assertEqual(cache.get(key, 'v1'), ('Critical', 'network'))
+        
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ResultCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        
+        # Touch 'a' so that 'b' becomes least recently used
+        cache.get('a')
+        cache.set('c', 3)
+        
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ResultCache(maxsize=10, ttl=60, clock=clock)
+        cache.set('a', 1)
+        
+        clock.now = 59
+        self.assertEqual(cache.get('a'), 1)
+        
+        clock.now = 61
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+    
+    def test_version_change_invalidates(self):
+        """Test that a new model version never sees old results"""
+        cache = ResultCache(maxsize=10)
+        cache.set('a', ('Low', 'software'), 'model-1')
+        
+        self.assertIsNone(cache.get('a', 'model-2'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['version'], 'model-2')
+    
+    def test_disabled_cache(self):
+        """Test that a zero-size cache stores nothing"""
+        cache = ResultCache(maxsize=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+    
+    def test_make_key(self):
+        """Test that keys are stable and distinguish texts"""
+        self.assertEqual(ResultCache.make_key("wifi down"), ResultCache.make_key("wifi down"))
+        self.assertNotEqual(ResultCache.make_key("wifi down"), ResultCache.make_key("wifi up"))
+
+
+if __name__ == '__main__':
+    unittest.main()
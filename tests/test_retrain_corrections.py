@@ -0,0 +1,126 @@
+"""
+Tests for incremental retraining from priority corrections.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+from unittest import mock
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.import_tickets import create_app
+from tools.retrain_corrections import retrain, corrections_since
+from model.classifier import TicketClassifier
+from utils.text_preprocessing import combine_title_description
+from database.models import db, Ticket, PriorityCorrection, TrainingCheckpoint
+
+TICKETS = [
+    ("Server outage", "The main database server is down for everyone", "Critical"),
+    ("Website slow", "Customer portal pages take a minute to load", "High"),
+    ("Printer jammed", "The second floor printer keeps jamming", "Medium"),
+    ("Password reset", "I forgot my password and need a reset", "Low"),
+    ("Email outage", "Nobody can send or receive email", "Critical"),
+    ("Monitor flicker", "My second monitor flickers sometimes", "Low")
+]
+
+class TestRetrainCorrections(unittest.TestCase):
+    """Test cases for the incremental trainer"""
+    
+    def setUp(self):
+        """Create a temporary database and model"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'tickets.db'))
+        self.context = self.app.app_context()
+        self.context.push()
+        
+        self.model_path = os.path.join(self.temp_dir, 'model.pkl')
+        texts = [combine_title_description(title, description) for title, description, _ in TICKETS]
+        classifier = TicketClassifier().train(texts, [priority for _, _, priority in TICKETS])
+        classifier.save_model(self.model_path)
+        self.version = classifier.version
+        
+        self.tickets = []
+        for title, description, priority in TICKETS:
+            ticket = Ticket(title=title, description=description, priority=priority, team='hardware')
+            db.session.add(ticket)
+            self.tickets.append(ticket)
+        db.session.commit()
+    
+    def tearDown(self):
+        """Remove the temporary database and model"""
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _correct(self, ticket, priority):
+        """Record a correction as the PATCH endpoint does"""
+        db.session.add(PriorityCorrection(ticket_id=ticket.id, old_priority=ticket.priority,
+                                          new_priority=priority))
+        ticket.priority = priority
+        db.session.commit()
+    
+    def test_retrain_learns_corrections(self):
+        """Test that a corrected ticket is predicted with its new priority"""
+        printer = self.tickets[2]
+        text = combine_title_description(printer.title, printer.description)
+        self.assertEqual(TicketClassifier(self.model_path).predict(text), 'Medium')
+        
+        self._correct(printer, 'Critical')
+        classifier = retrain(self.model_path)
+        
+        self.assertNotEqual(classifier.version, self.version)
+        self.assertEqual(TicketClassifier(self.model_path).predict(text), 'Critical')
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'model.compact')))
+        
+        checkpoint = db.session.get(TrainingCheckpoint, os.path.abspath(self.model_path))
+        self.assertEqual(checkpoint.model_version, classifier.version)
+        
+        # Nothing new to learn
+        self.assertIsNone(retrain(self.model_path))
+    
+    def test_only_new_corrections_are_read(self):
+        """Test that each run trains on the corrections since the last run"""
+        self._correct(self.tickets[0], 'High')
+        self._correct(self.tickets[1], 'Critical')
+        retrain(self.model_path)
+        
+        self._correct(self.tickets[3], 'Medium')
+        self._correct(self.tickets[3], 'High')
+        with mock.patch.object(TicketClassifier, 'update', autospec=True) as update:
+            retrain(self.model_path)
+        
+        texts, priorities = update.call_args[0][1:3]
+        self.assertEqual(len(texts), 1)
+        self.assertEqual(priorities, ['High'])
+    
+    def test_min_corrections(self):
+        """Test that the model is left alone until enough tickets are corrected"""
+        self._correct(self.tickets[0], 'High')
+        
+        self.assertIsNone(retrain(self.model_path, min_corrections=2))
+        self.assertEqual(TicketClassifier(self.model_path).version, self.version)
+        self.assertEqual(len(corrections_since(0)), 1)
+    
+    def test_hashing_model_uses_partial_fit(self):
+        """Test that a hashing model is updated with partial_fit"""
+        texts = [combine_title_description(title, description) for title, description, _ in TICKETS]
+        classifier = TicketClassifier(engine='hashing', n_features=2 ** 12)
+        classifier.partial_fit(texts, [priority for _, _, priority in TICKETS])
+        classifier.save_model(self.model_path)
+        
+        self._correct(self.tickets[5], 'High')
+        with mock.patch.object(TicketClassifier, 'partial_fit', autospec=True,
+                               side_effect=TicketClassifier.partial_fit) as partial_fit:
+            updated = retrain(self.model_path, epochs=2)
+        
+        self.assertEqual(partial_fit.call_count, 2)
+        self.assertNotEqual(updated.version, classifier.version)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'model.compact')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+"""
+Tests for the similar-ticket index.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import threading
+from unittest import mock
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from scipy import sparse
+
+from model import similarity_index
+from model.similarity_index import SimilarityIndex, normalize_rows
+from model.classifier import TicketClassifier
+from tools.import_tickets import create_app
+from database.models import db, Ticket, STATUS_PENDING
+from database.similarity import build_similarity_index, update_similarity_index, TicketSimilarity
+
+TEXTS = [
+    "email server down users cannot send email",
+    "email server slow users wait for email",
+    "printer jammed on third floor",
+    "printer out of toner on third floor",
+    "vpn connection drops every hour",
+    "password reset request for new user"
+]
+
+def random_matrix(rows, columns, seed=0):
+    """Sparse matrix with a few random nonnegative weights per row"""
+    return sparse.random(rows, columns, density=0.05, format='csr', random_state=seed, dtype=np.float32)
+
+class TestSimilarityIndex(unittest.TestCase):
+    """Test cases for SimilarityIndex"""
+    
+    def _brute_force(self, matrix, ids, vector, k):
+        """Top k cosine similarities computed with dense arrays"""
+        rows = normalize_rows(matrix).toarray()
+        query = normalize_rows(vector).toarray().ravel()
+        scores = rows @ query
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(ids[i], scores[i]) for i in order if scores[i] > 0]
+    
+    def test_normalize_rows(self):
+        """Test that rows get unit length and empty rows stay empty"""
+        matrix = sparse.csr_matrix(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        self.assertTrue(np.allclose(normalize_rows(matrix).toarray(), [[0.6, 0.8], [0.0, 0.0]]))
+    
+    def test_query_matches_brute_force(self):
+        """Test that results are the most similar rows, most similar first"""
+        matrix = random_matrix(500, 200)
+        ids = list(range(1000, 1500))
+        index = SimilarityIndex(200)
+        index.add(ids[:300], matrix[:300])
+        index.add(ids[300:], matrix[300:])
+        
+        for row in (0, 250, 499):
+            vector = matrix[row]
+            expected = self._brute_force(matrix, ids, vector, 10)
+            results = index.query(vector, 10)
+            self.assertEqual([ticket_id for ticket_id, _ in results], [ticket_id for ticket_id, _ in expected])
+            self.assertTrue(np.allclose([score for _, score in results], [score for _, score in expected], atol=1e-5))
+            self.assertEqual(results[0][0], ids[row])
+        
+        # The query ticket itself can be left out
+        results = index.query(matrix[0], 5, exclude=[1000])
+        self.assertNotIn(1000, [ticket_id for ticket_id, _ in results])
+        self.assertEqual(len(results), 5)
+    
+    def test_duplicate_ids_are_skipped(self):
+        """Test that adding a ticket twice keeps its first row"""
+        matrix = random_matrix(3, 50)
+        index = SimilarityIndex(50)
+        index.add([1, 2, 3], matrix)
+        index.add([3, 4], random_matrix(2, 50, seed=1))
+        self.assertEqual(len(index), 4)
+        self.assertTrue(np.allclose(index.vector(3).toarray(), normalize_rows(matrix[2]).toarray()))
+        self.assertIsNone(index.vector(5))
+    
+    def test_delta_is_merged(self):
+        """Test that appended rows are merged into the main matrix past the delta limit"""
+        matrix = random_matrix(60, 100)
+        index = SimilarityIndex(100)
+        with mock.patch.object(similarity_index, 'MIN_DELTA_ROWS', 10):
+            for start in range(0, 60, 5):
+                index.add(list(range(start, start + 5)), matrix[start:start + 5])
+                self.assertLessEqual(len(index._state.delta_ids), 10)
+        self.assertEqual(len(index), 60)
+        self.assertGreater(len(index._state.main_ids), 0)
+        self.assertEqual(index.query(matrix[42], 1)[0][0], 42)
+    
+    def test_pruned_query(self):
+        """Test that pruning with common terms left out keeps the closest match"""
+        # Column 0 is in every row, so it selects no candidates
+        matrix = sparse.hstack([np.ones((400, 1)), random_matrix(400, 300)], format='csr')
+        full = SimilarityIndex(301)
+        pruned = SimilarityIndex(301, prune_df=0.1)
+        for index in (full, pruned):
+            index.add(list(range(400)), matrix)
+        
+        for row in range(0, 400, 40):
+            self.assertEqual(pruned.query(matrix[row], 1), full.query(matrix[row], 1))
+        
+        # A query made only of common terms scores every row
+        common = sparse.csr_matrix(([1.0], ([0], [0])), shape=(1, 301))
+        self.assertEqual(len(pruned.query(common, 400)), 400)
+    
+    def test_save_and_load(self):
+        """Test that a saved index answers queries like the original"""
+        matrix = random_matrix(100, 80)
+        index = SimilarityIndex(80, model_version='abc', prune_df=0.2)
+        index.add(list(range(100)), matrix)
+        index.settled_id = 123
+        
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'index', 'similarity.npz')
+        index.save(path)
+        
+        loaded = SimilarityIndex.load(path, prune_df=0.2)
+        self.assertEqual((loaded.model_version, loaded.settled_id, len(loaded)), ('abc', 123, 100))
+        self.assertEqual(loaded.query(matrix[7], 5), index.query(matrix[7], 5))
+    
+    def test_vector_during_add(self):
+        """Test that a row read while add() is publishing it is the right one"""
+        matrix = random_matrix(12, 50)
+        expected = normalize_rows(matrix)
+        index = SimilarityIndex(50)
+        readers = []
+        errors = []
+        
+        def read(ticket_id):
+            try:
+                row = index.vector(ticket_id)
+                if row is not None and (row != expected[ticket_id]).nnz:
+                    errors.append(f"wrong row for {ticket_id}")
+            except Exception as e:
+                errors.append(repr(e))
+        
+        class Positions(dict):
+            """Starts a reader of each ticket as add() records its position"""
+            def __setitem__(self, ticket_id, position):
+                super().__setitem__(ticket_id, position)
+                reader = threading.Thread(target=read, args=(ticket_id,))
+                reader.start()
+                reader.join(0.05)
+                readers.append(reader)
+        
+        index._positions = Positions()
+        with mock.patch.object(similarity_index, 'MIN_DELTA_ROWS', 2):
+            for start in range(0, 12, 3):
+                index.add(list(range(start, start + 3)), matrix[start:start + 3])
+        for reader in readers:
+            reader.join()
+        
+        self.assertEqual(len(readers), 12)
+        self.assertEqual(errors, [])
+
+
+class TestTicketSimilarity(unittest.TestCase):
+    """Test cases for keeping the index in step with the tickets table"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a small classifier shared by all tests"""
+        cls.classifier = TicketClassifier()
+        cls.classifier.train(TEXTS, ["Critical", "High", "Medium", "Low", "High", "Low"])
+    
+    def setUp(self):
+        """Create a temporary database"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'similarity.npz')
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'tickets.db'))
+        self.context = self.app.app_context()
+        self.context.push()
+    
+    def tearDown(self):
+        """Remove the temporary database"""
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _add(self, processed_text, status=None):
+        """Store a ticket"""
+        ticket = Ticket(title='Title', description='Description', priority='Low', team='software',
+                        processed_text=processed_text)
+        if status:
+            ticket.status = status
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket
+    
+    def test_build_and_update(self):
+        """Test that new tickets are added and pending ones wait for their text"""
+        tickets = [self._add(text) for text in TEXTS[:4]]
+        index = build_similarity_index(self.classifier)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.settled_id, tickets[-1].id)
+        
+        pending = self._add(None, status=STATUS_PENDING)
+        later = self._add(TEXTS[4])
+        self.assertEqual(update_similarity_index(index, self.classifier), 1)
+        self.assertEqual(index.settled_id, pending.id - 1)
+        
+        # Once classified, the pending ticket is added and the rest is not added again
+        pending.processed_text, pending.status = TEXTS[5], 'classified'
+        db.session.commit()
+        self.assertEqual(update_similarity_index(index, self.classifier, batch_size=1), 1)
+        self.assertEqual(index.settled_id, later.id)
+        self.assertEqual(len(index), 6)
+    
+    def test_similar_tickets(self):
+        """Test that the most similar stored tickets are returned"""
+        tickets = [self._add(text) for text in TEXTS]
+        similarity = TicketSimilarity(self.path)
+        
+        results = similarity.similar(tickets[0], self.classifier, k=2)
+        self.assertEqual(results[0][0].id, tickets[1].id)
+        self.assertNotIn(tickets[0].id, [ticket.id for ticket, _ in results])
+        
+        # A ticket that is not indexed yet is compared through its text
+        pending = self._add(None, status=STATUS_PENDING)
+        results = similarity.similar(pending, self.classifier, k=1, text="printer jammed again")
+        self.assertEqual(results[0][0].id, tickets[2].id)
+        self.assertEqual(similarity.similar(pending, self.classifier), [])
+    
+    def test_saved_index_is_reused(self):
+        """Test that a new process loads the saved index and catches up"""
+        for text in TEXTS[:3]:
+            self._add(text)
+        TicketSimilarity(self.path).get(self.classifier)
+        self.assertTrue(os.path.exists(self.path))
+        self._add(TEXTS[3])
+        
+        with mock.patch('database.similarity.build_similarity_index') as build:
+            index = TicketSimilarity(self.path).get(self.classifier)
+        build.assert_not_called()
+        self.assertEqual(len(index), 4)
+        
+        # An index built by another model is rebuilt
+        other = TicketClassifier()
+        other.train(TEXTS, ["Low"] * 3 + ["High"] * 3)
+        index = TicketSimilarity(self.path).get(other)
+        self.assertEqual((index.model_version, len(index)), (other.version, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
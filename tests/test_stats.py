@@ -0,0 +1,145 @@
+"""
+Tests for the ticket statistics summary tables.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+from datetime import datetime
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+
+from tools.import_tickets import create_app
+from database.models import db, Ticket, TicketStat, TicketStatHourly
+from database.stats import install_stats_triggers, ticket_counts, hourly_counts, recent_hours
+
+class TestTicketStats(unittest.TestCase):
+    """Test cases for the trigger-maintained ticket counts"""
+    
+    def setUp(self):
+        """Create a temporary database"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.app = create_app('sqlite:///' + os.path.join(self.temp_dir, 'tickets.db'))
+        self.context = self.app.app_context()
+        self.context.push()
+        self.assertTrue(self.app.config['STATS_TRIGGERS'])
+    
+    def tearDown(self):
+        """Remove the temporary database"""
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        shutil.rmtree(self.temp_dir)
+    
+    def _add(self, priority, team, created_at=None):
+        """Insert a ticket through the ORM"""
+        ticket = Ticket(title='Title', description='Description', priority=priority, team=team)
+        ticket.created_at = created_at or datetime.utcnow()
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket
+    
+    def test_counts_follow_inserts_updates_and_deletes(self):
+        """Test that every change to a ticket is reflected in the counts"""
+        first = self._add('Pending', 'unassigned')
+        self._add('High', 'network')
+        self._add('High', 'network')
+        self.assertEqual(ticket_counts(True), ({'Pending': {'unassigned': 1}, 'High': {'network': 2}}, 3))
+        
+        # A background worker classifies the pending ticket
+        first.priority, first.team = 'Critical', 'security'
+        db.session.commit()
+        self.assertEqual(ticket_counts(True), ({'High': {'network': 2}, 'Critical': {'security': 1}}, 3))
+        
+        # Changes that do not touch priority or team leave the counts alone
+        first.title = 'Renamed'
+        db.session.commit()
+        self.assertEqual(db.session.get(TicketStat, ('Critical', 'security')).count, 1)
+        
+        db.session.delete(first)
+        db.session.commit()
+        self.assertEqual(ticket_counts(True), ({'High': {'network': 2}}, 2))
+    
+    def test_rollback_leaves_counts_unchanged(self):
+        """Test that counts are updated in the same transaction as the tickets"""
+        self._add('Low', 'hardware')
+        db.session.add(Ticket(title='Title', description='Description', priority='Low', team='hardware'))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(ticket_counts(True), ({'Low': {'hardware': 1}}, 1))
+    
+    def test_bulk_insert_is_counted(self):
+        """Test that Core inserts, which bypass the ORM, are counted"""
+        rows = [
+            {'title': 'Title', 'description': 'Description', 'priority': 'Medium', 'team': 'software',
+             'created_at': datetime(2030, 1, 1, 9, minute)}
+            for minute in range(5)
+        ]
+        db.session.execute(insert(Ticket), rows)
+        db.session.commit()
+        
+        self.assertEqual(ticket_counts(True), ({'Medium': {'software': 5}}, 5))
+        self.assertEqual(TicketStatHourly.query.one().count, 5)
+    
+    def test_hourly_counts(self):
+        """Test that tickets are bucketed by the hour they were created in"""
+        self._add('High', 'network', datetime(2030, 1, 1, 9, 5))
+        self._add('High', 'network', datetime(2030, 1, 1, 9, 55))
+        self._add('Low', 'hardware', datetime(2030, 1, 1, 11, 0))
+        self._add('Low', 'hardware', datetime(2030, 1, 1, 7, 30))
+        
+        since = recent_hours(3, now=datetime(2030, 1, 1, 11, 20))
+        expected = [
+            {'bucket': '2030-01-01 09:00:00', 'total': 2, 'counts': {'High': {'network': 2}}},
+            {'bucket': '2030-01-01 11:00:00', 'total': 1, 'counts': {'Low': {'hardware': 1}}}
+        ]
+        self.assertEqual(hourly_counts(True, since), expected)
+        
+        # Computing the counts from the tickets table gives the same result
+        self.assertEqual(hourly_counts(False, since), expected)
+        self.assertEqual(ticket_counts(False), ticket_counts(True))
+    
+    def test_counts_do_not_read_tickets(self):
+        """Test that reading the counts does not scan the tickets table"""
+        self._add('High', 'network')
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            ticket_counts(True)
+            hourly_counts(True, recent_hours(24))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        self.assertEqual(len(statements), 2)
+        self.assertFalse(any('FROM tickets' in statement for statement in statements))
+    
+    def test_install_fills_existing_tables(self):
+        """Test that creating the triggers for existing tickets fills the summary tables"""
+        self._add('High', 'network', datetime(2030, 1, 1, 9, 5))
+        self._add('Low', 'hardware', datetime(2030, 1, 1, 10, 5))
+        
+        with db.engine.begin() as conn:
+            for name in ('ticket_stats_insert', 'ticket_stats_update', 'ticket_stats_delete'):
+                conn.exec_driver_sql(f"DROP TRIGGER {name}")
+            conn.exec_driver_sql("DELETE FROM ticket_stats")
+            conn.exec_driver_sql("DELETE FROM ticket_stats_hourly")
+        
+        self.assertTrue(install_stats_triggers(db.engine))
+        self.assertEqual(ticket_counts(True), ({'High': {'network': 1}, 'Low': {'hardware': 1}}, 2))
+        self.assertEqual(TicketStatHourly.query.count(), 2)
+        
+        # Installing again does not count the tickets twice
+        self.assertTrue(install_stats_triggers(db.engine))
+        self.assertEqual(ticket_counts(True)[1], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
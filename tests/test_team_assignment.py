@@ -8,7 +8,20 @@ import unittest
 # Add the parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.team_assignment import get_team_assignment
+import re
+import json
+import tempfile
+
+from utils.team_assignment import (
+    TEAM_KEYWORDS,
+    KeywordMatcher,
+    get_team_assignment,
+    assign_team,
+    get_team_scores,
+    get_matcher,
+    set_team_keywords,
+    load_team_keywords
+)
 
 class TestTeamAssignment(unittest.TestCase):
     """Test cases for team assignment functionality"""
@@ -98,6 +111,109 @@ class TestTeamAssignment(unittest.TestCase):
         text = "My laptop keyboard isn't working properly and I can't type in any applications."
         team = get_team_assignment(text)
         self.assertEqual(team, "hardware")
+    
+    
+    def test_scores_match_per_keyword_counts(self):
+        """Test that the single-pass matcher counts like one regex per keyword"""
+        texts = [
+            "My hard drive is making noise and the hard drive light blinks",
+            "VPN connection drops, ip-address conflict on the wifi router",
+            "Password reset needed after phishing email, login blocked"
+        ]
+        
+        for text in texts:
+            with self.subTest(text=text):
+                expected = {
+                    team: sum(
+                        len(re.findall(r'\b' + re.escape(keyword) + r'\b', text.lower()))
+                        for keyword in keywords
+                    )
+                    for team, keywords in TEAM_KEYWORDS.items()
+                }
+                self.assertEqual(get_team_scores(text), expected)
+    
+    def test_multi_word_keywords(self):
+        """Test that multi-word keywords also count the keywords inside them"""
+        matcher = KeywordMatcher({'storage': ['hard drive', 'drive'], 'other': ['hard']})
+        
+        scores = matcher.score("The hard drive failed, then a hard disk drive")
+        
+        self.assertEqual(scores, {'storage': 3, 'other': 2})
+    
+    def test_partly_overlapping_keywords(self):
+        """Test that keywords sharing only part of a match are both counted"""
+        matcher = KeywordMatcher({'a': ['network outage'], 'b': ['outage report']})
+        
+        self.assertEqual(matcher.score("network outage report"), {'a': 1, 'b': 1})
+    
+    def test_custom_table_matches_separate_scans(self):
+        """Test that any keyword table scores like one re.findall per keyword"""
+        table = {
+            'a': ['network outage', 'outage', 'ip'],
+            'b': ['outage report', 'report', 'c++'],
+            'c': ['a a', 'ip address', 'Upper']
+        }
+        texts = [
+            "network outage report",
+            "outage report on the network outage reported",
+            "a a a a",
+            "c++ build; ip address ip-address",
+            "Upper case keyword never matches lowered text"
+        ]
+        matcher = KeywordMatcher(table)
+        
+        for text in texts:
+            with self.subTest(text=text):
+                expected = {
+                    team: sum(
+                        len(re.findall(r'\b' + re.escape(keyword) + r'\b', text.lower()))
+                        for keyword in keywords
+                    )
+                    for team, keywords in table.items()
+                }
+                self.assertEqual(matcher.score(text), expected)
+    
+    def test_custom_keyword_table(self):
+        """Test swapping in a custom keyword table at runtime"""
+        original = get_matcher()
+        try:
+            set_team_keywords({'facilities': ['chair', 'desk'], 'network': ['wifi']})
+            self.assertEqual(get_team_assignment("My desk chair is broken"), 'facilities')
+        finally:
+            set_team_keywords(original.team_keywords)
+        
+        self.assertEqual(get_team_assignment("Router is not working properly"), 'network')
+    
+    def test_load_keyword_table_from_file(self):
+        """Test loading a keyword table from a JSON file"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as temp:
+            json.dump({'facilities': ['chair'], 'network': ['wifi']}, temp)
+            temp_path = temp.name
+        
+        original = get_matcher()
+        try:
+            matcher = load_team_keywords(temp_path)
+            self.assertIs(get_matcher(), matcher)
+            self.assertEqual(get_team_assignment("Broken chair in room 4"), 'facilities')
+        finally:
+            set_team_keywords(original.team_keywords)
+            os.unlink(temp_path)
+    
+    def test_explicit_matcher(self):
+        """Test passing a matcher without changing the active table"""
+        matcher = KeywordMatcher({'facilities': ['chair'], 'network': ['wifi']})
+        
+        self.assertEqual(get_team_assignment("Wobbly chair", matcher=matcher), 'facilities')
+        self.assertEqual(get_team_assignment("Wobbly chair"), 'software')
+    
+    
+    def test_assign_team(self):
+        """Test that a confident model prediction wins over the keyword matcher"""
+        text = "Router is not working properly"
+        self.assertEqual(assign_team(text, 'security', 0.9), ('security', 'model'))
+        self.assertEqual(assign_team(text, 'security', 0.3), ('network', 'keywords'))
+        self.assertEqual(assign_team(text, 'security', 0.3, min_confidence=0.2), ('security', 'model'))
+        self.assertEqual(assign_team(text), ('network', 'keywords'))
 
 
 if __name__ == '__main__':
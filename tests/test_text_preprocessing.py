@@ -4,6 +4,9 @@ Unit tests for text preprocessing utilities.
 import sys
 import os
 import unittest
+import csv
+import subprocess
+from unittest import mock
 
 # Add the parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,7 +16,11 @@ from utils.text_preprocessing import (
     remove_stopwords,
     lemmatize_text,
     preprocess_text,
-    combine_title_description
+    combine_title_description,
+    ensure_nltk_resources,
+    install_nltk_resources,
+    missing_nltk_resources,
+    TextPreprocessor
 )
 
 class TestTextPreprocessing(unittest.TestCase):
@@ -33,7 +40,7 @@ class TestTextPreprocessing(unittest.TestCase):
         # Test with empty string
         cleaned = clean_text("")
         self.assertEqual(cleaned, "")
-        
+    
     def test_remove_stopwords(self):
         """Test the remove_stopwords function"""
         text = "this is a test for removing stopwords"
@@ -92,5 +99,125 @@ class TestTextPreprocessing(unittest.TestCase):
         self.assertIn("internet", result)
 
 
+
+class TestTextPreprocessor(unittest.TestCase):
+    """Test cases for the single-pass preprocessing engine"""
+    
+    def setUp(self):
+        """Load the sample tickets"""
+        dataset_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model', 'sample_tickets.csv'
+        )
+        with open(dataset_path, newline='', encoding='utf-8') as f:
+            self.tickets = list(csv.DictReader(f))
+        self.engine = TextPreprocessor()
+    
+    def test_matches_staged_pipeline(self):
+        """Test that the engine matches the step-by-step functions"""
+        for ticket in self.tickets:
+            text = ticket['Title'] + " " + ticket['Title'] + " " + ticket['Description']
+            with self.subTest(ticket=ticket['ID']):
+                expected = lemmatize_text(remove_stopwords(clean_text(text)))
+                self.assertEqual(self.engine.preprocess(text), expected)
+                self.assertEqual(
+                    self.engine.combine(ticket['Title'], ticket['Description']),
+                    combine_title_description(ticket['Title'], ticket['Description'])
+                )
+    
+    def test_edge_cases(self):
+        """Test the engine on empty and non-string input"""
+        self.assertEqual(self.engine.preprocess(""), "")
+        self.assertEqual(self.engine.preprocess(None), "")
+        self.assertEqual(self.engine.preprocess("123 !!! https://example.com"), "")
+    
+    def test_preprocess_many(self):
+        """Test batch preprocessing preserves order"""
+        texts = [ticket['Description'] for ticket in self.tickets[:5]]
+        self.assertEqual(self.engine.preprocess_many(texts), [self.engine.preprocess(t) for t in texts])
+    
+    def test_lemma_cache_is_bounded(self):
+        """Test that the lemma cache never grows past its maximum size"""
+        engine = TextPreprocessor(lemma_cache_size=8)
+        for ticket in self.tickets:
+            engine.preprocess(ticket['Description'])
+        
+        info = engine.cache_info()
+        self.assertLessEqual(info.currsize, 8)
+        self.assertGreater(info.hits + info.misses, 8)
+
+
+class TestNltkResources(unittest.TestCase):
+    """Test cases for NLTK data handling"""
+    
+    def setUp(self):
+        """Make every test probe the NLTK data afresh"""
+        install_nltk_resources.cache_clear()
+    
+    def tearDown(self):
+        """Forget results cached while NLTK was mocked"""
+        install_nltk_resources.cache_clear()
+    
+    def test_import_does_not_load_nltk(self):
+        """Test that importing the module neither imports NLTK nor downloads data"""
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', "import sys, utils.text_preprocessing; print('nltk' in sys.modules)"],
+            cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), 'False')
+    
+    def test_probes_correct_paths(self):
+        """Test that each resource is looked up where NLTK installs it"""
+        with mock.patch('nltk.data.find') as find:
+            self.assertEqual(missing_nltk_resources(), [])
+        
+        probed = [call.args[0] for call in find.call_args_list]
+        self.assertEqual(probed, ['tokenizers/punkt', 'corpora/stopwords', 'corpora/wordnet'])
+    
+    def test_downloads_only_missing_resources(self):
+        """Test that installed resources are never downloaded again"""
+        installed = {'tokenizers/punkt', 'corpora/stopwords'}
+        
+        def find(path):
+            if path not in installed:
+                raise LookupError(path)
+            return path
+        
+        def download(resource, quiet=False):
+            installed.add(f'corpora/{resource}')
+            return True
+        
+        with mock.patch('nltk.data.find', side_effect=find), \
+                mock.patch('nltk.download', side_effect=download) as nltk_download:
+            ensure_nltk_resources()
+            ensure_nltk_resources()
+        
+        nltk_download.assert_called_once_with('wordnet', quiet=True)
+    
+    def test_missing_resources_raise(self):
+        """Test that resources that cannot be downloaded are reported"""
+        with mock.patch('nltk.data.find', side_effect=LookupError), \
+                mock.patch('nltk.download', return_value=False):
+            with self.assertRaises(LookupError) as context:
+                ensure_nltk_resources()
+        
+        self.assertIn('punkt, stopwords, wordnet', str(context.exception))
+    
+    def test_failed_download_is_not_retried(self):
+        """Test that data that could not be downloaded is not downloaded again on every call"""
+        def find(path):
+            if path == 'corpora/wordnet':
+                raise LookupError(path)
+            return path
+        
+        with mock.patch('nltk.data.find', side_effect=find), \
+                mock.patch('nltk.download', return_value=False) as nltk_download:
+            for _ in range(3):
+                with self.assertRaisesRegex(LookupError, 'wordnet'):
+                    ensure_nltk_resources()
+        
+        nltk_download.assert_called_once_with('wordnet', quiet=True)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
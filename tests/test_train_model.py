@@ -0,0 +1,127 @@
+"""
+Tests for the model training script.
+"""
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import pandas as pd
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.train_model import (
+    DATASET_PATH,
+    preprocess_frame,
+    preprocess_parallel,
+    load_preprocessed_texts,
+    read_chunks,
+    train_model,
+    train_online
+)
+from model.classifier import load_classifier
+
+class TestTrainModel(unittest.TestCase):
+    """Test cases for the training pipeline"""
+    
+    def setUp(self):
+        """Create a temporary cache and output directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.df = pd.read_csv(DATASET_PATH)
+    
+    def tearDown(self):
+        """Remove the temporary directory"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_parallel_matches_serial(self):
+        """Test that parallel preprocessing keeps row order and output"""
+        self.assertEqual(preprocess_parallel(self.df, workers=2), preprocess_frame(self.df))
+    
+    def test_corpus_cache(self):
+        """Test that the second run loads the corpus from the cache"""
+        texts, cache_hit = load_preprocessed_texts(self.df, DATASET_PATH, cache_dir=self.cache_dir)
+        self.assertFalse(cache_hit)
+        
+        cached_texts, cache_hit = load_preprocessed_texts(self.df, DATASET_PATH, cache_dir=self.cache_dir)
+        self.assertTrue(cache_hit)
+        self.assertEqual(cached_texts, texts)
+    
+    def test_cache_keyed_by_dataset(self):
+        """Test that a changed dataset is not served from the cache"""
+        dataset_path = os.path.join(self.temp_dir, 'tickets.csv')
+        self.df.head(5).to_csv(dataset_path, index=False)
+        load_preprocessed_texts(self.df.head(5), dataset_path, cache_dir=self.cache_dir)
+        
+        self.df.head(6).to_csv(dataset_path, index=False)
+        _, cache_hit = load_preprocessed_texts(self.df.head(6), dataset_path, cache_dir=self.cache_dir)
+        self.assertFalse(cache_hit)
+    
+    def test_train_model_parallel(self):
+        """Test training end to end in parallel mode"""
+        model_path = os.path.join(self.temp_dir, 'model.pkl')
+        classifier = train_model(
+            model_path=model_path, parallel=True, workers=2, cache_dir=self.cache_dir, C=10.0
+        )
+        
+        self.assertTrue(os.path.exists(model_path))
+        self.assertIn(classifier.predict("website down customer cannot access"),
+                      ['Critical', 'High', 'Medium', 'Low'])
+    
+    def test_train_joint_model(self):
+        """Test training priorities and teams together, and the compact copy"""
+        model_path = os.path.join(self.temp_dir, 'model.pkl')
+        classifier = train_model(model_path=model_path, cache_dir=self.cache_dir, C=10.0, joint=True)
+        self.assertTrue(classifier.joint)
+        
+        # The compact model saved next to it predicts both outputs
+        compact = load_classifier(model_path, os.path.join(self.temp_dir, 'model.compact'))
+        self.assertIsNotNone(compact.compact_model)
+        texts = preprocess_frame(self.df)
+        teams = [team for _, team, _ in compact.classify_many(texts)]
+        self.assertEqual(teams, [team for _, team, _ in classifier.classify_many(texts)])
+        self.assertGreater(sum(p == t for p, t in zip(teams, self.df['Team'])) / len(texts), 0.8)
+    
+    def test_read_chunks_skips_unusable_rows(self):
+        """Test that chunks are bounded and rows without labels are dropped"""
+        dataset_path = os.path.join(self.temp_dir, 'tickets.csv')
+        df = self.df.head(10).copy()
+        df.loc[2, 'Priority'] = 'Someday'
+        df.loc[5, 'Description'] = None
+        df.to_csv(dataset_path, index=False)
+        
+        chunks = list(read_chunks(dataset_path, 4, ['Critical', 'High', 'Medium', 'Low']))
+        
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 2])
+        self.assertEqual(list(chunks[0].columns), ['Title', 'Description', 'Priority'])
+    
+    def test_train_online(self):
+        """Test streaming training with the hashing engine"""
+        model_path = os.path.join(self.temp_dir, 'model.pkl')
+        compact_path = os.path.join(self.temp_dir, 'model.compact')
+        os.makedirs(compact_path)
+        
+        classifier = train_online(model_path=model_path, chunk_size=7, epochs=3, n_features=2 ** 12)
+        
+        self.assertTrue(os.path.exists(model_path))
+        # A compact model left by an earlier tfidf model is removed
+        self.assertFalse(os.path.exists(compact_path))
+        
+        loaded = load_classifier(model_path, compact_path)
+        self.assertEqual(loaded.version, classifier.version)
+        texts = preprocess_frame(self.df)
+        self.assertEqual(loaded.predict_many(texts), classifier.predict_many(texts))
+        
+        # Three passes over the sample data are enough to fit most of it
+        accuracy = sum(p == t for p, t in zip(loaded.predict_many(texts), self.df['Priority'])) / len(texts)
+        self.assertGreater(accuracy, 0.8)
+    
+    def test_train_online_missing_dataset(self):
+        """Test that an unreadable dataset is reported, not raised"""
+        self.assertIsNone(train_online(dataset_path=os.path.join(self.temp_dir, 'missing.csv'),
+                                       model_path=os.path.join(self.temp_dir, 'model.pkl')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,4 @@
+"""
+Initialization file for the tools package.
+Makes the package importable.
+"""
@@ -0,0 +1,266 @@
+"""
+Background classification workers.
+
+Runs a pool of worker processes that classify tickets submitted in
+asynchronous mode (CLASSIFY_ASYNC=1). Each worker repeatedly claims a
+batch of queued jobs from the database, preprocesses the tickets,
+classifies the whole batch with one model call and stores the results.
+Failed jobs are retried with exponential backoff; jobs held by a worker
+that died are released after a lease timeout. SQLite works as the queue
+backend, so everything runs locally.
+
+Usage:
+    python -m tools.classify_worker [--processes N] [--batch-size N]
+"""
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import multiprocessing
+
+# Add parent directory to path to import from the project packages
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from utils.text_preprocessing import combine_title_description
+from utils.team_assignment import assign_team, load_team_keywords, DEFAULT_MIN_CONFIDENCE
+from model.registry import ModelRegistry
+from database.models import db
+from database.jobs import claim_jobs, complete_job, fail_job, release_expired_jobs, retry_failed_jobs
+from database.duplicates import index_ticket, find_duplicate
+from tools.import_tickets import create_app
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.pkl')
+COMPACT_MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.compact')
+
+def log_lost_claim(job):
+    """Report a result dropped because the job's lease expired before it was stored"""
+    logging.warning(f"Dropped the result of job {job.id}: its lease expired and it was released")
+
+def process_jobs(jobs, classifier, max_attempts=3, retry_delay=30.0, duplicate_threshold=None,
+                 team_min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """
+    Classify the tickets of a batch of claimed jobs and commit the results.
+    
+    A ticket that cannot be preprocessed fails only its own job; if the
+    model call fails, every job of the batch is failed and retried. A
+    near-duplicate of an earlier classified ticket takes over its
+    classification instead of being classified. Results of jobs whose
+    lease expired in the meantime are dropped.
+    
+    Nothing is written until the whole batch is classified; the results
+    are then stored in one short transaction.
+    
+    Args:
+        jobs (list): Claimed ClassificationJob objects
+        classifier (TicketClassifier): Classifier to use
+        max_attempts (int, optional): Attempts before a job is failed for good
+        retry_delay (float, optional): Seconds before the first retry
+        duplicate_threshold (float, optional): Lowest similarity counted as a
+                                               duplicate. None disables
+                                               duplicate detection.
+        team_min_confidence (float, optional): Lowest probability at which
+                                               a joint model's team is used
+                                               instead of the keyword matcher
+    
+    Returns:
+        tuple: (completed, failed) job counts
+    """
+    # Everything is worked out before the first write: on SQLite the first
+    # UPDATE takes the database write lock, which is then held until the
+    # commit, and submissions must not wait for the model call
+    errors = []    # (job, error)
+    results = []   # (job, processed_text, priority, team, model_version, parent)
+    pending = []   # (job, processed_text)
+    
+    for job in jobs:
+        try:
+            processed_text = combine_title_description(job.ticket.title, job.ticket.description)
+        except Exception as e:
+            logging.error(f"Error preprocessing ticket {job.ticket_id}: {e}")
+            errors.append((job, f"Preprocessing failed: {e}"))
+            continue
+        
+        match = find_duplicate(processed_text, duplicate_threshold) if duplicate_threshold is not None else None
+        if match is None:
+            pending.append((job, processed_text))
+            continue
+        
+        parent, _ = match
+        results.append((job, processed_text, parent.priority, parent.team, parent.model_version, parent))
+    
+    try:
+        predictions = classifier.classify_many([processed_text for _, processed_text in pending])
+    except Exception as e:
+        logging.error(f"Error classifying a batch of {len(pending)} tickets: {e}")
+        errors.extend((job, f"Classification failed: {e}") for job, _ in pending)
+    else:
+        for (job, processed_text), (priority, predicted_team, confidence) in zip(pending, predictions):
+            team, _ = assign_team(processed_text, predicted_team, confidence, team_min_confidence)
+            results.append((job, processed_text, priority, team, classifier.version, None))
+    
+    completed = 0
+    for job, error in errors:
+        fail_job(job, error, max_attempts, retry_delay)
+    for job, processed_text, priority, team, model_version, parent in results:
+        if not complete_job(job, priority, team, processed_text, model_version):
+            log_lost_claim(job)
+            continue
+        if parent is not None:
+            job.ticket.parent_id = parent.id
+        index_ticket(job.ticket)
+        completed += 1
+    
+    db.session.commit()
+    return completed, len(errors)
+
+def run_worker(database_url=None, batch_size=50, poll_interval=1.0, lease_seconds=300.0,
+               max_attempts=3, retry_delay=30.0, once=False, stop_event=None, classifier=None,
+               duplicate_threshold=None, team_min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """
+    Claim and process jobs until stopped.
+    
+    Args:
+        database_url (str, optional): Database URL. Defaults to the same
+                                      database the web app uses.
+        batch_size (int, optional): Jobs claimed and classified together
+        poll_interval (float, optional): Seconds to wait when the queue is empty
+        lease_seconds (float, optional): Seconds after which a claimed job
+                                         whose worker stopped is released
+        max_attempts (int, optional): Attempts before a job is failed for good
+        retry_delay (float, optional): Seconds before the first retry
+        once (bool, optional): Exit as soon as no job is due
+        stop_event (Event, optional): Set to stop the worker after its current batch
+        classifier (TicketClassifier, optional): Classifier to use. Defaults
+                                                 to the trained model, reloaded
+                                                 between batches when its files change.
+        duplicate_threshold (float, optional): Lowest similarity counted as
+                                               a duplicate. None disables
+                                               duplicate detection.
+        team_min_confidence (float, optional): Lowest probability at which
+                                               a joint model's team is used
+                                               instead of the keyword matcher
+    
+    Returns:
+        dict: Counts of completed and failed jobs
+    """
+    app = create_app(database_url)
+    registry = None if classifier else ModelRegistry(MODEL_PATH, COMPACT_MODEL_PATH)
+    if os.environ.get('TEAM_KEYWORDS_FILE'):
+        load_team_keywords(os.environ['TEAM_KEYWORDS_FILE'])
+    
+    totals = {'completed': 0, 'failed': 0}
+    last_release = 0.0
+    with app.app_context():
+        while not (stop_event and stop_event.is_set()):
+            # Look for abandoned jobs every so often, not on every poll
+            if time.monotonic() - last_release >= min(lease_seconds, 60):
+                released = release_expired_jobs(lease_seconds, max_attempts, retry_delay)
+                if released:
+                    logging.warning(f"Released {released} jobs whose worker stopped")
+                last_release = time.monotonic()
+            
+            # Every batch is classified by one model, picked up between batches
+            if registry:
+                try:
+                    registry.reload_if_changed()
+                except Exception as e:
+                    logging.error(f"Error reloading model: {e}")
+                classifier = registry.current
+            
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                if once:
+                    break
+                if stop_event:
+                    stop_event.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+                continue
+            
+            completed, failed = process_jobs(jobs, classifier, max_attempts, retry_delay, duplicate_threshold,
+                                             team_min_confidence)
+            totals['completed'] += completed
+            totals['failed'] += failed
+            logging.info(f"Worker {os.getpid()} classified {completed} tickets ({failed} failed)")
+        
+        db.session.remove()
+        db.engine.dispose()
+    
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run background ticket classification workers.')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=50, help='jobs claimed per batch (default: 50)')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help='seconds to wait when the queue is empty (default: 1)')
+    parser.add_argument('--lease', type=float, default=300.0,
+                        help='seconds before a job held by a stopped worker is released (default: 300)')
+    parser.add_argument('--max-attempts', type=int, default=3, help='attempts per job (default: 3)')
+    parser.add_argument('--retry-delay', type=float, default=30.0,
+                        help='seconds before the first retry, doubling each time (default: 30)')
+    parser.add_argument('--once', action='store_true', help='exit when no job is due instead of polling')
+    parser.add_argument('--retry-failed', action='store_true', help='queue failed jobs again before starting')
+    parser.add_argument('--duplicate-threshold', type=float, default=-1,
+                        help='similarity above which a ticket reuses the classification of an earlier one, '
+                             'e.g. 0.8 (default: off)')
+    parser.add_argument('--team-min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help='lowest probability at which a joint model\'s team is used instead of the '
+                             f'keyword matcher (default: {DEFAULT_MIN_CONFIDENCE})')
+    parser.add_argument('--database-url', help='database URL (default: DATABASE_URL or sqlite:///tickets.db)')
+    args = parser.parse_args(argv)
+    
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    
+    # Create the tables once, before workers start racing to do it
+    app = create_app(args.database_url)
+    with app.app_context():
+        if args.retry_failed:
+            logging.info(f"Queued {retry_failed_jobs()} failed jobs again")
+        db.engine.dispose()
+    
+    stop_event = multiprocessing.Event()
+    options = {
+        'database_url': args.database_url,
+        'batch_size': args.batch_size,
+        'poll_interval': args.poll_interval,
+        'lease_seconds': args.lease,
+        'max_attempts': args.max_attempts,
+        'retry_delay': args.retry_delay,
+        'once': args.once,
+        'stop_event': stop_event,
+        'duplicate_threshold': args.duplicate_threshold if args.duplicate_threshold >= 0 else None,
+        'team_min_confidence': args.team_min_confidence
+    }
+    workers = [
+        multiprocessing.Process(target=run_worker, kwargs=options, name=f'classify-worker-{i}')
+        for i in range(args.processes or os.cpu_count() or 1)
+    ]
+    
+    # Let every worker finish its current batch on Ctrl+C or SIGTERM. Set
+    # before starting the workers so they inherit the handler too.
+    def stop(signum, frame):
+        stop_event.set()
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return 0 if all(worker.exitcode == 0 for worker in workers) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
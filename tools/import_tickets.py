@@ -0,0 +1,313 @@
+"""
+Bulk import of historical tickets.
+
+Streams tickets from a CSV file (same columns as model/sample_tickets.csv)
+or a JSON Lines file (one object per line with ``title`` and
+``description`` or ``body``), preprocesses them in a process pool,
+classifies each batch with a single model call and writes it with one
+bulk insert. Progress is committed together with every batch, so an
+interrupted import resumes where it stopped. Memory use is bounded by the
+batch size, not the file size.
+
+Usage:
+    python -m tools.import_tickets tickets.csv [--batch-size N] [--workers N]
+"""
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path to import from the project packages
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from flask import Flask
+from sqlalchemy import insert
+
+from utils.text_preprocessing import combine_title_description
+from utils.team_assignment import assign_team
+from model.classifier import TicketClassifier
+from database.models import init_db, db, Ticket, ImportCheckpoint
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.pkl')
+
+def create_app(database_url=None):
+    """
+    Create a minimal Flask app bound to the ticket database.
+    
+    Args:
+        database_url (str, optional): Database URL. Defaults to the same
+                                      database the web app uses.
+    
+    Returns:
+        Flask: The application
+    """
+    app = Flask('app', root_path=PROJECT_ROOT, instance_path=os.path.join(PROJECT_ROOT, 'instance'))
+    init_db(app, database_url)
+    return app
+
+def detect_format(path):
+    """
+    Guess the input format from the file extension.
+    
+    Args:
+        path (str): Input file path
+    
+    Returns:
+        str: 'csv' or 'jsonl'
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of {path}; pass --format")
+
+def read_records(path, fmt):
+    """
+    Stream raw records from the input file, one at a time.
+    
+    Args:
+        path (str): Input file path
+        fmt (str): 'csv' or 'jsonl'
+    
+    Yields:
+        dict: One record per ticket (None for unparseable JSON lines)
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+            return
+        
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"Skipping invalid JSON on line {line_number}")
+                yield None
+
+def normalize_record(record):
+    """
+    Map a raw record onto ticket fields.
+    
+    Column names are matched case-insensitively; ``body`` is accepted as
+    the description.
+    
+    Args:
+        record (dict): Raw record
+    
+    Returns:
+        dict: title, description, priority, team and created_at, or None if
+              the record has no title or description
+    """
+    if not isinstance(record, dict):
+        return None
+    
+    fields = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    title = fields.get('title')
+    description = fields.get('description') or fields.get('body')
+    if not isinstance(title, str) or not isinstance(description, str) or not title or not description:
+        return None
+    
+    created_at = None
+    if fields.get('created_at'):
+        try:
+            created_at = datetime.fromisoformat(str(fields['created_at']))
+        except ValueError:
+            pass
+    
+    return {
+        'title': title[:255],
+        'description': description,
+        'priority': fields.get('priority') or None,
+        'team': (fields.get('team') or '').strip().lower() or None,
+        'created_at': created_at
+    }
+
+def preprocess_ticket(title_description):
+    """
+    Preprocess one ticket. Runs in a pool worker process.
+    
+    Args:
+        title_description (tuple): (title, description)
+    
+    Returns:
+        str: Combined and preprocessed text
+    """
+    return combine_title_description(*title_description)
+
+def batched(iterable, size):
+    """
+    Split an iterable into lists of at most ``size`` items.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def import_tickets(path, fmt=None, batch_size=1000, workers=None, reclassify=False,
+                   restart=False, classifier=None):
+    """
+    Import tickets from a file into the database.
+    
+    Must be called inside an application context.
+    
+    Args:
+        path (str): Input file path
+        fmt (str, optional): 'csv' or 'jsonl'. Detected from the extension if omitted.
+        batch_size (int, optional): Tickets preprocessed, classified and
+                                    committed together
+        workers (int, optional): Preprocessing processes. 0 preprocesses in
+                                 this process; None uses one per CPU.
+        reclassify (bool, optional): Classify every ticket, even those whose
+                                     priority and team are given in the input
+        restart (bool, optional): Ignore any saved progress for this file
+        classifier (TicketClassifier, optional): Classifier to use. Defaults
+                                                 to the trained model.
+    
+    Returns:
+        dict: Counts of rows read, imported and skipped, elapsed seconds and rows per second
+    """
+    fmt = fmt or detect_format(path)
+    source = os.path.abspath(path)
+    classifier = classifier or TicketClassifier(MODEL_PATH)
+    valid_priorities = set(classifier.priority_mapping.values())
+    
+    checkpoint = db.session.get(ImportCheckpoint, source)
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(source=source, rows_read=0, rows_imported=0)
+        db.session.add(checkpoint)
+    elif restart:
+        checkpoint.rows_read = checkpoint.rows_imported = 0
+    elif checkpoint.rows_read:
+        logging.info(f"Resuming {source} after {checkpoint.rows_read} rows")
+    
+    start_row = checkpoint.rows_read
+    rows_read = rows_imported = 0
+    started = time.perf_counter()
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    try:
+        records = itertools.islice(read_records(path, fmt), start_row, None)
+        
+        for batch in batched(records, batch_size):
+            tickets = [ticket for ticket in map(normalize_record, batch) if ticket]
+            
+            # Preprocess the batch across the pool
+            pairs = [(ticket['title'], ticket['description']) for ticket in tickets]
+            if pool:
+                chunksize = max(1, len(pairs) // (4 * workers))
+                processed_texts = list(pool.map(preprocess_ticket, pairs, chunksize=chunksize))
+            else:
+                processed_texts = [preprocess_ticket(pair) for pair in pairs]
+            
+            # Classify every ticket without a usable priority in one call
+            to_classify = [
+                i for i, ticket in enumerate(tickets)
+                if reclassify or ticket['priority'] not in valid_priorities
+            ]
+            predictions = dict(zip(to_classify, classifier.classify_many([processed_texts[i] for i in to_classify])))
+            for ticket in tickets:
+                ticket['model_version'] = None
+            for i, (priority, _, _) in predictions.items():
+                tickets[i]['priority'] = priority
+                tickets[i]['model_version'] = classifier.version
+            
+            now = datetime.utcnow()
+            rows = []
+            for i, (ticket, processed_text) in enumerate(zip(tickets, processed_texts)):
+                if reclassify or not ticket['team']:
+                    # A joint model's team when it is confident, else the keyword matcher
+                    _, predicted_team, confidence = predictions.get(i, (None, None, None))
+                    ticket['team'], _ = assign_team(processed_text, predicted_team, confidence)
+                ticket['processed_text'] = processed_text
+                ticket['created_at'] = ticket['created_at'] or now
+                rows.append(ticket)
+            
+            # One bulk insert and one commit per batch, together with progress
+            if rows:
+                db.session.execute(insert(Ticket), rows)
+            checkpoint.rows_read += len(batch)
+            checkpoint.rows_imported += len(rows)
+            db.session.commit()
+            
+            rows_read += len(batch)
+            rows_imported += len(rows)
+            elapsed = time.perf_counter() - started
+            logging.info(
+                f"Imported {start_row + rows_read} rows so far "
+                f"({rows_read / elapsed:.0f} rows/s, {rows_read - rows_imported} skipped)"
+            )
+    except BaseException:
+        # Never commit part of a batch; the checkpoint still points at its start
+        db.session.rollback()
+        raise
+    finally:
+        if pool:
+            pool.shutdown()
+    
+    # Keep the checkpoint row even if nothing new was read
+    db.session.commit()
+    
+    elapsed = time.perf_counter() - started
+    return {
+        'rows_read': rows_read,
+        'rows_imported': rows_imported,
+        'rows_skipped': rows_read - rows_imported,
+        'seconds': elapsed,
+        'rows_per_second': rows_read / elapsed if elapsed else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import historical tickets from CSV or JSON Lines.')
+    parser.add_argument('path', help='input file (.csv, .jsonl or .ndjson)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='input format (default: from extension)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='tickets per batch (default: 1000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='preprocessing processes (default: one per CPU, 0 to disable the pool)')
+    parser.add_argument('--reclassify', action='store_true',
+                        help='classify all tickets, ignoring priority and team in the input')
+    parser.add_argument('--restart', action='store_true', help='ignore saved progress and start from the first row')
+    parser.add_argument('--database-url', help='database URL (default: DATABASE_URL or sqlite:///tickets.db)')
+    args = parser.parse_args(argv)
+    
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    
+    app = create_app(args.database_url)
+    with app.app_context():
+        summary = import_tickets(
+            args.path,
+            fmt=args.format,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            reclassify=args.reclassify,
+            restart=args.restart
+        )
+    
+    logging.info(
+        f"Done: {summary['rows_imported']} imported, {summary['rows_skipped']} skipped "
+        f"in {summary['seconds']:.1f}s ({summary['rows_per_second']:.0f} rows/s)"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
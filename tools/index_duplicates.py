@@ -0,0 +1,47 @@
+"""
+Build the near-duplicate index from the tickets table.
+
+Submitted tickets are indexed as they are stored. Tickets written another
+way, such as by tools.import_tickets or by a version without duplicate
+detection, are indexed by running this tool. With --rebuild the whole
+index is dropped and built again, which is needed after changing the
+MinHash parameters in database.duplicates.
+
+Usage:
+    python -m tools.index_duplicates [--rebuild] [--batch-size N]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add parent directory to path to import from the project packages
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from database.duplicates import index_tickets
+from tools.import_tickets import create_app
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index tickets for near-duplicate detection.')
+    parser.add_argument('--rebuild', action='store_true', help='drop the index and index every ticket again')
+    parser.add_argument('--batch-size', type=int, default=1000, help='tickets indexed per transaction (default: 1000)')
+    parser.add_argument('--database-url', default=None, help='database URL (default: DATABASE_URL or the app database)')
+    args = parser.parse_args(argv)
+    
+    app = create_app(args.database_url)
+    with app.app_context():
+        started = time.perf_counter()
+        indexed = index_tickets(rebuild=args.rebuild, batch_size=args.batch_size)
+        logging.info(f"Indexed {indexed} tickets in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Incremental retraining from agent priority corrections.
+
+Loads the corrections agents made since the last run (recorded by
+PATCH /api/tickets/<id>), updates the current model with them and saves it
+as a new version. Running web servers and classification workers with
+a model watcher pick it up without a restart. Hashing models are updated
+with partial_fit; TF-IDF models take a few gradient steps from their
+current weights. Only new corrections are read, so a run takes time
+proportional to the corrections since the previous run, not to the full
+history. The last correction learned is checkpointed in the database per
+model file.
+
+Usage:
+    python -m tools.retrain_corrections [--interval SECONDS] [--min-corrections N]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add parent directory to path to import from the project packages
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from sqlalchemy.orm import joinedload
+
+from utils.text_preprocessing import combine_title_description
+from model.classifier import TicketClassifier
+from model.train_model import compact_path_for
+from database.models import db, PriorityCorrection, TrainingCheckpoint
+from tools.import_tickets import create_app
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'ticket_classifier.pkl')
+
+def corrections_since(last_id):
+    """
+    Get the corrections made after a given correction.
+    
+    Args:
+        last_id (int): Id of the last correction already learned
+    
+    Returns:
+        list: Newest correction of each corrected ticket, oldest first
+    """
+    corrections = (
+        PriorityCorrection.query
+        .options(joinedload(PriorityCorrection.ticket))
+        .filter(PriorityCorrection.id > last_id)
+        .order_by(PriorityCorrection.id)
+        .all()
+    )
+    
+    # A ticket corrected twice is learned with its final priority only
+    latest = {correction.ticket_id: correction for correction in corrections}
+    return sorted(latest.values(), key=lambda correction: correction.id)
+
+def retrain(model_path=MODEL_PATH, min_corrections=1, epochs=3, learning_rate=0.5):
+    """
+    Update the model with the corrections made since the last run.
+    
+    Must be called inside an app context.
+    
+    Args:
+        model_path (str, optional): Pickled model to update in place
+        min_corrections (int, optional): Corrected tickets needed before the
+                                         model is updated
+        epochs (int, optional): Passes over the new corrections
+        learning_rate (float, optional): Step size for TF-IDF models
+    
+    Returns:
+        TicketClassifier: The updated classifier, or None if there were too
+                          few new corrections
+    """
+    started = time.perf_counter()
+    key = os.path.abspath(model_path)
+    checkpoint = db.session.get(TrainingCheckpoint, key) or TrainingCheckpoint(model_path=key, last_correction_id=0)
+    
+    corrections = corrections_since(checkpoint.last_correction_id)
+    if not corrections or len(corrections) < min_corrections:
+        logging.info(f"{len(corrections)} new corrected tickets; waiting for {min_corrections}")
+        return None
+    
+    classifier = TicketClassifier(model_path)
+    previous = classifier.version
+    texts = [combine_title_description(c.ticket.title, c.ticket.description) for c in corrections]
+    classifier.update(texts, [c.new_priority for c in corrections], epochs=epochs, learning_rate=learning_rate)
+    
+    # Publish the new version; model watchers swap it in once both files are written
+    classifier.save_model(model_path)
+    try:
+        classifier.save_compact(compact_path_for(model_path))
+    except ValueError:
+        # Hashing models have no compact form
+        pass
+    
+    checkpoint.last_correction_id = corrections[-1].id
+    checkpoint.model_version = classifier.version
+    db.session.add(checkpoint)
+    db.session.commit()
+    
+    logging.info(
+        f"Learned {len(corrections)} corrected tickets in {time.perf_counter() - started:.2f}s: "
+        f"model {previous} -> {classifier.version}"
+    )
+    return classifier
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Update the model with agent priority corrections.')
+    parser.add_argument('--model', default=MODEL_PATH, help='pickled model to update (default: ticket_classifier.pkl)')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='run every N seconds; 0 runs once (default: 0)')
+    parser.add_argument('--min-corrections', type=int, default=1,
+                        help='corrected tickets needed before updating the model (default: 1)')
+    parser.add_argument('--epochs', type=int, default=3, help='passes over the new corrections (default: 3)')
+    parser.add_argument('--learning-rate', type=float, default=0.5,
+                        help='step size for TF-IDF models (default: 0.5)')
+    parser.add_argument('--database-url', default=None, help='database URL (default: DATABASE_URL or the app database)')
+    args = parser.parse_args(argv)
+    
+    app = create_app(args.database_url)
+    with app.app_context():
+        while True:
+            try:
+                retrain(args.model, args.min_corrections, args.epochs, args.learning_rate)
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Error retraining from corrections: {e}")
+                if not args.interval:
+                    return 1
+            
+            if not args.interval:
+                return 0
+            db.session.remove()
+            time.sleep(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+Prometheus metrics for the Smart IT Ticket Prioritizer.
+
+Counters, gauges and histograms are kept in memory and rendered in the
+Prometheus text format. Recording a value takes one lock and a dict update,
+so timers can wrap every stage of every request.
+
+Gunicorn runs several worker processes, each with its own values. When the
+registry has a directory, every process writes its values to
+``metrics-<pid>.json`` there about once a second, and rendering merges the
+files of all processes. The worker that answers a scrape therefore reports
+totals for the whole server. Counters and histograms of workers that have
+exited are kept, so totals never go down; gauges only count live processes.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from half a millisecond to ten seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+def _pid_alive(pid):
+    """
+    Check whether a process is still running.
+    """
+    if sys.platform == 'win32':
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def clear_directory(directory):
+    """
+    Remove the metrics files of previous runs from a shared directory.
+    
+    Args:
+        directory (str): Directory given to MetricsRegistry
+    """
+    if not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics-'):
+            os.remove(os.path.join(directory, filename))
+
+class Metric:
+    """
+    Base class for a named metric with optional labels.
+    """
+    
+    type = None
+    
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+    
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def clear(self):
+        """
+        Remove every labelled value.
+        """
+        with self.registry.lock:
+            self._values.clear()
+            self.registry.dirty = True
+    
+    def snapshot(self):
+        # Caller holds the registry lock
+        return {json.dumps(key): value for key, value in self._values.items()}
+    
+    def merge(self, total, value):
+        return total + value
+    
+    def samples(self, key, value):
+        yield self.name, _format_labels(self.labelnames, key), value
+
+class Counter(Metric):
+    """
+    Value that only goes up, such as a number of requests.
+    """
+    
+    type = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+        
+        Args:
+            amount (float, optional): Amount to add
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self.registry.dirty = True
+
+class Gauge(Metric):
+    """
+    Value that can go up and down. Values of all live processes are added up.
+    """
+    
+    type = 'gauge'
+    
+    def set(self, value, **labels):
+        """
+        Set the gauge.
+        
+        Args:
+            value (float): New value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = value
+            self.registry.dirty = True
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, such as latencies, in fixed buckets.
+    """
+    
+    type = 'histogram'
+    
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        """
+        Record one observation.
+        
+        Args:
+            value (float): Observed value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.registry.lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+            self.registry.dirty = True
+    
+    def time(self, **labels):
+        """
+        Time a block of code.
+        
+        Args:
+            **labels: Label values
+        
+        Returns:
+            Timer: Context manager observing the block's duration in seconds
+        """
+        return Timer(self, labels)
+    
+    def snapshot(self):
+        # Copy the mutable bucket lists
+        return {json.dumps(key): list(value) for key, value in self._values.items()}
+    
+    def merge(self, total, value):
+        return [a + b for a, b in zip(total, value)]
+    
+    def samples(self, key, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), value[:-1]):
+            cumulative += count
+            yield self.name + '_bucket', _format_labels(self.labelnames, key, ('le', _format_value(bound))), cumulative
+        yield self.name + '_sum', _format_labels(self.labelnames, key), value[-1]
+        yield self.name + '_count', _format_labels(self.labelnames, key), cumulative
+
+class Timer:
+    """
+    Context manager that observes the duration of a block in a histogram.
+    """
+    
+    __slots__ = ('histogram', 'labels', 'started')
+    
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together, shared by the processes of one server.
+    """
+    
+    def __init__(self, directory=None, flush_interval=1.0):
+        """
+        Initialize the registry.
+        
+        Args:
+            directory (str, optional): Directory shared by all worker processes.
+                                       Without one, only this process is reported.
+            flush_interval (float, optional): Seconds between writes of this
+                                              process's values to the directory
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics = []
+        self.lock = threading.Lock()
+        self.dirty = False
+        
+        self._collectors = []
+        self._flusher = None
+        self._flusher_pid = None
+        
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker starts counting from zero
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    def _register(self, metric):
+        if any(existing.name == metric.name for existing in self.metrics):
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics.append(metric)
+        return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Create a counter in this registry.
+        """
+        return self._register(Counter(self, name, documentation, labelnames))
+    
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        Create a gauge in this registry.
+        """
+        return self._register(Gauge(self, name, documentation, labelnames))
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Create a histogram in this registry.
+        """
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+    
+    def add_collector(self, collector):
+        """
+        Register a function that updates gauges before values are read.
+        
+        Args:
+            collector (callable): Called without arguments before every
+                                  render and flush
+        """
+        self._collectors.append(collector)
+    
+    def _after_fork(self):
+        self.lock = threading.Lock()
+        for metric in self.metrics:
+            metric._values.clear()
+        self.dirty = False
+        self._flusher = None
+    
+    def _collect(self, flushing=False):
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logging.error(f"Error collecting metrics: {e}")
+        
+        with self.lock:
+            if flushing:
+                self.dirty = False
+            return {metric.name: metric.snapshot() for metric in self.metrics}
+    
+    def _path(self, pid):
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+    
+    def flush(self):
+        """
+        Write this process's values to the shared directory if they changed.
+        """
+        if not self.directory or not self.dirty:
+            return
+        
+        path = self._path(os.getpid())
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._collect(flushing=True), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.error(f"Error writing metrics: {e}")
+    
+    def close(self):
+        """
+        Write this process's final values and stop writing them at exit.
+        """
+        self.flush()
+        atexit.unregister(self.flush)
+    
+    def start_flusher(self):
+        """
+        Flush this process's values every flush_interval seconds in a
+        background thread. Does nothing without a directory or if the
+        thread is already running in this process.
+        """
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                self.flush()
+        
+        self._flusher_pid = os.getpid()
+        self._flusher = threading.Thread(target=run, name='metrics-flusher', daemon=True)
+        self._flusher.start()
+    
+    def _read_processes(self):
+        """
+        Read the values written by other processes.
+        
+        Returns:
+            list: (values, alive) for every other process
+        """
+        processes = []
+        own_file = f"metrics-{os.getpid()}.json"
+        for filename in os.listdir(self.directory):
+            if not filename.startswith('metrics-') or not filename.endswith('.json') or filename == own_file:
+                continue
+            try:
+                pid = int(filename[len('metrics-'):-len('.json')])
+                with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                    processes.append((json.load(f), _pid_alive(pid)))
+            except (ValueError, OSError) as e:
+                logging.warning(f"Skipping metrics file {filename}: {e}")
+        return processes
+    
+    def render(self):
+        """
+        Render the metrics in the Prometheus text format.
+        
+        Returns:
+            str: Exposition text with the totals of every process
+        """
+        processes = [(self._collect(), True)]
+        if self.directory:
+            processes.extend(self._read_processes())
+        
+        lines = []
+        for metric in self.metrics:
+            totals = {}
+            for values, alive in processes:
+                if metric.type == 'gauge' and not alive:
+                    continue
+                for key, value in values.get(metric.name, {}).items():
+                    totals[key] = metric.merge(totals[key], value) if key in totals else value
+            
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for key in sorted(totals):
+                for name, labels, value in metric.samples(json.loads(key), totals[key]):
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,157 @@
+"""
+MinHash signatures and LSH banding for near-duplicate detection.
+
+A ticket's preprocessed text is broken into overlapping character
+shingles. Its MinHash signature keeps, for each of ``num_perm`` random
+hash functions, the smallest hash of any shingle. Two signatures agree at
+any position with a probability equal to the Jaccard similarity of the
+shingle sets. The signature is cut into ``bands`` bands, and each band is
+hashed to one bucket key. Tickets that share a bucket in any band are
+candidate duplicates: with 16 bands of 8 rows, a pair with similarity 0.8
+shares a bucket with probability 0.95, and a pair with similarity 0.4
+with probability 0.01. Candidates are then checked with their exact
+similarity.
+"""
+import re
+import zlib
+import hashlib
+import numpy as np
+
+# Mersenne prime 2**61 - 1, larger than any 32-bit shingle hash
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+WHITESPACE = re.compile(r'\s+')
+
+def shingles(text, size=5):
+    """
+    Break text into its set of overlapping character shingles.
+    
+    Args:
+        text (str): Preprocessed ticket text
+        size (int, optional): Characters per shingle
+    
+    Returns:
+        set: Shingles; the whole text if it is shorter than one shingle,
+             and empty for empty text
+    """
+    text = WHITESPACE.sub(' ', text or '').strip()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def jaccard(a, b):
+    """
+    Jaccard similarity of two sets.
+    
+    Args:
+        a (set): First set
+        b (set): Second set
+    
+    Returns:
+        float: Size of the intersection over size of the union, 0.0 if
+               both are empty
+    """
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """
+    Computes MinHash signatures and their LSH bucket keys.
+    
+    Signatures are only comparable between hashers created with the same
+    parameters, so bucket keys stored in the database stay valid as long as
+    the parameters do not change.
+    """
+    
+    def __init__(self, num_perm=128, bands=16, shingle_size=5, seed=1):
+        """
+        Initialize the MinHasher.
+        
+        Args:
+            num_perm (int, optional): Hash functions per signature
+            bands (int, optional): Bands the signature is cut into. Must
+                                   divide num_perm.
+            shingle_size (int, optional): Characters per shingle
+            seed (int, optional): Seed of the hash functions
+        
+        Raises:
+            ValueError: If bands does not divide num_perm
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        # Hash functions (a * x + b) mod p. With 32-bit a, b and x the
+        # product fits in 64 bits.
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    
+    def shingles(self, text):
+        """
+        Break text into shingles of this hasher's size.
+        
+        Args:
+            text (str): Preprocessed ticket text
+        
+        Returns:
+            set: Shingles of the text
+        """
+        return shingles(text, self.shingle_size)
+    
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+        
+        Args:
+            text (str): Preprocessed ticket text
+        
+        Returns:
+            numpy.ndarray: num_perm uint64 values, or None for empty text
+        """
+        items = self.shingles(text)
+        if not items:
+            return None
+        
+        hashes = np.fromiter(
+            (zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64, count=len(items)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+    
+    def bucket_keys(self, signature):
+        """
+        Hash each band of a signature to a bucket key.
+        
+        Args:
+            signature (numpy.ndarray): MinHash signature
+        
+        Returns:
+            list: (band, key) pairs, one per band, with keys as signed
+                  64-bit integers so they fit a BIGINT column
+        """
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, 'little', signed=True)))
+        return keys
+    
+    def text_keys(self, text):
+        """
+        Compute the bucket keys of a text.
+        
+        Args:
+            text (str): Preprocessed ticket text
+        
+        Returns:
+            list: (band, key) pairs, empty for empty text
+        """
+        signature = self.signature(text)
+        return [] if signature is None else self.bucket_keys(signature)
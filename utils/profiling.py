@@ -0,0 +1,127 @@
+"""
+Request profiling for the Smart IT Ticket Prioritizer.
+
+Supports the opt-in profiling mode of the web app. A sampled fraction of
+requests runs under cProfile, and their stats are written to a directory
+for snakeviz, flameprof or ``python -m pstats``. The duration of each
+processing stage can also be reported to the client in a Server-Timing
+header. With profiling and Server-Timing switched off, none of this runs.
+"""
+import os
+import time
+import random
+import cProfile
+import logging
+import itertools
+
+class StageTimer:
+    """
+    Times one processing stage into the stage latency histogram and,
+    when given, into a dict of the request's stage durations.
+    """
+    
+    __slots__ = ('histogram', 'stage', 'timings', 'started')
+    
+    def __init__(self, histogram, stage, timings=None):
+        self.histogram = histogram
+        self.stage = stage
+        self.timings = timings
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        self.histogram.observe(elapsed, stage=self.stage)
+        if self.timings is not None:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + elapsed
+        return False
+
+def format_server_timing(timings, total=None, profile=None):
+    """
+    Build a Server-Timing header value.
+    
+    Args:
+        timings (dict): Seconds spent in each stage
+        total (float, optional): Seconds spent on the whole request
+        profile (str, optional): Name of the profile written for the request
+    
+    Returns:
+        str: Header value, e.g. ``preprocess;dur=1.204, predict;dur=0.311``
+    """
+    metrics = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()]
+    if total is not None:
+        metrics.append(f"total;dur={total * 1000:.3f}")
+    if profile:
+        metrics.append(f'profile;desc="{profile}"')
+    return ', '.join(metrics)
+
+class RequestProfiler:
+    """
+    Profiles a random sample of requests with cProfile.
+    """
+    
+    def __init__(self, directory, sample_rate, max_files=1000, rng=random.random):
+        """
+        Initialize the RequestProfiler.
+        
+        Args:
+            directory (str): Directory the profiles are written to
+            sample_rate (float): Fraction of requests to profile, from 0 to 1
+            max_files (int, optional): Stop profiling once the directory holds
+                                       this many profiles
+            rng (callable, optional): Source of random numbers in [0, 1)
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.rng = rng
+        self._counter = itertools.count(1)
+    
+    def start(self):
+        """
+        Decide whether to profile the current request and start if so.
+        
+        Returns:
+            cProfile.Profile: Running profiler, or None if the request is not sampled
+        """
+        if self.rng() >= self.sample_rate:
+            return None
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if len(os.listdir(self.directory)) >= self.max_files:
+                logging.warning(f"Profile directory {self.directory} is full; not profiling")
+                return None
+        except OSError as e:
+            logging.error(f"Cannot use profile directory {self.directory}: {e}")
+            return None
+        
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this process (one at a time on Python 3.12+)
+            return None
+        return profile
+    
+    def stop(self, profile, name):
+        """
+        Stop a profiler and write its stats.
+        
+        Args:
+            profile (cProfile.Profile): Profiler returned by start()
+            name (str): Label for the file name, such as the endpoint
+        
+        Returns:
+            str: File name of the written profile, or None if it could not be written
+        """
+        profile.disable()
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{os.getpid()}-{next(self._counter)}.prof"
+        try:
+            profile.dump_stats(os.path.join(self.directory, filename))
+        except OSError as e:
+            logging.error(f"Error writing profile {filename}: {e}")
+            return None
+        return filename
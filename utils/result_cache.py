@@ -0,0 +1,138 @@
+"""
+Classification result cache for the Smart IT Ticket Prioritizer.
+
+This module provides a bounded LRU cache with optional TTL for storing
+classification results keyed by a hash of the preprocessed ticket text.
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+class ResultCache:
+    """
+    Bounded LRU cache for classification results.
+    
+    Every entry belongs to a version (e.g. the model version). Reading or
+    writing with a different version clears the cache first, so results
+    computed by an old model never outlive a model reload.
+    """
+    
+    def __init__(self, maxsize=10000, ttl=None, clock=time.monotonic):
+        """
+        Initialize the ResultCache.
+        
+        Args:
+            maxsize (int, optional): Maximum number of entries. 0 disables caching.
+            ttl (float, optional): Seconds an entry stays valid. None means no expiry.
+            clock (callable, optional): Monotonic time source, in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(text):
+        """
+        Build a cache key from preprocessed text.
+        
+        Args:
+            text (str): Preprocessed ticket text
+        
+        Returns:
+            str: Hex digest identifying the text
+        """
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+    
+    def get(self, key, version=None):
+        """
+        Look up a cached value.
+        
+        Args:
+            key (str): Cache key
+            version (str, optional): Version the caller is working with
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            self._check_version(version)
+            
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or self.clock() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # Expired
+                del self._entries[key]
+            
+            self.misses += 1
+            return None
+    
+    def set(self, key, value, version=None):
+        """
+        Store a value, evicting the least recently used entry if full.
+        
+        Args:
+            key (str): Cache key
+            value: Value to store
+            version (str, optional): Version the value was computed with
+        """
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._check_version(version)
+            
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """
+        Remove all entries. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: Hit/miss/eviction counters, hit rate, size and configuration
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'version': self.version
+            }
@@ -5,7 +5,8 @@ This module provides functions for assigning tickets to relevant teams
 based on the ticket content.
 """
 import re
-from collections import Counter
+import json
+import hashlib
 
 # Define team keywords
 TEAM_KEYWORDS = {
@@ -30,26 +31,177 @@ TEAM_KEYWORDS = {
     ]
 }
 
-def get_team_assignment(text):
+# Lowest probability at which a joint model's predicted team is used
+# instead of the keyword matcher
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+
+class KeywordMatcher:
+    """
+    Keyword matcher compiled once from a team keyword table.
+    
+    All keywords are combined into a single alternation pattern, so scoring a
+    ticket scans the text once instead of once per keyword. The pattern is a
+    zero-width lookahead, so it is tried at every position of the text and
+    keywords that overlap (e.g. "drive" inside "hard drive", or "network
+    outage" and "outage report") are all found. At each position it finds
+    the longest keyword; the shorter keywords that start there are counted
+    with it. Like separate re.findall calls, matches of one keyword never
+    overlap each other, so the scores are the same as counting every
+    keyword separately.
+    """
+    
+    def __init__(self, team_keywords):
+        """
+        Compile a matcher for a keyword table.
+        
+        Args:
+            team_keywords (dict): Mapping of team name to a list of keywords
+        """
+        self.team_keywords = {team: list(keywords) for team, keywords in team_keywords.items()}
+        self.teams = list(self.team_keywords)
+        
+        # Content hash of the table, so results can be tied to the table used
+        self.version = hashlib.sha1(
+            json.dumps(self.team_keywords, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        
+        # Map each keyword to the teams it scores for (a keyword may appear
+        # more than once, and every listing counts as in the original table)
+        keyword_teams = {}
+        for team, keywords in self.team_keywords.items():
+            for keyword in keywords:
+                keyword_teams.setdefault(keyword, []).append(team)
+        
+        if not keyword_teams:
+            raise ValueError("Team keyword table is empty")
+        
+        keywords = sorted(keyword_teams, key=len, reverse=True)
+        self.pattern = re.compile(
+            r'(?=\b(' + '|'.join(re.escape(keyword) for keyword in keywords) + r')\b)'
+        )
+        
+        # The keywords that match wherever each keyword does: itself, and the
+        # shorter keywords it starts with that end on a word boundary
+        self._prefixes = {
+            keyword: [
+                (other, keyword_teams[other]) for other in keywords
+                if other == keyword or (len(other) < len(keyword) and re.match(re.escape(other) + r'\b', keyword))
+            ]
+            for keyword in keywords
+        }
+    
+    def score(self, text):
+        """
+        Count keyword matches per team in a single pass over the text.
+        
+        Args:
+            text (str): The text to score
+            
+        Returns:
+            dict: Mapping of team name to keyword match count
+        """
+        team_scores = dict.fromkeys(self.teams, 0)
+        
+        # Where the last counted match of each keyword ended
+        ends = {}
+        for match in self.pattern.finditer(text.lower()):
+            start = match.start()
+            for keyword, teams in self._prefixes[match.group(1)]:
+                if start >= ends.get(keyword, 0):
+                    ends[keyword] = start + len(keyword)
+                    for team in teams:
+                        team_scores[team] += 1
+        return team_scores
+
+
+# Matcher compiled from the active keyword table. Replaced as a whole when the
+# table is reloaded, so requests never see a half-updated matcher.
+_matcher = KeywordMatcher(TEAM_KEYWORDS)
+
+
+def get_matcher():
+    """
+    Get the keyword matcher for the active keyword table.
+    
+    Returns:
+        KeywordMatcher: The active matcher
+    """
+    return _matcher
+
+
+def set_team_keywords(team_keywords):
+    """
+    Replace the active keyword table.
+    
+    The new table is compiled once here; subsequent calls to
+    get_team_assignment use it without any per-request compilation.
+    
+    Args:
+        team_keywords (dict): Mapping of team name to a list of keywords
+        
+    Returns:
+        KeywordMatcher: The newly active matcher
+    """
+    global _matcher
+    matcher = KeywordMatcher(team_keywords)
+    _matcher = matcher
+    return matcher
+
+
+def load_team_keywords(path):
+    """
+    Load a keyword table from a JSON file and make it active.
+    
+    The file must contain an object mapping team names to keyword lists,
+    in the same shape as TEAM_KEYWORDS.
+    
+    Args:
+        path (str): Path to the JSON keyword table
+        
+    Returns:
+        KeywordMatcher: The newly active matcher
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        team_keywords = json.load(f)
+    
+    if not isinstance(team_keywords, dict) or not all(
+        isinstance(keywords, list) for keywords in team_keywords.values()
+    ):
+        raise ValueError(f"Invalid team keyword table in {path}")
+    
+    return set_team_keywords(team_keywords)
+
+
+def get_team_scores(text, matcher=None):
+    """
+    Count keyword matches per team.
+    
+    Args:
+        text (str): The preprocessed text of the ticket
+        matcher (KeywordMatcher, optional): Matcher to use instead of the
+                                            active one
+        
+    Returns:
+        dict: Mapping of team name to keyword match count
+    """
+    return (matcher or _matcher).score(text)
+
+
+def get_team_assignment(text, matcher=None):
     """
     Assign a ticket to a team based on keyword matching.
     
     Args:
         text (str): The preprocessed text of the ticket
+        matcher (KeywordMatcher, optional): Matcher to use instead of the
+                                            active one
         
     Returns:
         str: Team assignment (network, hardware, software, or security)
     """
-    text = text.lower()
-    
     # Count occurrences of keywords for each team
-    team_scores = {}
-    for team, keywords in TEAM_KEYWORDS.items():
-        score = 0
-        for keyword in keywords:
-            # Add score based on keyword matches
-            score += len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-        team_scores[team] = score
+    team_scores = get_team_scores(text, matcher)
     
     # Find team with highest score
     max_score = max(team_scores.values())
@@ -59,4 +211,28 @@ def get_team_assignment(text):
         return 'software'
     
     # Return the team with the highest score
-    return max(team_scores, key=team_scores.get)
\ No newline at end of file
+    return max(team_scores, key=team_scores.get)
+
+
+def assign_team(text, predicted_team=None, confidence=None, min_confidence=DEFAULT_MIN_CONFIDENCE, matcher=None):
+    """
+    Pick the team of a ticket, preferring the team predicted by a joint model.
+    
+    The keyword matcher decides when there is no prediction, or when the
+    model gave its team a probability below min_confidence.
+    
+    Args:
+        text (str): The preprocessed text of the ticket
+        predicted_team (str, optional): Team predicted by the model
+        confidence (float, optional): Probability the model gave that team
+        min_confidence (float, optional): Lowest probability at which the
+                                          predicted team is used
+        matcher (KeywordMatcher, optional): Matcher to use instead of the
+                                            active one
+        
+    Returns:
+        tuple: (team, source), where source is 'model' or 'keywords'
+    """
+    if predicted_team is not None and confidence >= min_confidence:
+        return predicted_team, 'model'
+    return get_team_assignment(text, matcher), 'keywords'
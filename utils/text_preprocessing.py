@@ -6,25 +6,137 @@ before feeding it to machine learning models.
 """
 import re
 import string
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+import logging
+from functools import lru_cache
 
-# Download required NLTK resources
-def download_nltk_resources():
+# NLTK is imported on first use rather than here: importing it takes longer
+# than the rest of the application put together.
+
+# NLTK data packages used for preprocessing, and where nltk.data finds them
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet'
+}
+
+def missing_nltk_resources():
     """
-    Download required NLTK resources if they aren't already available.
+    Find the required NLTK data packages that are not installed.
+    
+    Returns:
+        list: Names of the missing packages
     """
-    resources = ['punkt', 'stopwords', 'wordnet']
-    for resource in resources:
+    import nltk
+    
+    missing = []
+    for resource, path in NLTK_RESOURCES.items():
         try:
-            nltk.data.find(f'tokenizers/{resource}')
+            nltk.data.find(path)
         except LookupError:
-            nltk.download(resource, quiet=True)
+            missing.append(resource)
+    return missing
+
+def download_nltk_resources():
+    """
+    Download required NLTK resources if they aren't already available.
+    """
+    import nltk
+    
+    for resource in missing_nltk_resources():
+        logging.info(f"Downloading NLTK resource '{resource}'")
+        nltk.download(resource, quiet=True)
+
+@lru_cache(maxsize=None)
+def install_nltk_resources():
+    """
+    Download the missing NLTK data, once per process.
+    
+    The result is cached even when data is still missing, so a process
+    that cannot download it (offline, read-only) does not try again on
+    every call.
+    
+    Returns:
+        tuple: Names of the packages still missing afterwards
+    """
+    download_nltk_resources()
+    return tuple(missing_nltk_resources())
+
+def ensure_nltk_resources():
+    """
+    Make sure the required NLTK data is installed, downloading it if needed.
+    
+    Downloads at most once per process; later calls return immediately or
+    raise again.
+    
+    Raises:
+        LookupError: If a resource is still missing after downloading
+    """
+    missing = install_nltk_resources()
+    if missing:
+        raise LookupError(
+            f"Missing NLTK data: {', '.join(missing)}. "
+            f"Install it with: python -m nltk.downloader {' '.join(missing)}"
+        )
+
+# Bump whenever preprocessing output changes, so cached corpora are rebuilt
+PREPROCESSING_VERSION = 1
+
+# Precompiled cleaning patterns. Punctuation and digits are both plain
+# character deletions, so they are removed in a single pass.
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+STRIP_PATTERN = re.compile(r'[^\w\s]|\d+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """
+    Get the English stopword set, loading it from NLTK only once.
+    
+    Returns:
+        frozenset: English stopwords
+    """
+    ensure_nltk_resources()
+    from nltk.corpus import stopwords
+    
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """
+    Get the shared WordNet lemmatizer, creating it only once.
+    
+    Returns:
+        WordNetLemmatizer: The shared lemmatizer
+    """
+    ensure_nltk_resources()
+    from nltk.stem import WordNetLemmatizer
+    
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=None)
+def get_word_tokenizer():
+    """
+    Get NLTK's default word tokenizer, importing it only once.
+    
+    Returns:
+        callable: Function splitting a text into word tokens
+    """
+    ensure_nltk_resources()
+    from nltk.tokenize import word_tokenize
+    
+    return word_tokenize
 
-# Make sure we have the required NLTK data
-download_nltk_resources()
+def word_tokenize(text):
+    """
+    Split text into word tokens with NLTK's default tokenizer.
+    
+    Args:
+        text (str): The text to tokenize
+    
+    Returns:
+        list: Word tokens
+    """
+    return get_word_tokenizer()(text)
 
 def clean_text(text):
     """
@@ -32,7 +144,7 @@ def clean_text(text):
     
     Args:
         text (str): The text to clean
-        
+    
     Returns:
         str: Cleaned text
     """
@@ -43,16 +155,13 @@ def clean_text(text):
     text = text.lower()
     
     # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = URL_PATTERN.sub('', text)
     
-    # Remove special characters and punctuation
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    # Remove numbers
-    text = re.sub(r'\d+', '', text)
+    # Remove special characters, punctuation and numbers
+    text = STRIP_PATTERN.sub('', text)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
@@ -62,11 +171,11 @@ def remove_stopwords(text):
     
     Args:
         text (str): The text to process
-        
+    
     Returns:
         str: Text without stopwords
     """
-    stop_words = set(stopwords.words('english'))
+    stop_words = get_stop_words()
     word_tokens = word_tokenize(text)
     filtered_text = [word for word in word_tokens if word not in stop_words]
     return ' '.join(filtered_text)
@@ -77,29 +186,116 @@ def lemmatize_text(text):
     
     Args:
         text (str): The text to lemmatize
-        
+    
     Returns:
         str: Lemmatized text
     """
-    lemmatizer = WordNetLemmatizer()
+    lemmatizer = get_lemmatizer()
     word_tokens = word_tokenize(text)
     lemmatized_text = [lemmatizer.lemmatize(word) for word in word_tokens]
     return ' '.join(lemmatized_text)
 
+class TextPreprocessor:
+    """
+    Preprocessing engine that runs the full pipeline in a single pass.
+    
+    Produces the same output as applying clean_text, remove_stopwords and
+    lemmatize_text in sequence, but tokenizes the text only once, reuses the
+    shared stopword set and lemmatizer, and memoizes lemmas in a bounded
+    cache (ticket vocabulary is small and highly repetitive).
+    """
+    
+    def __init__(self, lemma_cache_size=50000):
+        """
+        Initialize the TextPreprocessor.
+        
+        Args:
+            lemma_cache_size (int, optional): Maximum number of distinct words
+                                              kept in the lemma cache
+        """
+        self.stop_words = get_stop_words()
+        self.tokenize = get_word_tokenizer()
+        self.lemma_cache_size = lemma_cache_size
+        self._lemmatize = lru_cache(maxsize=lemma_cache_size)(get_lemmatizer().lemmatize)
+    
+    def preprocess(self, text):
+        """
+        Apply the full preprocessing pipeline to the text.
+        
+        Args:
+            text (str): The text to preprocess
+        
+        Returns:
+            str: Fully preprocessed text
+        """
+        stop_words = self.stop_words
+        tokenize = self.tokenize
+        lemmatize = self._lemmatize
+        
+        # Tokenizing the cleaned text is idempotent, so one pass serves
+        # both stopword removal and lemmatization
+        tokens = tokenize(clean_text(text))
+        return ' '.join(lemmatize(token) for token in tokens if token not in stop_words)
+    
+    def preprocess_many(self, texts):
+        """
+        Apply the full preprocessing pipeline to a batch of texts.
+        
+        Args:
+            texts (list): The texts to preprocess
+        
+        Returns:
+            list: Fully preprocessed texts, in input order
+        """
+        return [self.preprocess(text) for text in texts]
+    
+    def combine(self, title, description):
+        """
+        Combine and preprocess a ticket title and description.
+        
+        Args:
+            title (str): The ticket title
+            description (str): The ticket description
+        
+        Returns:
+            str: Combined and preprocessed text
+        """
+        # Repeat title to increase its weight in the classification
+        return self.preprocess(title + " " + title + " " + description)
+    
+    def cache_info(self):
+        """
+        Get lemma cache statistics.
+        
+        Returns:
+            CacheInfo: Hits, misses, maximum size and current size
+        """
+        return self._lemmatize.cache_info()
+
+@lru_cache(maxsize=None)
+def get_preprocessor():
+    """
+    Get the shared TextPreprocessor instance.
+    
+    Returns:
+        TextPreprocessor: The shared preprocessing engine
+    """
+    return TextPreprocessor()
+
 def preprocess_text(text):
     """
     Apply full preprocessing pipeline to the text.
     
+    Equivalent to clean_text, remove_stopwords and lemmatize_text applied in
+    sequence, run through the shared single-pass TextPreprocessor.
+    
     Args:
         text (str): The text to preprocess
-        
+    
     Returns:
         str: Fully preprocessed text
     """
-    text = clean_text(text)
-    text = remove_stopwords(text)
-    text = lemmatize_text(text)
-    return text
+    return get_preprocessor().preprocess(text)
 
 def combine_title_description(title, description):
     """
@@ -109,10 +305,8 @@ def combine_title_description(title, description):
     Args:
         title (str): The ticket title
         description (str): The ticket description
-        
+    
     Returns:
         str: Combined and preprocessed text
     """
-    # Repeat title to increase its weight in the classification
-    combined_text = title + " " + title + " " + description
-    return preprocess_text(combined_text)
\ No newline at end of file
+    return get_preprocessor().combine(title, description)
\ No newline at end of file